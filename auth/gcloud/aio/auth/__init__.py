@@ -233,6 +233,134 @@ IAM Client Usage
     # Get a specific public key
     key = await client.get_public_key('key-id')
 
+Token Caching
+-------------
+
+Every ``Token`` refreshes on its own by default, so several clients using the
+same credentials will each fetch their own token. Services which create many
+clients can instead share tokens process-wide: tokens for the same
+credentials, scopes, and impersonation target are then cached together, and
+concurrent refreshes of the same token are collapsed into a single request.
+
+.. code-block:: python
+
+    from gcloud.aio.auth import TOKEN_CACHE
+
+    TOKEN_CACHE.enable()
+
+Short-lived processes, such as cron jobs or CLI tools, can also keep tokens
+between runs by caching them on disk. Tokens are stored in files only readable
+by the current user (under ``~/.cache`` by default), and concurrent processes
+take turns refreshing a token rather than all hitting the token endpoint:
+
+.. code-block:: python
+
+    from gcloud.aio.auth import FileTokenStore
+
+    TOKEN_CACHE.enable(store=FileTokenStore())
+
+To avoid the first request after a deploy waiting on a token refresh, tokens
+can also be acquired ahead of time, eg. from a startup hook:
+
+.. code-block:: python
+
+    from gcloud.aio.auth import prewarm_tokens
+
+    await prewarm_tokens(storage.token, publisher.token)
+
+Connection Pooling
+------------------
+
+When no session is provided, every client builds its own connection pool with
+``aiohttp``'s default limits. High-throughput services may want to tune these
+by passing a ``PoolPolicy`` to the client (or to ``AioSession`` directly):
+
+.. code-block:: python
+
+    from gcloud.aio.auth import PoolPolicy
+    from gcloud.aio.storage import Storage
+
+    policy = PoolPolicy(limit=500, limit_per_host=200, keepalive_timeout=60)
+    async with Storage(pool_policy=policy) as client:
+        ...
+        # inspect how the pool is being used, eg. to size the limits above
+        print(client.session.pool_stats)
+
+The ``pool_stats`` counters track requests in flight, connections created and
+reused, and how long requests spent waiting for a free connection slot. They
+are only collected for sessions created by the library itself.
+
+Services which use several clients at once can also opt in to sharing a single
+session (and thus a single connection pool) between all of them. Once enabled,
+clients created on the same event loop with the same connection settings will
+share a reference-counted session, which is closed along with the last client
+using it:
+
+.. code-block:: python
+
+    from gcloud.aio.auth import SHARED_SESSIONS
+
+    SHARED_SESSIONS.enable()
+
+    async with Storage() as storage, PublisherClient() as publisher:
+        # both clients (and their tokens) use the same connection pool
+        assert storage.session.session is publisher.session.session
+
+With ``gcloud-rest-*``, requests made from different threads run concurrently
+over a single ``requests.Session``. Multi-threaded services can instead give
+each thread its own session and connection pool with
+``PoolPolicy(thread_mode='per_thread')``. Earlier versions ran every request
+in the process one at a time behind a global lock; this can be restored with
+``PoolPolicy(thread_mode='serialized')``.
+
+Retries
+-------
+
+Requests are not retried by default. Passing a ``RetryPolicy`` to a client (or
+to ``AioSession``) retries idempotent requests which fail with a connection
+error, a timeout, or a transient status code, using jittered exponential
+backoff and honouring any ``Retry-After`` header sent by the server:
+
+.. code-block:: python
+
+    from gcloud.aio.auth import RetryBudget
+    from gcloud.aio.auth import RetryPolicy
+
+    # a budget may be shared between policies to throttle retries globally
+    budget = RetryBudget(max_tokens=100, token_ratio=0.1)
+    policy = RetryPolicy(max_attempts=4, max_backoff=10., budget=budget)
+
+    async with Storage(retry_policy=policy) as storage:
+        ...
+
+The budget stops retries altogether once too many requests are failing, so
+that an outage is not made worse by every caller retrying at once.
+
+Errors
+------
+
+Error responses raise a ``GoogleAPIError``, which subclasses the HTTP client's
+own error type (``aiohttp.ClientResponseError`` or ``requests.HTTPError``).
+More specific subclasses are raised for common statuses, so callers can branch
+on the kind of failure without inspecting the message:
+
+.. code-block:: python
+
+    from gcloud.aio.auth import NotFoundError
+    from gcloud.aio.auth import RateLimitedError
+
+    try:
+        await storage.download(bucket, name)
+    except NotFoundError:
+        ...
+    except RateLimitedError as e:
+        await asyncio.sleep(e.retry_after or 1)
+
+Only the first ``error_body_limit`` bytes (16KiB by default) of an error
+response are read, so a failed download does not buffer a large error page.
+The structured error sent by Google is parsed from this prefix on first access
+through ``error``, ``api_status``, ``api_message`` and ``reasons``.
+
 CLI
 ---
 
@@ -275,10 +403,33 @@ Similarly it can be used to quickly test your IAP-secured endpoints:
 import importlib.metadata
 
 from .build_constants import BUILD_GCLOUD_REST
+from .errors import BadRequestError
+from .errors import ConflictError
+from .errors import ForbiddenError
+from .errors import GoogleAPIError
+from .errors import NotFoundError
+from .errors import PreconditionFailedError
+from .errors import RateLimitedError
+from .errors import RequestError
+from .errors import ServerError
+from .errors import ServiceUnavailableError
+from .errors import UnauthorizedError
 from .iam import IamClient
+from .retry import RetryBudget
+from .retry import RetryPolicy
 from .session import AioSession
+from .session import PoolPolicy
+from .session import PoolStats
+from .session import QueueStats
+from .session import SessionRegistry
+from .session import SHARED_SESSIONS
 from .token import IapToken
+from .token import prewarm_tokens
 from .token import Token
+from .token_cache import FileTokenStore
+from .token_cache import TOKEN_CACHE
+from .token_cache import TokenCache
+from .token_cache import TokenStore
 from .utils import decode
 from .utils import encode
 
@@ -287,10 +438,33 @@ __version__ = importlib.metadata.version('gcloud-aio-auth')
 __all__ = [
     'AioSession',
     'BUILD_GCLOUD_REST',
+    'BadRequestError',
+    'ConflictError',
+    'FileTokenStore',
+    'ForbiddenError',
+    'GoogleAPIError',
     'IamClient',
     'IapToken',
+    'NotFoundError',
+    'PoolPolicy',
+    'PoolStats',
+    'PreconditionFailedError',
+    'QueueStats',
+    'RateLimitedError',
+    'RequestError',
+    'RetryBudget',
+    'RetryPolicy',
+    'SHARED_SESSIONS',
+    'ServerError',
+    'ServiceUnavailableError',
+    'SessionRegistry',
+    'TOKEN_CACHE',
     'Token',
+    'TokenCache',
+    'TokenStore',
+    'UnauthorizedError',
     '__version__',
     'decode',
     'encode',
+    'prewarm_tokens',
 ]
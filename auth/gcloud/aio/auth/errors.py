@@ -0,0 +1,181 @@
+"""
+Typed exceptions raised for error responses from Google APIs.
+
+Every exception here subclasses the HTTP client's own response error
+(``aiohttp.ClientResponseError`` or ``requests.HTTPError``), so existing
+``except`` clauses keep working; callers which care about a specific failure
+can instead catch eg. ``NotFoundError`` or ``RateLimitedError`` directly.
+"""
+import functools
+import json
+from typing import Any
+
+from .build_constants import BUILD_GCLOUD_REST
+from .retry import parse_retry_after
+
+# Selectively load libraries based on the package
+if BUILD_GCLOUD_REST:
+    from requests import HTTPError as ResponseError
+else:
+    from aiohttp import (  # type: ignore[assignment]
+        ClientResponseError as ResponseError,
+    )
+
+# Error bodies are only needed to build a helpful message, so we never read
+# more than this many bytes of them: a failed download may well have sent us
+# a large HTML or XML document rather than a short JSON error.
+DEFAULT_ERROR_BODY_LIMIT = 16 * 1024
+
+
+class GoogleAPIError(ResponseError):
+    """
+    An error response from a Google API.
+
+    Attributes:
+        status: The HTTP status code of the response.
+        body: The decoded body of the response, cut down to at most the
+            session's ``error_body_limit``.
+        truncated: Whether ``body`` was cut short.
+    """
+    status: int
+
+    def __init__(self, *args: Any, body: str = '', truncated: bool = False,
+                 **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.body = body
+        self.truncated = truncated
+        if BUILD_GCLOUD_REST:
+            response = kwargs.get('response')
+            self.status = response.status_code if response is not None else 0
+            self.headers = response.headers if response is not None else None
+
+    @functools.cached_property
+    def error(self) -> dict[str, Any]:
+        """
+        The structured error returned by the API, parsed on first access.
+
+        Google APIs return errors in the form ``{"error": {"code": 404,
+        "message": "...", "status": "NOT_FOUND", "errors": [...]}}``; OAuth
+        endpoints instead use ``{"error": "...", "error_description":
+        "..."}``. Either is normalized to the inner dict. Bodies which are not
+        JSON (or which were truncated) result in an empty dict.
+        """
+        try:
+            payload = json.loads(self.body)
+        except ValueError:
+            return {}
+        if not isinstance(payload, dict):
+            return {}
+
+        error = payload.get('error')
+        if isinstance(error, dict):
+            return error
+        if isinstance(error, str):
+            return {'status': error,
+                    'message': payload.get('error_description')}
+        return {}
+
+    @property
+    def api_status(self) -> str | None:
+        """The canonical error status, eg. ``'NOT_FOUND'``, if provided."""
+        status: str | None = self.error.get('status')
+        return status
+
+    @property
+    def api_message(self) -> str | None:
+        message: str | None = self.error.get('message')
+        return message
+
+    @property
+    def reasons(self) -> list[str]:
+        """
+        The ``reason`` of every error detail, eg. ``['rateLimitExceeded']``.
+        """
+        return [e['reason'] for e in self.error.get('errors') or []
+                if isinstance(e, dict) and 'reason' in e]
+
+    @property
+    def retry_after(self) -> float | None:
+        """The delay requested by the server's ``Retry-After`` header."""
+        if not self.headers:
+            return None
+        return parse_retry_after(self.headers.get('Retry-After'))
+
+
+class RequestError(GoogleAPIError):
+    """A 4xx response."""
+
+
+class BadRequestError(RequestError):
+    """A 400 response."""
+
+
+class UnauthorizedError(RequestError):
+    """A 401 response."""
+
+
+class ForbiddenError(RequestError):
+    """A 403 response."""
+
+
+class NotFoundError(RequestError):
+    """A 404 response."""
+
+
+class ConflictError(RequestError):
+    """A 409 response, eg. when creating a resource which already exists."""
+
+
+class PreconditionFailedError(RequestError):
+    """A 412 response, eg. when a generation or etag precondition fails."""
+
+
+class RateLimitedError(RequestError):
+    """A 429 response."""
+
+
+class ServerError(GoogleAPIError):
+    """A 5xx response."""
+
+
+class ServiceUnavailableError(ServerError):
+    """A 503 response."""
+
+
+_ERRORS_BY_STATUS: dict[int, type[GoogleAPIError]] = {
+    400: BadRequestError,
+    401: UnauthorizedError,
+    403: ForbiddenError,
+    404: NotFoundError,
+    409: ConflictError,
+    412: PreconditionFailedError,
+    429: RateLimitedError,
+    503: ServiceUnavailableError,
+}
+
+
+def error_class(status: int) -> type[GoogleAPIError]:
+    """Pick the most specific exception type for an HTTP status code."""
+    if status in _ERRORS_BY_STATUS:
+        return _ERRORS_BY_STATUS[status]
+    if 400 <= status < 500:
+        return RequestError
+    if status >= 500:
+        return ServerError
+    return GoogleAPIError
+
+
+def decode_error_body(body: bytes, limit: int,
+                      charset: str | None = None) -> tuple[str, bool]:
+    """
+    Decode an error body which was read up to ``limit`` bytes.
+
+    Returns the decoded text and whether it was truncated; callers should read
+    one byte past the limit so the two cases can be told apart.
+    """
+    truncated = len(body) > limit
+    try:
+        text = body[:limit].decode(charset or 'utf-8', errors='replace')
+    except LookupError:
+        text = body[:limit].decode('utf-8', errors='replace')
+    return text, truncated
@@ -0,0 +1,181 @@
+"""
+Retry policies for requests made through ``AioSession`` / ``SyncSession``.
+"""
+import datetime
+import email.utils
+import random
+import threading
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+
+from .build_constants import BUILD_GCLOUD_REST
+
+# Selectively load libraries based on the package
+if BUILD_GCLOUD_REST:
+    import requests
+
+    RETRYABLE_EXCEPTIONS: tuple[type[BaseException], ...] = (
+        requests.exceptions.ChunkedEncodingError,
+        requests.exceptions.ConnectionError,
+        requests.exceptions.Timeout,
+    )
+else:
+    import asyncio
+
+    import aiohttp
+
+    RETRYABLE_EXCEPTIONS = (
+        aiohttp.ClientConnectionError,
+        aiohttp.ClientPayloadError,
+        asyncio.TimeoutError,
+    )
+
+
+DEFAULT_RETRYABLE_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+DEFAULT_IDEMPOTENT_METHODS = frozenset({'DELETE', 'GET', 'HEAD', 'OPTIONS',
+                                        'PUT'})
+
+
+class RetryBudget:
+    """
+    Token bucket limiting how many retries may be made overall.
+
+    This follows the retry throttling scheme used by gRPC: every failed attempt
+    removes a token from the bucket and every successful request adds back
+    ``token_ratio`` tokens. Retries are only allowed while the bucket is more
+    than half full, which means that during a sustained outage we quickly stop
+    retrying (rather than multiplying our traffic) and only start again once
+    requests begin to succeed.
+
+    A single budget may be shared between several policies (and thus several
+    clients) to throttle retries process-wide.
+    """
+
+    def __init__(self, max_tokens: float = 100.,
+                 token_ratio: float = 0.1) -> None:
+        if max_tokens <= 0:
+            raise ValueError('max_tokens must be positive')
+        if token_ratio <= 0:
+            raise ValueError('token_ratio must be positive')
+
+        self.max_tokens = max_tokens
+        self.token_ratio = token_ratio
+        self.tokens = max_tokens
+        self._lock = threading.Lock()
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.token_ratio)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.tokens = max(0., self.tokens - 1)
+
+    @property
+    def allows_retry(self) -> bool:
+        return self.tokens > self.max_tokens / 2
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Parse a ``Retry-After`` header value into a number of seconds.
+
+    The header may contain either a number of seconds or an HTTP date.
+    """
+    if not value:
+        return None
+
+    try:
+        return max(0., float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return max(0., (retry_at - now).total_seconds())
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Retry configuration for a session.
+
+    Requests are retried with jittered exponential backoff when they fail with
+    a connection error, a timeout, or one of ``retryable_statuses``. A
+    ``Retry-After`` header sent by the server always takes precedence over the
+    computed backoff, if it is longer.
+
+    Only idempotent requests are retried. By default, this is determined by the
+    HTTP method (see ``idempotent_methods``); individual call sites can
+    override this by passing ``idempotent=True`` or ``idempotent=False`` to
+    the session, eg. to allow retrying a ``POST`` which is known to be safe.
+    Requests whose body is a stream are never retried, since we can not
+    guarantee the stream can be replayed.
+
+    Attributes:
+        max_attempts: Total number of attempts, including the first one.
+        initial_backoff: Upper bound of the first backoff, in seconds.
+        max_backoff: Upper bound of any backoff, in seconds, including those
+            requested by the server through ``Retry-After``.
+        multiplier: Growth factor of the backoff between attempts.
+        retryable_statuses: HTTP status codes which should be retried.
+        idempotent_methods: HTTP methods considered safe to retry when the
+            call site does not say otherwise.
+        budget: Token bucket shared by every request made with this policy.
+    """
+    max_attempts: int = 5
+    initial_backoff: float = 0.5
+    max_backoff: float = 30.
+    multiplier: float = 2.
+    retryable_statuses: frozenset[int] = DEFAULT_RETRYABLE_STATUSES
+    idempotent_methods: frozenset[str] = DEFAULT_IDEMPOTENT_METHODS
+    budget: RetryBudget = field(default_factory=RetryBudget)
+
+    def is_idempotent(self, method: str, idempotent: bool | None) -> bool:
+        if idempotent is not None:
+            return idempotent
+        return method.upper() in self.idempotent_methods
+
+    def is_retryable_status(self, status: int) -> bool:
+        return status in self.retryable_statuses
+
+    @staticmethod
+    def is_retryable_error(error: BaseException) -> bool:
+        return isinstance(error, RETRYABLE_EXCEPTIONS)
+
+    def can_retry(self, attempt: int) -> bool:
+        """
+        Decide whether a retryable failure on the given (1-indexed) attempt
+        should be retried, recording the failure against the budget.
+        """
+        self.budget.record_failure()
+        return attempt < self.max_attempts and self.budget.allows_retry
+
+    def backoff(self, attempt: int, retry_after: str | None = None) -> float:
+        """
+        Compute how long to wait after the given (1-indexed) attempt.
+
+        Uses "full jitter": a random delay between zero and the exponential
+        backoff ceiling, which spreads out retries from many concurrent
+        callers. A server-provided ``Retry-After`` delay is honoured, but is
+        still capped at ``max_backoff``.
+        """
+        ceiling = min(self.max_backoff,
+                      self.initial_backoff * self.multiplier ** (attempt - 1))
+        delay = random.uniform(0, ceiling)
+
+        server_delay = parse_retry_after(retry_after)
+        if server_delay is not None:
+            delay = min(max(delay, server_delay), self.max_backoff)
+        return delay
+
+    @staticmethod
+    def is_replayable(data: Any) -> bool:
+        return data is None or isinstance(data, (bytes, str))
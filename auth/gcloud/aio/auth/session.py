@@ -1,20 +1,34 @@
+import asyncio
+import contextlib
 import logging
 import threading
+import time
 import warnings
 from abc import ABCMeta
 from abc import abstractmethod
 from abc import abstractproperty
+from collections.abc import Awaitable
+from collections.abc import Callable
 from collections.abc import Mapping
+from dataclasses import dataclass
+from dataclasses import field
 from typing import Any
 from typing import AnyStr
 from typing import IO
 
 from .build_constants import BUILD_GCLOUD_REST
+from .errors import decode_error_body
+from .errors import DEFAULT_ERROR_BODY_LIMIT
+from .errors import error_class
+from .retry import RetryPolicy
 
 # Selectively load libraries based on the package
 if BUILD_GCLOUD_REST:
     from requests import Response
     from requests import Session
+    from requests.adapters import DEFAULT_POOLSIZE
+    from requests.adapters import HTTPAdapter
+    from requests.exceptions import RequestException
 else:
     from aiohttp import ClientResponse as Response  # type: ignore[assignment]
     from aiohttp import ClientSession as Session  # type: ignore[assignment]
@@ -22,18 +36,272 @@ else:
 
 log = logging.getLogger(__name__)
 
+THREAD_MODES = ('shared', 'per_thread', 'serialized')
+
+
+@dataclass(frozen=True)
+class PoolPolicy:
+    """
+    Connection pool configuration for sessions created by this library.
+
+    The defaults match those of ``aiohttp.TCPConnector``. Note that the policy
+    only applies to sessions we create ourselves: if you pass in your own
+    session, you are responsible for configuring its connector.
+
+    Attributes:
+        limit: Maximum number of simultaneous connections. ``0`` means no
+            limit.
+        limit_per_host: Maximum number of simultaneous connections to a single
+            endpoint. ``0`` means no limit.
+        keepalive_timeout: Seconds to keep idle connections around for reuse.
+            Ignored when ``force_close`` is set.
+        ttl_dns_cache: Seconds to cache DNS resolutions for. ``None`` caches
+            forever.
+        happy_eyeballs_delay: Seconds to wait before racing the next address
+            family when connecting (RFC 8305). ``None`` disables happy
+            eyeballs. Requires ``aiohttp>=3.10`` to be changed from the
+            default.
+        force_close: Close connections after each request rather than
+            returning them to the pool.
+        thread_mode: ``gcloud-rest`` only. How requests made from different
+            threads share the session:
+
+            * ``'shared'``: every thread uses the same ``requests.Session``
+              (and thus connection pool) concurrently.
+            * ``'per_thread'``: give each thread its own ``requests.Session``.
+              Such sessions are never shared through ``SHARED_SESSIONS``.
+            * ``'serialized'``: run every request in the process through a
+              single global lock, one at a time. This was the only available
+              behaviour in earlier versions; it is only useful when working
+              around thread-safety issues elsewhere.
+    """
+    limit: int = 100
+    limit_per_host: int = 0
+    keepalive_timeout: float = 15.
+    ttl_dns_cache: int | None = 10
+    happy_eyeballs_delay: float | None = 0.25
+    force_close: bool = False
+    thread_mode: str = 'shared'
+
+    def __post_init__(self) -> None:
+        if self.thread_mode not in THREAD_MODES:
+            raise ValueError(f'thread_mode must be one of {THREAD_MODES}, '
+                             f'not {self.thread_mode!r}')
+
+    def connector_kwargs(self) -> dict[str, Any]:
+        kwargs: dict[str, Any] = {
+            'limit': self.limit,
+            'limit_per_host': self.limit_per_host,
+            'ttl_dns_cache': self.ttl_dns_cache,
+            'force_close': self.force_close,
+        }
+        # aiohttp refuses a keepalive_timeout when connections are not kept
+        if not self.force_close:
+            kwargs['keepalive_timeout'] = self.keepalive_timeout
+        # only pass this one along when needed, since aiohttp<3.10 does not
+        # support it
+        if self.happy_eyeballs_delay != PoolPolicy.happy_eyeballs_delay:
+            kwargs['happy_eyeballs_delay'] = self.happy_eyeballs_delay
+        return kwargs
+
+
+@dataclass
+class QueueStats:
+    """
+    Counters describing requests waiting for a free connection slot.
+
+    Attributes:
+        waiting: Requests currently waiting for a connection slot.
+        total: Number of requests which ever had to wait for a slot.
+        total_wait: Total seconds spent waiting for connection slots.
+        max_wait: Longest single wait for a connection slot, in seconds.
+    """
+    waiting: int = 0
+    total: int = 0
+    total_wait: float = 0.
+    max_wait: float = 0.
+
+    def started(self) -> float:
+        self.waiting += 1
+        self.total += 1
+        return time.monotonic()
+
+    def finished(self, started_at: float) -> None:
+        waited = time.monotonic() - started_at
+        self.waiting -= 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+
+
+@dataclass
+class PoolStats:
+    """
+    Counters describing how a session's connection pool is being used.
+
+    These are meant to help size a ``PoolPolicy`` from real traffic: if
+    ``queue.waiting`` is frequently non-zero or ``queue.max_wait`` is high,
+    requests are waiting on the pool rather than the network.
+
+    Only sessions created by ``AioSession`` itself are instrumented.
+
+    Attributes:
+        requests_in_flight: Requests which have been started but have not yet
+            received a response (or failed).
+        max_requests_in_flight: High-water mark of ``requests_in_flight``.
+        connections_created: Number of new connections opened.
+        connections_reused: Number of requests served by a pooled connection.
+        queue: Requests which had to wait for a connection slot.
+    """
+    requests_in_flight: int = 0
+    max_requests_in_flight: int = 0
+    connections_created: int = 0
+    connections_reused: int = 0
+    queue: QueueStats = field(default_factory=QueueStats)
+
+    def request_started(self) -> None:
+        self.requests_in_flight += 1
+        self.max_requests_in_flight = max(self.max_requests_in_flight,
+                                          self.requests_in_flight)
+
+    def request_finished(self) -> None:
+        self.requests_in_flight -= 1
+
+
+@dataclass
+class _SharedSession:
+    session: Any
+    stats: PoolStats
+    refs: int = 0
+
+
+class SessionRegistry:
+    """
+    Opt-in registry of reference-counted sessions shared between clients.
+
+    By default, every client creates (and later closes) its own session, which
+    means a separate connection pool, DNS cache, and set of TLS handshakes per
+    client. Once the registry is enabled, clients created without an explicit
+    ``session`` will instead share a single session with every other client on
+    the same event loop which uses the same connection settings (SSL
+    verification, timeout, and ``PoolPolicy``). The shared session is closed
+    once the last client using it has been closed.
+
+    Note that clients must be created while the event loop is running in order
+    to be shared; otherwise, they fall back to creating their own session.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._entries: dict[tuple[Any, ...], _SharedSession] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        # sessions which have already been handed out are left untouched and
+        # will still be closed as their users release them
+        self.enabled = False
+
+    def key(self, *config: Any) -> tuple[Any, ...] | None:
+        """Get the registry key for a session, if it should be shared."""
+        if not self.enabled:
+            return None
+
+        if BUILD_GCLOUD_REST:
+            return (None, *config)
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+        return (loop, *config)
+
+    def acquire(
+        self, key: tuple[Any, ...],
+        factory: Callable[[PoolStats], Any],
+    ) -> tuple[Any, PoolStats]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or getattr(entry.session, 'closed', False):
+                stats = PoolStats()
+                entry = _SharedSession(session=factory(stats), stats=stats)
+                self._entries[key] = entry
+
+            entry.refs += 1
+            return entry.session, entry.stats
+
+    def release(self, key: tuple[Any, ...], session: Any) -> Any | None:
+        """Drop a reference, returning the session if it should be closed."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.session is not session:
+                return None
+
+            entry.refs -= 1
+            if entry.refs > 0:
+                return None
+
+            del self._entries[key]
+            return entry.session
+
+
+SHARED_SESSIONS = SessionRegistry()
+
+
+@dataclass(frozen=True)
+class _RequestConfig:
+    pool_policy: PoolPolicy
+    retry_policy: RetryPolicy | None
+    error_body_limit: int
+
 
 class BaseSession:
     __metaclass__ = ABCMeta
 
     def __init__(
         self, session: Session | None = None, timeout: float = 10,
-        verify_ssl: bool = True,
+        verify_ssl: bool = True, *, pool_policy: PoolPolicy | None = None,
+        retry_policy: RetryPolicy | None = None,
+        error_body_limit: int = DEFAULT_ERROR_BODY_LIMIT,
     ) -> None:
         self._shared_session = bool(session)
         self._session = session
         self._ssl = verify_ssl
         self._timeout = timeout
+        self._config = _RequestConfig(
+            pool_policy=pool_policy or PoolPolicy(),
+            retry_policy=retry_policy,
+            error_body_limit=error_body_limit,
+        )
+        self.pool_stats = PoolStats()
+        self._registry_key: tuple[Any, ...] | None = None
+
+    @property
+    def pool_policy(self) -> PoolPolicy:
+        return self._config.pool_policy
+
+    @property
+    def retry_policy(self) -> RetryPolicy | None:
+        return self._config.retry_policy
+
+    @property
+    def error_body_limit(self) -> int:
+        return self._config.error_body_limit
+
+    def _retry_policy_for(
+        self, method: str, data: Any,
+        idempotent: bool | None,
+    ) -> RetryPolicy | None:
+        policy = self._config.retry_policy
+        if policy is None or not policy.is_replayable(data):
+            return None
+        if not policy.is_idempotent(method, idempotent):
+            return None
+        return policy
 
     @abstractproperty  # pylint: disable=deprecated-decorator
     def session(self) -> Session | None:
@@ -44,6 +312,7 @@ class BaseSession:
         self, url: str, headers: Mapping[str, str],
         data: bytes | str | IO[AnyStr] | None, timeout: float,
         params: Mapping[str, int | str] | None,
+        idempotent: bool | None,
     ) -> Response:
         pass
 
@@ -53,6 +322,7 @@ class BaseSession:
         timeout: float, params: Mapping[str, int | str] | None,
         stream: bool,
         auto_decompress: bool | None,
+        idempotent: bool | None,
     ) -> Response:
         pass
 
@@ -61,6 +331,7 @@ class BaseSession:
         self, url: str, headers: Mapping[str, str],
         data: bytes | str | None, timeout: float,
         params: Mapping[str, int | str] | None,
+        idempotent: bool | None,
     ) -> Response:
         pass
 
@@ -68,6 +339,7 @@ class BaseSession:
     async def put(
         self, url: str, headers: Mapping[str, str],
         data: bytes | str | IO[Any], timeout: float,
+        idempotent: bool | None,
     ) -> Response:
         pass
 
@@ -76,6 +348,7 @@ class BaseSession:
         self, url: str, headers: Mapping[str, str],
         params: Mapping[str, int | str] | None,
         timeout: float,
+        idempotent: bool | None,
     ) -> Response:
         pass
 
@@ -84,13 +357,15 @@ class BaseSession:
         self, url: str, headers: Mapping[str, str] | None,
         timeout: float, params: Mapping[str, int | str] | None,
         allow_redirects: bool,
+        idempotent: bool | None,
     ) -> Response:
         pass
 
     @abstractmethod
     async def request(
         self, method: str, url: str, headers: Mapping[str, str],
-        auto_raise_for_status: bool = True, **kwargs: Any,
+        auto_raise_for_status: bool = True,
+        idempotent: bool | None = None, **kwargs: Any,
     ) -> Response:
         pass
 
@@ -105,7 +380,10 @@ if not BUILD_GCLOUD_REST:
 
     Timeout = aiohttp.ClientTimeout | float
 
-    async def _raise_for_status(resp: aiohttp.ClientResponse) -> None:
+    async def _raise_for_status(
+        resp: aiohttp.ClientResponse,
+        limit: int = DEFAULT_ERROR_BODY_LIMIT,
+    ) -> None:
         """Check resp for status and if error log additional info."""
         # Copied from aiohttp's raise_for_status() -- since it releases the
         # response payload, we need to grab the `resp.text` first to help users
@@ -113,7 +391,8 @@ if not BUILD_GCLOUD_REST:
         #
         # Useability/performance notes:
         # * grabbing the response can be slow for large files, only do it as
-        #   needed
+        #   needed -- and even then, only read the first `limit` bytes of it:
+        #   the connection gets closed rather than drained on release
         # * we can't know in advance what encoding the files might have unless
         #   we're certain in advance that the result is an error payload from
         #   Google (otherwise, it could be a binary blob from GCS, for example)
@@ -126,15 +405,69 @@ if not BUILD_GCLOUD_REST:
         if resp.status >= 400:
             assert resp.reason is not None
             # Google's error messages are useful, pass 'em through
-            body = await resp.text(errors='replace')
-            resp.release()
-            raise aiohttp.ClientResponseError(
+            chunks: list[bytes] = []
+            remaining = limit + 1
+            try:
+                while remaining > 0:
+                    chunk = await resp.content.read(remaining)
+                    if not chunk:
+                        break
+                    chunks.append(chunk)
+                    remaining -= len(chunk)
+            except aiohttp.ClientError:
+                # the body is only informational; don't mask the real error
+                pass
+            finally:
+                resp.release()
+
+            body, truncated = decode_error_body(b''.join(chunks), limit,
+                                                resp.charset)
+            suffix = '... (truncated)' if truncated else ''
+            raise error_class(resp.status)(
                 resp.request_info, resp.history,
                 status=resp.status,
-                message=f'{resp.reason}: {body}',
+                message=f'{resp.reason}: {body}{suffix}',
                 headers=resp.headers,
+                body=body, truncated=truncated,
             )
 
+    def _pool_trace_config(stats: PoolStats) -> aiohttp.TraceConfig:
+        """Build a ``TraceConfig`` which records pool usage into ``stats``."""
+        # pylint: disable=unused-argument
+        async def on_request_start(session: aiohttp.ClientSession,
+                                   ctx: Any, params: Any) -> None:
+            stats.request_started()
+
+        async def on_request_done(session: aiohttp.ClientSession,
+                                  ctx: Any, params: Any) -> None:
+            stats.request_finished()
+
+        async def on_queued_start(session: aiohttp.ClientSession,
+                                  ctx: Any, params: Any) -> None:
+            ctx.queued_at = stats.queue.started()
+
+        async def on_queued_end(session: aiohttp.ClientSession,
+                                ctx: Any, params: Any) -> None:
+            stats.queue.finished(ctx.queued_at)
+
+        async def on_create_end(session: aiohttp.ClientSession,
+                                ctx: Any, params: Any) -> None:
+            stats.connections_created += 1
+
+        async def on_reuse(session: aiohttp.ClientSession,
+                           ctx: Any, params: Any) -> None:
+            stats.connections_reused += 1
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_end.append(on_request_done)
+        trace_config.on_request_exception.append(on_request_done)
+        trace_config.on_connection_queued_start.append(on_queued_start)
+        trace_config.on_connection_queued_end.append(on_queued_end)
+        trace_config.on_connection_create_end.append(on_create_end)
+        trace_config.on_connection_reuseconn.append(on_reuse)
+        return trace_config
+
     class AioSession(BaseSession):
         _session: aiohttp.ClientSession  # type: ignore[assignment]
         _timeout: Timeout  # type: ignore[assignment]
@@ -142,44 +475,99 @@ if not BUILD_GCLOUD_REST:
         @property
         def session(self) -> aiohttp.ClientSession:  # type: ignore[override]
             if not self._session:
-                # N.B. `aiohttp.TCPConnector` SSL config is not true / false /
-                # CA bundle path like `requests`, but `None` / false / object
-                # instead:
-                # * `None` for default SSL check (ie. enabled)
-                # * `False` to skip SSL certificate validation
-                # * `aiohttp.Fingerprint` for fingerprint validation
-                # * `ssl.SSLContext` for custom SSL certificate validation
-                #
-                # https://docs.aiohttp.org/en/v3.9.2/client_reference.html#aiohttp.TCPConnector
-                connector = aiohttp.TCPConnector(ssl=self._ssl)
-
-                if isinstance(self._timeout, aiohttp.ClientTimeout):
-                    timeout = self._timeout
-                else:
-                    timeout = aiohttp.ClientTimeout(total=self._timeout)
-
-                self._session = aiohttp.ClientSession(
-                    connector=connector,
-                    timeout=timeout,
+                key = SHARED_SESSIONS.key(
+                    self._ssl, self._timeout, self.pool_policy,
                 )
+                if key is None:
+                    self._session = self._build_session(self.pool_stats)
+                else:
+                    self._session, self.pool_stats = SHARED_SESSIONS.acquire(
+                        key, self._build_session,
+                    )
+                    self._registry_key = key
             return self._session
 
+        def _build_session(self, stats: PoolStats) -> aiohttp.ClientSession:
+            # N.B. `aiohttp.TCPConnector` SSL config is not true / false / CA
+            # bundle path like `requests`, but `None` / false / object
+            # instead:
+            # * `None` for default SSL check (ie. enabled)
+            # * `False` to skip SSL certificate validation
+            # * `aiohttp.Fingerprint` for fingerprint validation
+            # * `ssl.SSLContext` for custom SSL certificate validation
+            #
+            # https://docs.aiohttp.org/en/v3.9.2/client_reference.html#aiohttp.TCPConnector
+            connector = aiohttp.TCPConnector(
+                ssl=self._ssl,
+                **self.pool_policy.connector_kwargs(),
+            )
+
+            if isinstance(self._timeout, aiohttp.ClientTimeout):
+                timeout = self._timeout
+            else:
+                timeout = aiohttp.ClientTimeout(total=self._timeout)
+
+            return aiohttp.ClientSession(
+                connector=connector,
+                timeout=timeout,
+                trace_configs=[_pool_trace_config(stats)],
+            )
+
+        async def _send(
+            self, method: str,
+            send: Callable[[], Awaitable[aiohttp.ClientResponse]], *,
+            data: Any = None, idempotent: bool | None = None,
+            auto_raise_for_status: bool = True,
+        ) -> aiohttp.ClientResponse:
+            policy = self._retry_policy_for(method, data, idempotent)
+            attempt = 0
+            while True:
+                attempt += 1
+                try:
+                    resp = await send()
+                except Exception as e:
+                    if (policy is None or not policy.is_retryable_error(e)
+                            or not policy.can_retry(attempt)):
+                        raise
+                    log.debug('retrying %s request after error: %r',
+                              method, e)
+                    await asyncio.sleep(policy.backoff(attempt))
+                    continue
+
+                if (policy is not None
+                        and policy.is_retryable_status(resp.status)
+                        and policy.can_retry(attempt)):
+                    log.debug('retrying %s request after status %d',
+                              method, resp.status)
+                    retry_after = resp.headers.get('Retry-After')
+                    resp.release()
+                    await asyncio.sleep(policy.backoff(attempt, retry_after))
+                    continue
+
+                if self.retry_policy is not None and resp.status < 400:
+                    self.retry_policy.budget.record_success()
+                if auto_raise_for_status:
+                    await _raise_for_status(resp, self.error_body_limit)
+                return resp
+
         async def post(  # type: ignore[override]
             self, url: str,
             headers: Mapping[str, str],
             data: bytes | str | IO[AnyStr] | None = None,
             timeout: Timeout = 10,
             params: Mapping[str, int | str] | None = None,
+            idempotent: bool | None = None,
         ) -> aiohttp.ClientResponse:
             if not isinstance(timeout, aiohttp.ClientTimeout):
                 timeout = aiohttp.ClientTimeout(total=timeout)
 
-            resp = await self.session.post(
-                url, data=data, headers=headers,
-                timeout=timeout, params=params,
+            return await self._send(
+                'POST', lambda: self.session.post(
+                    url, data=data, headers=headers,
+                    timeout=timeout, params=params,
+                ),
+                data=data, idempotent=idempotent,
             )
-            await _raise_for_status(resp)
-            return resp
 
         async def get(  # type: ignore[override]
             self, url: str,
@@ -188,6 +576,7 @@ if not BUILD_GCLOUD_REST:
             params: Mapping[str, int | str] | None = None,
             stream: bool | None = None,
             auto_decompress: bool | None = True,
+            idempotent: bool | None = None,
         ) -> aiohttp.ClientResponse:
             if not isinstance(timeout, aiohttp.ClientTimeout):
                 timeout = aiohttp.ClientTimeout(total=timeout)
@@ -198,60 +587,67 @@ if not BUILD_GCLOUD_REST:
                     'this argument is only used by SyncSession',
                     stream,
                 )
-            resp = await self.session.get(
-                url, headers=headers,
-                timeout=timeout, params=params,
-                auto_decompress=auto_decompress,
+            return await self._send(
+                'GET', lambda: self.session.get(
+                    url, headers=headers,
+                    timeout=timeout, params=params,
+                    auto_decompress=auto_decompress,
+                ),
+                idempotent=idempotent,
             )
-            await _raise_for_status(resp)
-            return resp
 
         async def patch(  # type: ignore[override]
             self, url: str, headers: Mapping[str, str],
             data: bytes | str | None = None,
             timeout: Timeout = 10,
             params: Mapping[str, int | str] | None = None,
+            idempotent: bool | None = None,
         ) -> aiohttp.ClientResponse:
             if not isinstance(timeout, aiohttp.ClientTimeout):
                 timeout = aiohttp.ClientTimeout(total=timeout)
 
-            resp = await self.session.patch(
-                url, data=data, headers=headers,
-                timeout=timeout, params=params,
+            return await self._send(
+                'PATCH', lambda: self.session.patch(
+                    url, data=data, headers=headers,
+                    timeout=timeout, params=params,
+                ),
+                data=data, idempotent=idempotent,
             )
-            await _raise_for_status(resp)
-            return resp
 
         async def put(  # type: ignore[override]
             self, url: str,
             headers: Mapping[str, str], data: bytes | str | IO[Any],
             timeout: Timeout = 10,
+            idempotent: bool | None = None,
         ) -> aiohttp.ClientResponse:
             if not isinstance(timeout, aiohttp.ClientTimeout):
                 timeout = aiohttp.ClientTimeout(total=timeout)
 
-            resp = await self.session.put(
-                url, data=data, headers=headers,
-                timeout=timeout,
+            return await self._send(
+                'PUT', lambda: self.session.put(
+                    url, data=data, headers=headers,
+                    timeout=timeout,
+                ),
+                data=data, idempotent=idempotent,
             )
-            await _raise_for_status(resp)
-            return resp
 
         async def delete(  # type: ignore[override]
             self, url: str,
             headers: Mapping[str, str],
             params: Mapping[str, int | str] | None = None,
             timeout: Timeout = 10,
+            idempotent: bool | None = None,
         ) -> aiohttp.ClientResponse:
             if not isinstance(timeout, aiohttp.ClientTimeout):
                 timeout = aiohttp.ClientTimeout(total=timeout)
 
-            resp = await self.session.delete(
-                url, headers=headers,
-                params=params, timeout=timeout,
+            return await self._send(
+                'DELETE', lambda: self.session.delete(
+                    url, headers=headers,
+                    params=params, timeout=timeout,
+                ),
+                idempotent=idempotent,
             )
-            await _raise_for_status(resp)
-            return resp
 
         async def head(  # type: ignore[override]
             self, url: str,
@@ -259,67 +655,201 @@ if not BUILD_GCLOUD_REST:
             timeout: Timeout = 10,
             params: Mapping[str, int | str] | None = None,
             allow_redirects: bool = False,
+            idempotent: bool | None = None,
         ) -> aiohttp.ClientResponse:
             if not isinstance(timeout, aiohttp.ClientTimeout):
                 timeout = aiohttp.ClientTimeout(total=timeout)
 
-            resp = await self.session.head(
-                url, headers=headers,
-                params=params, timeout=timeout,
-                allow_redirects=allow_redirects,
+            return await self._send(
+                'HEAD', lambda: self.session.head(
+                    url, headers=headers,
+                    params=params, timeout=timeout,
+                    allow_redirects=allow_redirects,
+                ),
+                idempotent=idempotent,
             )
-            await _raise_for_status(resp)
-            return resp
 
         async def request(  # type: ignore[override]
             self, method: str,
             url: str, headers: Mapping[str, str],
             auto_raise_for_status: bool = True,
+            idempotent: bool | None = None,
             **kwargs: Any,
         ) -> aiohttp.ClientResponse:
-            resp = await self.session.request(
-                method, url, headers=headers, **kwargs,
+            return await self._send(
+                method, lambda: self.session.request(
+                    method, url, headers=headers, **kwargs,
+                ),
+                data=kwargs.get('data'), idempotent=idempotent,
+                auto_raise_for_status=auto_raise_for_status,
             )
-            if auto_raise_for_status:
-                await _raise_for_status(resp)
-            return resp
 
         async def close(self) -> None:
+            if self._registry_key is not None:
+                session = SHARED_SESSIONS.release(
+                    self._registry_key, self._session,
+                )
+                # we no longer hold a reference to the pooled session, so
+                # must neither hand it out nor close it again
+                self._registry_key = None
+                self._session = None  # type: ignore[assignment]
+                if session:
+                    await session.close()
+                return
+
             if not self._shared_session and self._session:
                 await self._session.close()
 
 # pylint: disable=too-complex
 if BUILD_GCLOUD_REST:
+    def _raise_for_status_sync(
+        resp: Response,
+        limit: int = DEFAULT_ERROR_BODY_LIMIT,
+    ) -> None:
+        """Check resp for status and if error log additional info."""
+        # Mirrors requests' raise_for_status(), but passes through (at most
+        # `limit` bytes of) Google's error message. Streamed responses are not
+        # read any further than that.
+        if resp.status_code >= 400:
+            chunks: list[bytes] = []
+            remaining = limit + 1
+            try:
+                for chunk in resp.iter_content(chunk_size=remaining):
+                    chunks.append(chunk)
+                    remaining -= len(chunk)
+                    if remaining <= 0:
+                        break
+            except RequestException:
+                # the body is only informational; don't mask the real error
+                pass
+            finally:
+                resp.close()
+
+            body, truncated = decode_error_body(b''.join(chunks), limit,
+                                                resp.encoding)
+            suffix = '... (truncated)' if truncated else ''
+            kind = 'Client' if resp.status_code < 500 else 'Server'
+            raise error_class(resp.status_code)(
+                f'{resp.status_code} {kind} Error: {resp.reason} for url: '
+                f'{resp.url}: {body}{suffix}',
+                response=resp,
+                body=body, truncated=truncated,
+            )
+
     class SyncSession(BaseSession):
         _google_api_lock = threading.RLock()
 
+        def __init__(self, *args: Any, **kwargs: Any) -> None:
+            super().__init__(*args, **kwargs)
+            self._local = threading.local()
+            self._thread_sessions: list[Session] = []
+            self._thread_sessions_lock = threading.Lock()
+
         @property
         def google_api_lock(self) -> threading.RLock:
             return SyncSession._google_api_lock  # pylint: disable=protected-access
 
         @property
         def session(self) -> Session:
+            per_thread = self.pool_policy.thread_mode == 'per_thread'
+            if per_thread and not self._session:
+                return self._thread_session()
+
             if not self._session:
-                self._session = Session()
-                self._session.verify = self._ssl
+                key = SHARED_SESSIONS.key(
+                    self._ssl, self._timeout, self.pool_policy,
+                )
+                if key is None:
+                    self._session = self._build_session(self.pool_stats)
+                else:
+                    self._session, self.pool_stats = SHARED_SESSIONS.acquire(
+                        key, self._build_session,
+                    )
+                    self._registry_key = key
             return self._session
 
+        def _thread_session(self) -> Session:
+            session: Session | None = getattr(self._local, 'session', None)
+            if session is None:
+                session = self._build_session(self.pool_stats)
+                self._local.session = session
+                with self._thread_sessions_lock:
+                    self._thread_sessions.append(session)
+            return session
+
+        def _build_session(
+                self, stats: PoolStats,  # pylint: disable=unused-argument
+        ) -> Session:
+            session = Session()
+            session.verify = self._ssl
+            # requests pools per host, so the closest analogue to the aiohttp
+            # limits is the per-host pool size
+            adapter = HTTPAdapter(
+                pool_maxsize=(self.pool_policy.limit_per_host
+                              or self.pool_policy.limit
+                              or DEFAULT_POOLSIZE),
+            )
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            return session
+
         # N.B.: none of these will be `async` in compiled form, but adding the
         # symbol ensures we match the base class's definition for static
         # analysis.
+        async def _send(
+            self, method: str, send: Callable[[], Response], *,
+            data: Any = None, idempotent: bool | None = None,
+            auto_raise_for_status: bool = True,
+        ) -> Response:
+            policy = self._retry_policy_for(method, data, idempotent)
+            attempt = 0
+            while True:
+                attempt += 1
+                lock = (self.google_api_lock
+                        if self.pool_policy.thread_mode == 'serialized'
+                        else contextlib.nullcontext())
+                try:
+                    with lock:
+                        resp = send()
+                except Exception as e:
+                    if (policy is None or not policy.is_retryable_error(e)
+                            or not policy.can_retry(attempt)):
+                        raise
+                    log.debug('retrying %s request after error: %r',
+                              method, e)
+                    time.sleep(policy.backoff(attempt))
+                    continue
+
+                if (policy is not None
+                        and policy.is_retryable_status(resp.status_code)
+                        and policy.can_retry(attempt)):
+                    log.debug('retrying %s request after status %d',
+                              method, resp.status_code)
+                    retry_after = resp.headers.get('Retry-After')
+                    resp.close()
+                    time.sleep(policy.backoff(attempt, retry_after))
+                    continue
+
+                if self.retry_policy is not None and resp.ok:
+                    self.retry_policy.budget.record_success()
+                if auto_raise_for_status:
+                    _raise_for_status_sync(resp, self.error_body_limit)
+                return resp
+
         async def post(
             self, url: str, headers: Mapping[str, str],
             data: bytes | str | IO[AnyStr] | None = None,
             timeout: float = 10,
             params: Mapping[str, int | str] | None = None,
+            idempotent: bool | None = None,
         ) -> Response:
-            with self.google_api_lock:
-                resp = self.session.post(
+            return await self._send(
+                'POST', lambda: self.session.post(
                     url, data=data, headers=headers,
                     timeout=timeout, params=params,
-                )
-            resp.raise_for_status()
-            return resp
+                ),
+                data=data, idempotent=idempotent,
+            )
 
         async def get(
             self, url: str, headers: Mapping[str, str] | None = None,
@@ -327,6 +857,7 @@ if BUILD_GCLOUD_REST:
             params: Mapping[str, int | str] | None = None,
             stream: bool = False,
             auto_decompress: bool | None = True,
+            idempotent: bool | None = None,
         ) -> Response:
             if auto_decompress is False and not stream:
                 warnings.warn(
@@ -337,78 +868,102 @@ if BUILD_GCLOUD_REST:
                 )
                 stream = True
 
-            with self.google_api_lock:
-                resp = self.session.get(
+            return await self._send(
+                'GET', lambda: self.session.get(
                     url, headers=headers, timeout=timeout,
                     params=params, stream=stream,
-                )
-            resp.raise_for_status()
-            return resp
+                ),
+                idempotent=idempotent,
+            )
 
         async def patch(
             self, url: str, headers: Mapping[str, str],
             data: bytes | str | None = None, timeout: float = 10,
             params: Mapping[str, int | str] | None = None,
+            idempotent: bool | None = None,
         ) -> Response:
-            with self.google_api_lock:
-                resp = self.session.patch(
+            return await self._send(
+                'PATCH', lambda: self.session.patch(
                     url, data=data, headers=headers,
                     timeout=timeout, params=params,
-                )
-            resp.raise_for_status()
-            return resp
+                ),
+                data=data, idempotent=idempotent,
+            )
 
         async def put(
             self, url: str, headers: Mapping[str, str],
             data: bytes | str | IO[Any], timeout: float = 10,
+            idempotent: bool | None = None,
         ) -> Response:
-            with self.google_api_lock:
-                resp = self.session.put(
+            return await self._send(
+                'PUT', lambda: self.session.put(
                     url, data=data, headers=headers,
                     timeout=timeout,
-                )
-            resp.raise_for_status()
-            return resp
+                ),
+                data=data, idempotent=idempotent,
+            )
 
         async def delete(
             self, url: str, headers: Mapping[str, str],
             params: Mapping[str, int | str] | None = None,
             timeout: float = 10,
+            idempotent: bool | None = None,
         ) -> Response:
-            with self.google_api_lock:
-                resp = self.session.delete(
+            return await self._send(
+                'DELETE', lambda: self.session.delete(
                     url, params=params, headers=headers,
                     timeout=timeout,
-                )
-            resp.raise_for_status()
-            return resp
+                ),
+                idempotent=idempotent,
+            )
 
         async def head(
             self, url: str, headers: Mapping[str, str] | None = None,
             timeout: float = 10,
             params: Mapping[str, int | str] | None = None,
             allow_redirects: bool = False,
+            idempotent: bool | None = None,
         ) -> Response:
-            with self.google_api_lock:
-                resp = self.session.head(
+            return await self._send(
+                'HEAD', lambda: self.session.head(
                     url, params=params, headers=headers,
                     timeout=timeout, allow_redirects=allow_redirects,
-                )
-            resp.raise_for_status()
-            return resp
+                ),
+                idempotent=idempotent,
+            )
 
         async def request(
             self, method: str, url: str, headers: Mapping[str, str],
-            auto_raise_for_status: bool = True, **kwargs: Any,
+            auto_raise_for_status: bool = True,
+            idempotent: bool | None = None, **kwargs: Any,
         ) -> Response:
-            with self.google_api_lock:
-                resp = self.session.request(
+            return await self._send(
+                method, lambda: self.session.request(
                     method, url, headers=headers, **kwargs,
-                )
-            if auto_raise_for_status:
-                resp.raise_for_status()
-            return resp
+                ),
+                data=kwargs.get('data'), idempotent=idempotent,
+                auto_raise_for_status=auto_raise_for_status,
+            )
 
         async def close(self) -> None:
+            if self._registry_key is not None:
+                session = SHARED_SESSIONS.release(
+                    self._registry_key, self._session,
+                )
+                # we no longer hold a reference to the pooled session, so
+                # must neither hand it out nor close it again
+                self._registry_key = None
+                self._session = None
+                if session:
+                    session.close()
+                return
+
+            with self._thread_sessions_lock:
+                thread_sessions = self._thread_sessions
+                self._thread_sessions = []
+            self._local = threading.local()
+            for session in thread_sessions:
+                session.close()
+
             if not self._shared_session and self._session:
                 self._session.close()
@@ -3,6 +3,7 @@ Google Cloud auth via service account file
 """
 import datetime
 import enum
+import functools
 import json
 import os
 import time
@@ -19,6 +20,8 @@ from urllib.parse import urlparse
 
 import cryptography  # pylint: disable=unused-import
 import jwt
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPrivateKey
+from cryptography.hazmat.primitives.serialization import load_pem_private_key
 from tenacity import retry
 from tenacity import retry_if_exception_type
 from tenacity import stop_after_attempt
@@ -26,6 +29,8 @@ from tenacity import wait_random_exponential
 
 from .build_constants import BUILD_GCLOUD_REST
 from .session import AioSession
+from .token_cache import CachedToken
+from .token_cache import TOKEN_CACHE
 # N.B. the cryptography library is required when calling jwt.encrypt() with
 # algorithm='RS256'. It does not need to be imported here, but this allows us
 # to throw this error at load time rather than lazily during normal operations,
@@ -157,6 +162,21 @@ def get_service_data(
         return {}
 
 
+@functools.lru_cache(maxsize=16)
+def load_private_key(private_key: str) -> RSAPrivateKey:
+    """
+    Parse a PEM-encoded RSA private key, such as the one from a service account
+    file.
+
+    Parsing (and validating) the key is far slower than signing with it, so
+    parsed keys are cached rather than re-parsed on every token refresh.
+    """
+    key = load_pem_private_key(private_key.encode('utf-8'), password=None)
+    if not isinstance(key, RSAPrivateKey):
+        raise ValueError('private key is not an RSA key')
+    return key
+
+
 @dataclass
 class TokenResponse:
     value: str
@@ -251,6 +271,25 @@ class BaseToken:
         await self.ensure_token()
         return self.access_token
 
+    async def prewarm(self) -> None:
+        """
+        Acquire a token ahead of time, eg. while starting up, so that the first
+        request made with it does not have to wait for a refresh.
+        """
+        await self.ensure_token()
+
+    @property
+    def cache_key(self) -> str:
+        """
+        Identify the token in the ``TOKEN_CACHE``: tokens with the same key
+        are interchangeable.
+        """
+        return TOKEN_CACHE.key(*self._cache_key_parts())
+
+    def _cache_key_parts(self) -> list[Any]:
+        return [type(self).__name__, self.token_type.value, self.token_uri,
+                self.service_data]
+
     async def ensure_token(self) -> None:
         if self.access_token:
             # Cached token exists
@@ -286,12 +325,24 @@ class BaseToken:
         reraise=True,
     )
     async def acquire_access_token(self, timeout: int = 10) -> None:
-        resp = await self.refresh(timeout=timeout)
+        if TOKEN_CACHE.enabled:
+            # only reuse a cached token while we would not yet pre-emptively
+            # refresh our own
+            cached = await TOKEN_CACHE.fetch(
+                self.cache_key, self.background_refresh_after,
+                lambda: self._refresh_for_cache(timeout=timeout),
+            )
+            resp = TokenResponse(value=cached.value,
+                                 expires_in=cached.expires_in)
+            self.access_token_acquired_at = datetime.datetime.fromtimestamp(
+                cached.acquired_at, datetime.timezone.utc)
+        else:
+            resp = await self.refresh(timeout=timeout)
+            self.access_token_acquired_at = datetime.datetime.now(
+                datetime.timezone.utc)
 
         self.access_token = resp.value
         self.access_token_duration = resp.expires_in
-        self.access_token_acquired_at = datetime.datetime.now(
-            datetime.timezone.utc)
         base_timestamp = self.access_token_acquired_at.timestamp()
         self.access_token_preempt_after = int(
             base_timestamp + (resp.expires_in * self.background_refresh_after))
@@ -299,6 +350,12 @@ class BaseToken:
             base_timestamp + (resp.expires_in * self.force_refresh_after))
         self.acquiring = None
 
+    async def _refresh_for_cache(self, *, timeout: int) -> CachedToken:
+        acquired_at = time.time()
+        resp = await self.refresh(timeout=timeout)
+        return CachedToken(value=resp.value, expires_in=resp.expires_in,
+                           acquired_at=acquired_at)
+
     async def close(self) -> None:
         await self.session.close()
 
@@ -352,6 +409,10 @@ class Token(BaseToken):
             )
         self.delegates = delegates
 
+    def _cache_key_parts(self) -> list[Any]:
+        return [*super()._cache_key_parts(), self.scopes,
+                self.impersonation_uri, self.delegates]
+
     async def _refresh_authorized_user(self, timeout: int) -> TokenResponse:
         payload = urlencode({
             'grant_type': 'refresh_token',
@@ -505,7 +566,7 @@ class Token(BaseToken):
         # N.B. algorithm='RS256' requires an extra 240MB in dependencies...
         assertion = jwt.encode(
             assertion_payload,
-            self.service_data['private_key'],
+            load_private_key(self.service_data['private_key']),
             algorithm='RS256',
         )
         payload = urlencode({
@@ -592,6 +653,10 @@ class IapToken(BaseToken):
                 'authorized user',
             )
 
+    def _cache_key_parts(self) -> list[Any]:
+        return [*super()._cache_key_parts(), self.app_uri,
+                self.service_account]
+
     async def _get_iap_client_id(self, *, timeout: int) -> str:
         """
         Fetch the IAP client ID from the service URI.
@@ -699,7 +764,7 @@ class IapToken(BaseToken):
 
         assertion = jwt.encode(
             assertion_payload,
-            self.service_data['private_key'],
+            load_private_key(self.service_data['private_key']),
             algorithm='RS256',
         )
 
@@ -733,3 +798,15 @@ class IapToken(BaseToken):
             raise Exception(f'unsupported token type {self.token_type}')
 
         return resp
+
+
+async def prewarm_tokens(*tokens: BaseToken) -> None:
+    """
+    Acquire all of the given tokens ahead of time, eg. from a startup hook, so
+    that the first requests made after a deploy do not wait on auth.
+    """
+    if BUILD_GCLOUD_REST:
+        for t in tokens:
+            await t.prewarm()
+    else:
+        await asyncio.gather(*(t.prewarm() for t in tokens))
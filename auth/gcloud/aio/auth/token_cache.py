@@ -0,0 +1,350 @@
+"""
+Process-wide cache of access tokens, shared between ``Token`` instances.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Awaitable
+from collections.abc import Callable
+from dataclasses import asdict
+from dataclasses import dataclass
+from typing import Any
+
+from .build_constants import BUILD_GCLOUD_REST
+
+try:
+    import fcntl
+    HAS_FLOCK = True
+except ImportError:  # pragma: no cover
+    HAS_FLOCK = False
+
+# Selectively load libraries based on the package
+if BUILD_GCLOUD_REST:
+    from time import sleep
+else:
+    from asyncio import sleep  # type: ignore[assignment]
+
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedToken:
+    value: str
+    expires_in: int  # Token TTL in seconds
+    acquired_at: float  # Unix timestamp
+
+    @property
+    def expires_at(self) -> float:
+        return self.acquired_at + self.expires_in
+
+    def is_fresh(self, portion: float, now: float | None = None) -> bool:
+        """
+        Check whether less than ``portion`` of the token's TTL has elapsed.
+        """
+        now = time.time() if now is None else now
+        return now < self.acquired_at + self.expires_in * portion
+
+
+class TokenStore:
+    """
+    Storage backend of a ``TokenCache``.
+
+    Stores which are shared between processes should also implement
+    ``try_lock()`` and ``unlock()``, so that only one process at a time
+    refreshes any given token.
+    """
+
+    def get(self, key: str) -> CachedToken | None:
+        raise NotImplementedError
+
+    def set(self, key: str, token: CachedToken) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def try_lock(self, key: str) -> Any:  # pylint: disable=unused-argument
+        """
+        Attempt to take the refresh lock for key without blocking.
+
+        Returns a handle to pass to ``unlock()``, or ``None`` if the lock is
+        held elsewhere.
+        """
+        return True
+
+    def unlock(self, handle: Any) -> None:
+        pass
+
+
+class MemoryTokenStore(TokenStore):
+    """Keeps cached tokens in memory, for the lifetime of the process."""
+
+    def __init__(self) -> None:
+        self._tokens: dict[str, CachedToken] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> CachedToken | None:
+        with self._lock:
+            token = self._tokens.get(key)
+            if token and token.expires_at <= time.time():
+                del self._tokens[key]
+                return None
+            return token
+
+    def set(self, key: str, token: CachedToken) -> None:
+        with self._lock:
+            self._tokens[key] = token
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._tokens.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tokens.clear()
+
+
+class FileTokenStore(TokenStore):
+    """
+    Persists cached tokens on disk, so that they outlive the process.
+
+    This is meant for short-lived processes, such as cron jobs or CLI tools,
+    which would otherwise fetch a new token on every run. Tokens are written
+    to a directory only readable by the current user, one file per token, and
+    files which are readable by anyone else are ignored.
+
+    On POSIX systems, refreshes are also serialized between processes through
+    ``flock()``, so that concurrent runs do not all hit the token endpoint at
+    once.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        if path is None:
+            cache_home = (os.environ.get('XDG_CACHE_HOME')
+                          or os.path.join(os.path.expanduser('~'), '.cache'))
+            path = os.path.join(cache_home, 'gcloud-aio', 'tokens')
+        self.path = path
+
+    def _file(self, key: str, suffix: str = '.json') -> str:
+        return os.path.join(self.path, f'{key}{suffix}')
+
+    def _ensure_dir(self) -> None:
+        os.makedirs(self.path, mode=0o700, exist_ok=True)
+
+    @staticmethod
+    def _is_private(fd: int) -> bool:
+        st = os.fstat(fd)
+        owned = not hasattr(os, 'getuid') or st.st_uid == os.getuid()
+        return owned and not st.st_mode & 0o077
+
+    def get(self, key: str) -> CachedToken | None:
+        try:
+            fd = os.open(self._file(key), os.O_RDONLY)
+        except OSError:
+            return None
+
+        with os.fdopen(fd, encoding='utf-8') as f:
+            if not self._is_private(fd):
+                log.warning('ignoring cached token with unsafe permissions: '
+                            '%s', self._file(key))
+                return None
+            try:
+                token = CachedToken(**json.load(f))
+            except (TypeError, ValueError):
+                return None
+
+        if token.expires_at <= time.time():
+            self.delete(key)
+            return None
+        return token
+
+    def set(self, key: str, token: CachedToken) -> None:
+        self._ensure_dir()
+        # write to a private temporary file, then atomically move it into
+        # place so readers never see a partial token
+        tmp = self._file(key, f'.{os.getpid()}.{threading.get_ident()}.tmp')
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(asdict(token), f)
+            os.replace(tmp, self._file(key))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def delete(self, key: str) -> None:
+        try:
+            os.unlink(self._file(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self) -> None:
+        try:
+            names = os.listdir(self.path)
+        except FileNotFoundError:
+            return
+        for name in names:
+            if name.endswith('.json'):
+                self.delete(name[:-len('.json')])
+
+    def try_lock(self, key: str) -> Any:
+        if not HAS_FLOCK:
+            return True
+
+        self._ensure_dir()
+        fd = os.open(self._file(key, '.lock'), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return None
+        return fd
+
+    def unlock(self, handle: Any) -> None:
+        if not HAS_FLOCK or handle is True:
+            return
+        fcntl.flock(handle, fcntl.LOCK_UN)
+        os.close(handle)
+
+
+class TokenCache:
+    """
+    Share access tokens between ``Token`` instances using the same
+    credentials.
+
+    Every ``Token`` normally refreshes on its own, so a process with several
+    clients for the same service account will sign and exchange several
+    assertions for what is effectively the same token. Once enabled, tokens
+    are cached by their credential identity, scopes, and impersonation target,
+    and concurrent refreshes for the same key are collapsed into one.
+
+    Sharing is disabled by default; call ``enable()`` before creating any
+    clients to opt in. Passing a ``FileTokenStore`` there additionally
+    persists tokens between runs of the process.
+
+    Attributes:
+        lock_timeout: Seconds to wait for another process to finish refreshing
+            a token before refreshing it regardless. Only applies to stores
+            shared between processes.
+    """
+
+    lock_timeout = 30.
+    lock_poll_interval = 0.05
+
+    def __init__(self, store: TokenStore | None = None) -> None:
+        self.enabled = False
+        self.store = store or MemoryTokenStore()
+        self._lock = threading.Lock()
+        self._refresh_locks: dict[str, threading.Lock] = {}
+        self._inflight: dict[tuple[Any, str], 'asyncio.Task[CachedToken]'] = {}
+
+    def enable(self, store: TokenStore | None = None) -> None:
+        if store is not None:
+            self.store = store
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def clear(self) -> None:
+        self.store.clear()
+
+    @staticmethod
+    def key(*parts: Any) -> str:
+        """
+        Build a cache key from the given identity components.
+
+        Credentials may be part of the identity, so the key is a digest rather
+        than the components themselves.
+        """
+        payload = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    async def fetch(
+        self, key: str, portion: float,
+        refresh: Callable[[], Awaitable[CachedToken]],
+    ) -> CachedToken:
+        """
+        Get the token cached for key, refreshing it first if more than
+        ``portion`` of its TTL has elapsed.
+
+        Only one refresh per key is in flight at any time (per event loop, in
+        ``gcloud-aio``); concurrent callers wait for its result.
+        """
+        cached = self.store.get(key)
+        if cached and cached.is_fresh(portion):
+            return cached
+
+        if BUILD_GCLOUD_REST:
+            with self._refresh_lock(key):
+                # someone else may have refreshed while we were waiting
+                cached = self.store.get(key)
+                if cached and cached.is_fresh(portion):
+                    return cached
+                return await self._refresh(key, portion, refresh)
+
+        inflight_key = (asyncio.get_running_loop(), key)
+        task = self._inflight.get(inflight_key)
+        if task is None or task.done():
+            task = asyncio.ensure_future(
+                self._refresh(key, portion, refresh))
+            self._inflight[inflight_key] = task
+            task.add_done_callback(
+                lambda t: self._forget(inflight_key, t))
+        # shield the shared refresh from any single caller being cancelled
+        return await asyncio.shield(task)
+
+    async def _refresh(
+        self, key: str, portion: float,
+        refresh: Callable[[], Awaitable[CachedToken]],
+    ) -> CachedToken:
+        handle = await self._lock_store(key)
+        try:
+            if handle is not None:
+                # another process may have refreshed while we were waiting
+                cached = self.store.get(key)
+                if cached and cached.is_fresh(portion):
+                    return cached
+
+            token = await refresh()
+            self.store.set(key, token)
+            return token
+        finally:
+            if handle is not None:
+                self.store.unlock(handle)
+
+    async def _lock_store(self, key: str) -> Any:
+        # poll rather than block, so as not to stall the event loop
+        deadline = time.monotonic() + self.lock_timeout
+        while True:
+            handle = self.store.try_lock(key)
+            if handle is not None:
+                return handle
+            if time.monotonic() >= deadline:
+                log.warning('timed out waiting for token refresh lock, '
+                            'refreshing anyway')
+                return None
+            await sleep(  # type: ignore[func-returns-value,misc]
+                self.lock_poll_interval,
+            )
+
+    def _refresh_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._refresh_locks.setdefault(key, threading.Lock())
+
+    def _forget(self, inflight_key: tuple[Any, str],
+                task: 'asyncio.Task[CachedToken]') -> None:
+        if self._inflight.get(inflight_key) is task:
+            del self._inflight[inflight_key]
+
+
+TOKEN_CACHE = TokenCache()
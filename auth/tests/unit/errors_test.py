@@ -0,0 +1,165 @@
+import json
+
+import pytest
+from gcloud.aio.auth.build_constants import BUILD_GCLOUD_REST
+from gcloud.aio.auth.errors import BadRequestError
+from gcloud.aio.auth.errors import decode_error_body
+from gcloud.aio.auth.errors import error_class
+from gcloud.aio.auth.errors import GoogleAPIError
+from gcloud.aio.auth.errors import NotFoundError
+from gcloud.aio.auth.errors import RateLimitedError
+from gcloud.aio.auth.errors import RequestError
+from gcloud.aio.auth.errors import ServerError
+from gcloud.aio.auth.errors import ServiceUnavailableError
+from gcloud.aio.auth.session import AioSession
+
+if BUILD_GCLOUD_REST:
+    from requests import HTTPError as ResponseError
+    REQUEST_INFO = None
+else:
+    import aiohttp
+    from aiohttp import ClientResponseError as ResponseError
+    from multidict import CIMultiDict
+    from yarl import URL
+    REQUEST_INFO = aiohttp.RequestInfo(
+        URL('https://example.com'), 'GET', CIMultiDict(),
+        URL('https://example.com'),
+    )
+
+
+GOOGLE_ERROR = json.dumps({
+    'error': {
+        'code': 404,
+        'message': 'No such object: bucket/name',
+        'status': 'NOT_FOUND',
+        'errors': [{'reason': 'notFound', 'domain': 'global'}],
+    },
+})
+
+
+def make_error(status, body=''):
+    if BUILD_GCLOUD_REST:
+        return error_class(status)('message', body=body)
+    return error_class(status)(None, (), status=status, body=body)
+
+
+class FakeContent:
+    def __init__(self, body: bytes) -> None:
+        self.body = body
+        self.reads = 0
+
+    async def read(self, n: int) -> bytes:
+        self.reads += 1
+        chunk, self.body = self.body[:n], self.body[n:]
+        return chunk
+
+
+class FakeResponse:
+    reason = 'Reason'
+    url = 'https://example.com'
+    charset = encoding = 'utf-8'
+    request_info = REQUEST_INFO
+    history = ()
+
+    def __init__(self, status: int, body: bytes, headers=None) -> None:
+        self.status = self.status_code = status
+        self.headers = headers or {}
+        self.content = FakeContent(body)
+        self.released = False
+
+    def iter_content(self, chunk_size: int):
+        while True:
+            chunk, self.content.body = (self.content.body[:chunk_size],
+                                        self.content.body[chunk_size:])
+            if not chunk:
+                return
+            yield chunk
+
+    def release(self) -> None:
+        self.released = True
+
+    def close(self) -> None:
+        self.released = True
+
+
+@pytest.mark.parametrize('status,kind', [
+    (400, BadRequestError),
+    (404, NotFoundError),
+    (418, RequestError),
+    (429, RateLimitedError),
+    (500, ServerError),
+    (503, ServiceUnavailableError),
+    (302, GoogleAPIError),
+])
+def test_error_class(status, kind):
+    assert error_class(status) is kind
+    assert issubclass(kind, ResponseError)
+
+
+def test_structured_error_is_parsed():
+    error = make_error(404, body=GOOGLE_ERROR)
+    assert error.api_status == 'NOT_FOUND'
+    assert error.api_message == 'No such object: bucket/name'
+    assert error.reasons == ['notFound']
+
+
+def test_oauth_error_is_parsed():
+    body = json.dumps({'error': 'invalid_grant',
+                       'error_description': 'Bad Request'})
+    error = make_error(400, body=body)
+    assert error.api_status == 'invalid_grant'
+    assert error.api_message == 'Bad Request'
+    assert not error.reasons
+
+
+@pytest.mark.parametrize('body', ['', '<html>nope</html>', '[1, 2]',
+                                  GOOGLE_ERROR[:20]])
+def test_unstructured_error(body):
+    error = make_error(500, body=body)
+    assert error.error == {}
+    assert error.api_status is None
+    assert not error.reasons
+
+
+def test_decode_error_body():
+    assert decode_error_body(b'abc', 5) == ('abc', False)
+    assert decode_error_body(b'abcdef', 5) == ('abcde', True)
+    assert decode_error_body(b'\xff', 5) == ('�', False)
+    assert decode_error_body(b'abc', 5, 'no-such-codec') == ('abc', False)
+
+
+@pytest.mark.asyncio
+async def test_session_raises_typed_error():
+    session = AioSession()
+    resp = FakeResponse(404, GOOGLE_ERROR.encode(),
+                        headers={'Retry-After': '3'})
+
+    async def send():
+        return resp
+
+    with pytest.raises(NotFoundError) as e:
+        await session._send('GET', send)  # pylint: disable=protected-access
+
+    assert e.value.status == 404
+    assert e.value.api_status == 'NOT_FOUND'
+    assert e.value.retry_after == 3.
+    assert not e.value.truncated
+    assert 'No such object' in str(e.value)
+    assert resp.released
+
+
+@pytest.mark.asyncio
+async def test_session_reads_bounded_error_body():
+    session = AioSession(error_body_limit=10)
+    resp = FakeResponse(500, b'x' * 1024 * 1024)
+
+    async def send():
+        return resp
+
+    with pytest.raises(ServerError) as e:
+        await session._send('GET', send)  # pylint: disable=protected-access
+
+    assert e.value.body == 'x' * 10
+    assert e.value.truncated
+    # the rest of the body is left unread
+    assert len(resp.content.body) == 1024 * 1024 - 11
@@ -0,0 +1,207 @@
+import email.utils
+import io
+import time
+
+import pytest
+from gcloud.aio.auth.retry import parse_retry_after
+from gcloud.aio.auth.retry import RETRYABLE_EXCEPTIONS
+from gcloud.aio.auth.retry import RetryBudget
+from gcloud.aio.auth.retry import RetryPolicy
+from gcloud.aio.auth.session import AioSession
+
+
+class FakeResponse:
+    def __init__(self, status: int, headers=None) -> None:
+        self.status = status
+        self.status_code = status
+        self.ok = status < 400
+        self.headers = headers or {}
+        self.released = False
+
+    def release(self) -> None:
+        self.released = True
+
+    def close(self) -> None:
+        self.released = True
+
+
+def make_send(*outcomes):
+    calls = []
+
+    async def send():
+        outcome = outcomes[len(calls)]
+        calls.append(outcome)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+    return send, calls
+
+
+def test_backoff_is_capped_and_jittered():
+    policy = RetryPolicy(initial_backoff=1., multiplier=2., max_backoff=5.)
+    for attempt, ceiling in ((1, 1.), (2, 2.), (3, 4.), (4, 5.), (10, 5.)):
+        for _ in range(20):
+            assert 0. <= policy.backoff(attempt) <= ceiling
+
+
+def test_backoff_honours_retry_after():
+    policy = RetryPolicy(initial_backoff=0., max_backoff=10.)
+    assert policy.backoff(1, retry_after='7') == 7.
+    assert policy.backoff(1, retry_after='garbage') == 0.
+    # the server does not get to hold us up indefinitely
+    assert policy.backoff(1, retry_after='3600') == 10.
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('') is None
+    assert parse_retry_after('3') == 3.
+    assert parse_retry_after('-3') == 0.
+    assert parse_retry_after('not a date') is None
+
+    future = email.utils.formatdate(time.time() + 60, usegmt=True)
+    assert 55. < parse_retry_after(future) <= 60.
+
+    past = email.utils.formatdate(time.time() - 60, usegmt=True)
+    assert parse_retry_after(past) == 0.
+
+
+def test_budget_throttles_retries():
+    budget = RetryBudget(max_tokens=10., token_ratio=1.)
+    assert budget.allows_retry
+
+    for _ in range(5):
+        budget.record_failure()
+    assert not budget.allows_retry
+
+    budget.record_success()
+    assert budget.allows_retry
+
+    for _ in range(100):
+        budget.record_success()
+    assert budget.tokens == 10.
+
+
+def test_budget_rejects_invalid_config():
+    with pytest.raises(ValueError):
+        RetryBudget(max_tokens=0)
+    with pytest.raises(ValueError):
+        RetryBudget(token_ratio=0)
+
+
+def test_idempotency():
+    policy = RetryPolicy()
+    assert policy.is_idempotent('GET', None)
+    assert policy.is_idempotent('put', None)
+    assert not policy.is_idempotent('POST', None)
+    assert not policy.is_idempotent('PATCH', None)
+    assert policy.is_idempotent('POST', True)
+    assert not policy.is_idempotent('GET', False)
+
+
+def test_replayable():
+    assert RetryPolicy.is_replayable(None)
+    assert RetryPolicy.is_replayable(b'data')
+    assert RetryPolicy.is_replayable('data')
+    assert not RetryPolicy.is_replayable(io.BytesIO(b'data'))
+
+
+def test_can_retry_respects_max_attempts():
+    policy = RetryPolicy(max_attempts=3)
+    assert policy.can_retry(1)
+    assert policy.can_retry(2)
+    assert not policy.can_retry(3)
+
+
+@pytest.mark.asyncio
+async def test_session_retries_transient_status():
+    policy = RetryPolicy(initial_backoff=0.)
+    session = AioSession(retry_policy=policy)
+    first, second = FakeResponse(503), FakeResponse(200)
+    send, calls = make_send(first, second)
+
+    resp = await session._send(  # pylint: disable=protected-access
+        'GET', send, auto_raise_for_status=False,
+    )
+
+    assert resp is second
+    assert len(calls) == 2
+    assert first.released
+    assert not second.released
+
+
+@pytest.mark.asyncio
+async def test_session_retries_connection_errors():
+    policy = RetryPolicy(initial_backoff=0., max_attempts=2)
+    session = AioSession(retry_policy=policy)
+    error = RETRYABLE_EXCEPTIONS[0]()
+    send, calls = make_send(error, error)
+
+    with pytest.raises(RETRYABLE_EXCEPTIONS[0]):
+        await session._send(  # pylint: disable=protected-access
+            'GET', send, auto_raise_for_status=False,
+        )
+
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_session_does_not_retry_non_idempotent():
+    policy = RetryPolicy(initial_backoff=0.)
+    session = AioSession(retry_policy=policy)
+
+    send, calls = make_send(FakeResponse(503), FakeResponse(200))
+    resp = await session._send(  # pylint: disable=protected-access
+        'POST', send, auto_raise_for_status=False,
+    )
+    assert resp.status == 503
+    assert len(calls) == 1
+
+    send, calls = make_send(FakeResponse(503), FakeResponse(200))
+    resp = await session._send(  # pylint: disable=protected-access
+        'POST', send, idempotent=True, auto_raise_for_status=False,
+    )
+    assert resp.status == 200
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_session_does_not_retry_streams():
+    policy = RetryPolicy(initial_backoff=0.)
+    session = AioSession(retry_policy=policy)
+    send, calls = make_send(FakeResponse(503), FakeResponse(200))
+
+    resp = await session._send(  # pylint: disable=protected-access
+        'PUT', send, data=io.BytesIO(b'data'), auto_raise_for_status=False,
+    )
+
+    assert resp.status == 503
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_session_without_policy_does_not_retry():
+    session = AioSession()
+    send, calls = make_send(FakeResponse(503), FakeResponse(200))
+
+    resp = await session._send(  # pylint: disable=protected-access
+        'GET', send, auto_raise_for_status=False,
+    )
+
+    assert resp.status == 503
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_session_records_success_in_budget():
+    budget = RetryBudget(max_tokens=10., token_ratio=1.)
+    budget.tokens = 5.
+    session = AioSession(retry_policy=RetryPolicy(budget=budget))
+    send, _ = make_send(FakeResponse(200))
+
+    await session._send(  # pylint: disable=protected-access
+        'GET', send, auto_raise_for_status=False,
+    )
+
+    assert budget.tokens == 6.
@@ -1,6 +1,13 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 from gcloud.aio.auth.build_constants import BUILD_GCLOUD_REST
 from gcloud.aio.auth.session import AioSession
+from gcloud.aio.auth.session import PoolPolicy
+from gcloud.aio.auth.session import PoolStats
+from gcloud.aio.auth.session import SHARED_SESSIONS
 
 if BUILD_GCLOUD_REST:
     import requests
@@ -23,6 +30,11 @@ else:
     from aiohttp import ClientSession as Session
 
 
+class FakeResponse:
+    ok = True
+    status = status_code = 200
+
+
 @pytest.mark.asyncio
 async def test_unmanaged_session():
     async with Session() as session:
@@ -44,3 +56,187 @@ async def test_managed_session():
     await gcloud_session.close()
 
     assert gcloud_session._session.closed  # pylint: disable=protected-access
+
+
+def test_pool_policy_connector_kwargs():
+    kwargs = PoolPolicy().connector_kwargs()
+    assert kwargs['limit'] == 100
+    assert kwargs['keepalive_timeout'] == 15.
+    assert 'happy_eyeballs_delay' not in kwargs
+
+    kwargs = PoolPolicy(
+        force_close=True, happy_eyeballs_delay=None,
+    ).connector_kwargs()
+    assert kwargs['force_close']
+    assert 'keepalive_timeout' not in kwargs
+    assert kwargs['happy_eyeballs_delay'] is None
+
+
+def test_pool_stats_queue_wait():
+    queue = PoolStats().queue
+    started_at = queue.started()
+    assert queue.waiting == 1
+    queue.finished(started_at - 2)
+
+    assert queue.waiting == 0
+    assert queue.total == 1
+    assert queue.max_wait >= 2
+    assert queue.total_wait == queue.max_wait
+
+
+def test_pool_policy_thread_mode():
+    with pytest.raises(ValueError):
+        PoolPolicy(thread_mode='per_request')
+
+
+@pytest.mark.asyncio
+async def test_managed_session_pool_policy():
+    policy = PoolPolicy(limit=7, limit_per_host=3)
+    gcloud_session = AioSession(pool_policy=policy)
+    session = gcloud_session.session
+    if BUILD_GCLOUD_REST:
+        adapter = session.get_adapter('https://')
+        assert adapter._pool_maxsize == 3  # pylint: disable=protected-access
+    else:
+        assert session.connector.limit == 7
+        assert session.connector.limit_per_host == 3
+    await gcloud_session.close()
+
+
+@pytest.fixture(scope='function')
+def shared_sessions():
+    SHARED_SESSIONS.enable()
+    yield SHARED_SESSIONS
+    SHARED_SESSIONS.disable()
+
+
+@pytest.mark.asyncio
+async def test_shared_session_refcount(
+        shared_sessions,  # pylint: disable=redefined-outer-name
+):
+    first = AioSession()
+    second = AioSession()
+    assert first.session is second.session
+    assert first.pool_stats is second.pool_stats
+    assert len(shared_sessions) == 1
+
+    # differing connection settings get their own session
+    other = AioSession(verify_ssl=False)
+    assert other.session is not first.session
+    assert len(shared_sessions) == 2
+    await other.close()
+
+    session = first.session
+    await first.close()
+    assert len(shared_sessions) == 1
+    if not BUILD_GCLOUD_REST:
+        assert not session.closed
+
+    await second.close()
+    assert len(shared_sessions) == 0
+    if not BUILD_GCLOUD_REST:
+        assert session.closed
+
+
+@pytest.mark.asyncio
+async def test_shared_session_close_twice(
+        shared_sessions,  # pylint: disable=redefined-outer-name
+):
+    first = AioSession()
+    second = AioSession()
+    session = first.session
+    assert second.session is session
+
+    # eg. leaving `async with` and then closing explicitly
+    await first.close()
+    await first.close()
+    assert len(shared_sessions) == 1
+    if not BUILD_GCLOUD_REST:
+        assert not session.closed
+
+    await second.close()
+    assert len(shared_sessions) == 0
+    if not BUILD_GCLOUD_REST:
+        assert session.closed
+
+
+@pytest.mark.asyncio
+async def test_shared_session_explicit_session_unaffected(
+        shared_sessions,  # pylint: disable=redefined-outer-name
+):
+    async with Session() as session:
+        gcloud_session = AioSession(session=session)
+        assert gcloud_session.session is session
+        assert len(shared_sessions) == 0
+        await gcloud_session.close()
+
+        assert not session.closed
+
+
+@pytest.mark.skipif(not BUILD_GCLOUD_REST,
+                    reason='only sync sessions can be per-thread')
+@pytest.mark.asyncio
+async def test_session_per_thread(
+        shared_sessions,  # pylint: disable=redefined-outer-name
+):
+    gcloud_session = AioSession(
+        pool_policy=PoolPolicy(thread_mode='per_thread'),
+    )
+    barrier = threading.Barrier(3)
+
+    def get_session():
+        # keep every worker busy so that each one runs in its own thread
+        barrier.wait()
+        return gcloud_session.session
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        sessions = list(pool.map(lambda _: get_session(), range(3)))
+
+    assert len({id(session) for session in sessions}) == 3
+    main = gcloud_session.session
+    assert gcloud_session.session is main
+    assert main not in sessions
+    assert len(shared_sessions) == 0
+
+    closed = []
+    for session in sessions:
+        session.close = lambda s=session: closed.append(s)
+
+    await gcloud_session.close()
+    assert {id(session) for session in closed} >= {
+        id(session) for session in sessions
+    }
+
+
+@pytest.mark.skipif(not BUILD_GCLOUD_REST,
+                    reason='only sync sessions use the global lock')
+@pytest.mark.parametrize('mode,concurrency', [
+    ('shared', 2),
+    ('serialized', 1),
+])
+@pytest.mark.asyncio
+async def test_thread_mode_serialized(mode, concurrency):
+    gcloud_session = AioSession(pool_policy=PoolPolicy(thread_mode=mode))
+    lock = threading.Lock()
+    active = [0]
+    peak = [0]
+
+    def send():
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        # give the other thread a chance to start its request
+        time.sleep(0.1)
+        with lock:
+            active[0] -= 1
+        return FakeResponse()
+
+    def request(_):
+        return gcloud_session._send(  # pylint: disable=protected-access
+            'GET', send, auto_raise_for_status=False,
+        )
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        list(pool.map(request, range(2)))
+
+    assert peak[0] == concurrency
@@ -0,0 +1,258 @@
+import io
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from gcloud.aio.auth import BUILD_GCLOUD_REST
+from gcloud.aio.auth import token
+from gcloud.aio.auth.token_cache import CachedToken
+from gcloud.aio.auth.token_cache import FileTokenStore
+from gcloud.aio.auth.token_cache import MemoryTokenStore
+from gcloud.aio.auth.token_cache import TOKEN_CACHE
+from gcloud.aio.auth.token_cache import TokenCache
+
+if BUILD_GCLOUD_REST:
+    pass
+else:
+    import asyncio
+
+
+SERVICE_DATA = {
+    'type': 'service_account',
+    'project_id': 'random-project-123',
+    'private_key': 'not-a-key',
+    'client_email': 'test@random-project-123.iam.gserviceaccount.com',
+    'token_uri': 'https://oauth2.googleapis.com/token',
+}
+
+
+@pytest.fixture(scope='function')
+def token_cache():
+    TOKEN_CACHE.enable()
+    yield TOKEN_CACHE
+    TOKEN_CACHE.disable()
+    TOKEN_CACHE.clear()
+
+
+def make_token(**kwargs):
+    service_file = io.StringIO(json.dumps(SERVICE_DATA))
+    return token.Token(service_file=service_file, **kwargs)
+
+
+def test_cached_token_freshness():
+    cached = CachedToken(value='token', expires_in=100, acquired_at=1000.)
+    assert cached.expires_at == 1100.
+    assert cached.is_fresh(0.5, now=1049.)
+    assert not cached.is_fresh(0.5, now=1050.)
+
+
+def test_memory_store_drops_expired_tokens():
+    store = MemoryTokenStore()
+    store.set('fresh', CachedToken('a', 100, time.time()))
+    store.set('expired', CachedToken('b', 100, time.time() - 101))
+
+    assert store.get('fresh').value == 'a'
+    assert store.get('expired') is None
+    assert store.get('missing') is None
+
+
+def test_key_depends_on_identity():
+    first = make_token(scopes=['a'])
+    assert first.cache_key == make_token(scopes=['a']).cache_key
+    assert first.cache_key != make_token(scopes=['b']).cache_key
+    assert first.cache_key != make_token(
+        scopes=['a'], target_principal='other@example.com',
+    ).cache_key
+    # the key must not leak the credentials themselves
+    assert SERVICE_DATA['private_key'] not in first.cache_key
+
+
+@pytest.mark.asyncio
+async def test_tokens_share_cached_refresh(
+        token_cache,  # pylint: disable=redefined-outer-name,unused-argument
+):
+    calls = []
+
+    async def refresh(timeout):  # pylint: disable=unused-argument
+        calls.append(1)
+        return token.TokenResponse(value=f'token-{len(calls)}',
+                                   expires_in=3600)
+
+    first, second = make_token(scopes=['a']), make_token(scopes=['a'])
+    other = make_token(scopes=['b'])
+    for t in (first, second, other):
+        t.refresh = refresh
+
+    assert await first.get() == 'token-1'
+    assert await second.get() == 'token-1'
+    assert await other.get() == 'token-2'
+    assert len(calls) == 2
+    assert (second.access_token_refresh_after
+            == first.access_token_refresh_after)
+
+
+@pytest.mark.asyncio
+async def test_stale_cached_token_is_refreshed(
+        token_cache,  # pylint: disable=redefined-outer-name
+):
+    t = make_token(scopes=['a'])
+    token_cache.store.set(t.cache_key, CachedToken(
+        value='stale', expires_in=3600, acquired_at=time.time() - 3000,
+    ))
+
+    async def refresh(timeout):  # pylint: disable=unused-argument
+        return token.TokenResponse(value='fresh', expires_in=3600)
+    t.refresh = refresh
+
+    assert await t.get() == 'fresh'
+    assert token_cache.store.get(t.cache_key).value == 'fresh'
+
+
+@pytest.mark.asyncio
+async def test_prewarm_tokens():
+    t = make_token(scopes=['a'])
+
+    async def refresh(timeout):  # pylint: disable=unused-argument
+        return token.TokenResponse(value='warm', expires_in=3600)
+    t.refresh = refresh
+
+    await token.prewarm_tokens(t)
+    assert t.access_token == 'warm'
+
+
+def test_file_store_roundtrip(tmp_path):
+    store = FileTokenStore(str(tmp_path / 'tokens'))
+    assert store.get('key') is None
+
+    cached = CachedToken('token', 3600, time.time())
+    store.set('key', cached)
+    assert store.get('key') == cached
+    assert os.stat(tmp_path / 'tokens').st_mode & 0o777 == 0o700
+    assert os.stat(tmp_path / 'tokens' / 'key.json').st_mode & 0o777 == 0o600
+
+    store.clear()
+    assert store.get('key') is None
+
+
+def test_file_store_ignores_unsafe_files(tmp_path):
+    store = FileTokenStore(str(tmp_path))
+    store.set('key', CachedToken('token', 3600, time.time()))
+    os.chmod(tmp_path / 'key.json', 0o644)
+    assert store.get('key') is None
+
+
+def test_file_store_ignores_garbage_and_expired(tmp_path):
+    store = FileTokenStore(str(tmp_path))
+    store.set('expired', CachedToken('token', 10, time.time() - 11))
+    assert store.get('expired') is None
+    assert not (tmp_path / 'expired.json').exists()
+
+    store.set('garbage', CachedToken('token', 3600, time.time()))
+    (tmp_path / 'garbage.json').write_text('{"nope": 1}')
+    assert store.get('garbage') is None
+
+
+def test_file_store_lock_is_exclusive(tmp_path):
+    store = FileTokenStore(str(tmp_path))
+    handle = store.try_lock('key')
+    assert handle is not None
+    assert store.try_lock('key') is None
+    assert store.try_lock('other') is not None
+
+    store.unlock(handle)
+    handle = store.try_lock('key')
+    assert handle is not None
+    store.unlock(handle)
+
+
+@pytest.mark.asyncio
+async def test_file_store_skips_refresh(tmp_path):
+    cache = TokenCache(FileTokenStore(str(tmp_path)))
+    cache.enable()
+    calls = []
+
+    async def refresh():
+        calls.append(1)
+        return CachedToken('token', 3600, time.time())
+
+    assert (await cache.fetch('key', 0.5, refresh)).value == 'token'
+
+    # eg. the next run of the same cron job
+    cache = TokenCache(FileTokenStore(str(tmp_path)))
+    assert (await cache.fetch('key', 0.5, refresh)).value == 'token'
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_lock_timeout_refreshes_anyway(tmp_path):
+    store = FileTokenStore(str(tmp_path))
+    cache = TokenCache(store)
+    cache.lock_timeout = 0.1
+
+    async def refresh():
+        return CachedToken('token', 3600, time.time())
+
+    handle = store.try_lock('key')
+    try:
+        assert (await cache.fetch('key', 0.5, refresh)).value == 'token'
+    finally:
+        store.unlock(handle)
+
+
+if BUILD_GCLOUD_REST:
+    def test_concurrent_refreshes_are_collapsed():
+        cache = TokenCache()
+        calls = []
+        barrier = threading.Barrier(4)
+
+        def refresh():
+            calls.append(1)
+            time.sleep(0.05)
+            return CachedToken('token', 3600, time.time())
+
+        def fetch():
+            barrier.wait()
+            return cache.fetch('key', 0.5, refresh).value
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            values = list(pool.map(lambda _: fetch(), range(4)))
+
+        assert values == ['token'] * 4
+        assert len(calls) == 1
+else:
+    @pytest.mark.asyncio
+    async def test_concurrent_refreshes_are_collapsed():
+        cache = TokenCache()
+        calls = []
+        future = asyncio.get_running_loop().create_future()
+
+        async def refresh():
+            calls.append(1)
+            return await future
+
+        tasks = [asyncio.create_task(cache.fetch('key', 0.5, refresh))
+                 for _ in range(4)]
+        await asyncio.sleep(0)
+        future.set_result(CachedToken('token', 3600, time.time()))
+
+        assert [(await t).value for t in tasks] == ['token'] * 4
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_cancel_refresh():
+        cache = TokenCache()
+        future = asyncio.get_running_loop().create_future()
+
+        async def refresh():
+            return await future
+
+        first = asyncio.create_task(cache.fetch('key', 0.5, refresh))
+        second = asyncio.create_task(cache.fetch('key', 0.5, refresh))
+        await asyncio.sleep(0)
+        first.cancel()
+        future.set_result(CachedToken('token', 3600, time.time()))
+
+        assert (await second).value == 'token'
@@ -5,6 +5,8 @@ import json
 from unittest import mock
 
 import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
 from gcloud.aio.auth import BUILD_GCLOUD_REST
 from gcloud.aio.auth import token
 
@@ -220,3 +222,19 @@ else:
                 ValueError, match='unsupported credential_source type',
         ):
             await t._get_subject_token(invalid_source, timeout=10)
+
+
+def test_load_private_key_is_cached():
+    pem = rsa.generate_private_key(
+        public_exponent=65537, key_size=1024,
+    ).private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+
+    key = token.load_private_key(pem)
+    assert token.load_private_key(pem) is key
+
+    with pytest.raises(ValueError):
+        token.load_private_key('not a key')
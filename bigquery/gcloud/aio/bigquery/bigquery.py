@@ -8,6 +8,8 @@ from typing import IO
 
 from gcloud.aio.auth import AioSession  # pylint: disable=no-name-in-module
 from gcloud.aio.auth import BUILD_GCLOUD_REST  # pylint: disable=no-name-in-module
+from gcloud.aio.auth import PoolPolicy  # pylint: disable=no-name-in-module
+from gcloud.aio.auth import RetryPolicy  # pylint: disable=no-name-in-module
 from gcloud.aio.auth import Token  # pylint: disable=no-name-in-module
 
 # Selectively load libraries based on the package
@@ -68,10 +70,16 @@ class BigqueryBase:
             service_file: str | IO[AnyStr] | None = None,
             session: Session | None = None, token: Token | None = None,
             api_root: str | None = None,
-            api_is_dev: bool | None = None
+            api_is_dev: bool | None = None,
+            *,
+            pool_policy: PoolPolicy | None = None,
+            retry_policy: RetryPolicy | None = None,
     ) -> None:
         self._api_is_dev, self._api_root = init_api_root(api_root, api_is_dev)
-        self.session = AioSession(session)
+        self.session = AioSession(
+            session, pool_policy=pool_policy,
+            retry_policy=retry_policy,
+        )
         self.token = token or Token(
             service_file=service_file, scopes=SCOPES,
             session=self.session.session,  # type: ignore[arg-type]
@@ -107,6 +115,7 @@ class BigqueryBase:
     async def _post_json(
             self, url: str, body: dict[str, Any], session: Session | None,
             timeout: int, params: dict[str, Any] | None = None,
+            idempotent: bool | None = None,
     ) -> dict[str, Any]:
         payload = json.dumps(body).encode('utf-8')
 
@@ -118,7 +127,8 @@ class BigqueryBase:
 
         s = AioSession(session) if session else self.session
         resp = await s.post(url, data=payload, headers=headers,
-                            timeout=timeout, params=params or {})
+                            timeout=timeout, params=params or {},
+                            idempotent=idempotent)
         data: dict[str, Any] = await resp.json()
         return data
 
@@ -3,6 +3,8 @@ from typing import AnyStr
 from typing import IO
 
 from gcloud.aio.auth import BUILD_GCLOUD_REST  # pylint: disable=no-name-in-module
+from gcloud.aio.auth import PoolPolicy  # pylint: disable=no-name-in-module
+from gcloud.aio.auth import RetryPolicy  # pylint: disable=no-name-in-module
 from gcloud.aio.auth import Token  # pylint: disable=no-name-in-module
 
 from .bigquery import BigqueryBase
@@ -21,11 +23,15 @@ class Dataset(BigqueryBase):
             service_file: str | IO[AnyStr] | None = None,
             session: Session | None = None, token: Token | None = None,
             api_root: str | None = None,
+            *,
+            pool_policy: PoolPolicy | None = None,
+            retry_policy: RetryPolicy | None = None,
     ) -> None:
         self.dataset_name = dataset_name
         super().__init__(
             project=project, service_file=service_file,
             session=session, token=token, api_root=api_root,
+            pool_policy=pool_policy, retry_policy=retry_policy,
         )
 
     # https://cloud.google.com/bigquery/docs/reference/rest/v2/tables/list
@@ -3,6 +3,8 @@ from typing import AnyStr
 from typing import IO
 
 from gcloud.aio.auth import BUILD_GCLOUD_REST  # pylint: disable=no-name-in-module
+from gcloud.aio.auth import PoolPolicy  # pylint: disable=no-name-in-module
+from gcloud.aio.auth import RetryPolicy  # pylint: disable=no-name-in-module
 from gcloud.aio.auth import Token  # pylint: disable=no-name-in-module
 
 from .bigquery import BigqueryBase
@@ -22,12 +24,16 @@ class Job(BigqueryBase):
             session: Session | None = None, token: Token | None = None,
             api_root: str | None = None,
             location: str | None = None,
+            *,
+            pool_policy: PoolPolicy | None = None,
+            retry_policy: RetryPolicy | None = None,
     ) -> None:
         self.job_id = job_id
         self.location = location
         super().__init__(
             project=project, service_file=service_file,
             session=session, token=token, api_root=api_root,
+            pool_policy=pool_policy, retry_policy=retry_policy,
         )
 
     @staticmethod
@@ -8,6 +8,8 @@ from typing import IO
 
 from gcloud.aio.auth import AioSession  # pylint: disable=no-name-in-module
 from gcloud.aio.auth import BUILD_GCLOUD_REST  # pylint: disable=no-name-in-module
+from gcloud.aio.auth import PoolPolicy  # pylint: disable=no-name-in-module
+from gcloud.aio.auth import RetryPolicy  # pylint: disable=no-name-in-module
 from gcloud.aio.auth import Token  # pylint: disable=no-name-in-module
 
 from .bigquery import BigqueryBase
@@ -30,12 +32,16 @@ class Table(BigqueryBase):
             service_file: str | IO[AnyStr] | None = None,
             session: Session | None = None, token: Token | None = None,
             api_root: str | None = None,
+            *,
+            pool_policy: PoolPolicy | None = None,
+            retry_policy: RetryPolicy | None = None,
     ) -> None:
         self.dataset_name = dataset_name
         self.table_name = table_name
         super().__init__(
             project=project, service_file=service_file,
             session=session, token=token, api_root=api_root,
+            pool_policy=pool_policy, retry_policy=retry_policy,
         )
 
     @staticmethod
@@ -270,7 +276,10 @@ class Table(BigqueryBase):
             template_suffix=template_suffix,
             insert_id_fn=insert_id_fn or self._mk_unique_insert_id,
         )
-        return await self._post_json(url, body, session, timeout)
+        # every row carries an insertId, which BigQuery uses to de-duplicate
+        # rows sent more than once
+        return await self._post_json(url, body, session, timeout,
+                                     idempotent=True)
 
     # https://cloud.google.com/bigquery/docs/reference/rest/v2/jobs/insert
     # https://cloud.google.com/bigquery/docs/reference/rest/v2/Job#jobconfigurationtablecopy
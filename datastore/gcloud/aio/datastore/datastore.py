@@ -7,6 +7,8 @@ from typing import IO
 
 from gcloud.aio.auth import AioSession  # pylint: disable=no-name-in-module
 from gcloud.aio.auth import BUILD_GCLOUD_REST  # pylint: disable=no-name-in-module
+from gcloud.aio.auth import PoolPolicy  # pylint: disable=no-name-in-module
+from gcloud.aio.auth import RetryPolicy  # pylint: disable=no-name-in-module
 from gcloud.aio.auth import Token  # pylint: disable=no-name-in-module
 
 from .constants import Consistency
@@ -75,10 +77,16 @@ class Datastore:
             token: Token | None = None,
             api_root: str | None = None,
             api_is_dev: bool | None = None,
+            *,
+            pool_policy: PoolPolicy | None = None,
+            retry_policy: RetryPolicy | None = None,
     ) -> None:
         self._api_is_dev, self._api_root = init_api_root(api_root, api_is_dev)
         self.namespace = namespace
-        self.session = AioSession(session)
+        self.session = AioSession(
+            session, pool_policy=pool_policy,
+            retry_policy=retry_policy,
+        )
         self.token = token or Token(
             service_file=service_file, scopes=SCOPES,
             session=self.session.session,  # type: ignore[arg-type]
@@ -142,6 +150,7 @@ class Datastore:
         additional_request_fields: dict[str, Any] | None = None,
         session: Session | None = None,
         timeout: float = 10.,
+        idempotent: bool | None = None,
     ) -> Any:
         merged: dict[str, Any] = {
             **(body or {}), **(additional_request_fields or {}),
@@ -154,9 +163,11 @@ class Datastore:
             headers['Content-Length'] = str(len(payload))
             return await s.post(
                 url, data=payload, headers=headers, timeout=timeout,
+                idempotent=idempotent,
             )
         headers['Content-Length'] = '0'
-        return await s.post(url, headers=headers, timeout=timeout)
+        return await s.post(url, headers=headers, timeout=timeout,
+                            idempotent=idempotent)
 
     # TODO: support mutations w version specifiers, return new version (commit)
     @classmethod
@@ -307,7 +318,7 @@ class Datastore:
             url,
             {'keys': [k.to_repr() for k in keys], 'readOptions': read_options},
             additional_request_fields=additional_request_fields,
-            session=session, timeout=timeout,
+            session=session, timeout=timeout, idempotent=True,
         )
         data: dict[str, Any] = await resp.json()
         return self._build_lookup_result(data)
@@ -366,7 +377,7 @@ class Datastore:
             url,
             {'databaseId': database_id, 'keys': [k.to_repr() for k in keys]},
             additional_request_fields=additional_request_fields,
-            session=session, timeout=timeout,
+            session=session, timeout=timeout, idempotent=True,
         )
 
     # https://cloud.google.com/datastore/docs/reference/data/rest/v1/projects/rollback
@@ -381,7 +392,7 @@ class Datastore:
         await self._post(
             url, {'transaction': transaction},
             additional_request_fields=additional_request_fields,
-            session=session, timeout=timeout,
+            session=session, timeout=timeout, idempotent=True,
         )
 
     # https://cloud.google.com/datastore/docs/reference/data/rest/v1/projects/runQuery
@@ -415,7 +426,7 @@ class Datastore:
         resp = await self._post(
             url, body,
             additional_request_fields=additional_request_fields,
-            session=session, timeout=timeout,
+            session=session, timeout=timeout, idempotent=True,
         )
         data: dict[str, Any] = await resp.json()
         return self.query_result_kind.from_repr(data)
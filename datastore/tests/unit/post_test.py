@@ -24,6 +24,7 @@ class TestPost:
                 'Content-Type': 'application/json',
                 'Content-Length': '0'},
             timeout=10.,
+            idempotent=None,
         )
         assert result is mock_resp
 
@@ -47,6 +48,7 @@ class TestPost:
                 'Content-Length': str(len(expected_payload)),
             },
             timeout=10.,
+            idempotent=None,
         )
         assert result is mock_resp
 
@@ -73,6 +75,7 @@ class TestPost:
                 'Content-Length': str(len(expected_payload)),
             },
             timeout=10.,
+            idempotent=None,
         )
         assert result is mock_resp
 
@@ -102,6 +105,7 @@ class TestPost:
                 'Content-Length': str(len(expected_payload)),
             },
             timeout=10.,
+            idempotent=None,
         )
 
     @staticmethod
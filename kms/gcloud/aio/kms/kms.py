@@ -9,6 +9,8 @@ from typing import IO
 
 from gcloud.aio.auth import AioSession  # pylint: disable=no-name-in-module
 from gcloud.aio.auth import BUILD_GCLOUD_REST  # pylint: disable=no-name-in-module
+from gcloud.aio.auth import PoolPolicy  # pylint: disable=no-name-in-module
+from gcloud.aio.auth import RetryPolicy  # pylint: disable=no-name-in-module
 from gcloud.aio.auth import Token  # pylint: disable=no-name-in-module
 
 # Selectively load libraries based on the package
@@ -51,6 +53,9 @@ class KMS:
             token: Token | None = None,
             api_root: str | None = None,
             api_is_dev: bool | None = None,
+            *,
+            pool_policy: PoolPolicy | None = None,
+            retry_policy: RetryPolicy | None = None,
     ) -> None:
         self._api_is_dev, self._api_root = init_api_root(api_root, api_is_dev)
         self._api_root = (
@@ -58,7 +63,10 @@ class KMS:
             f'keyRings/{keyring}/cryptoKeys/{keyname}'
         )
 
-        self.session = AioSession(session)
+        self.session = AioSession(
+            session, pool_policy=pool_policy,
+            retry_policy=retry_policy,
+        )
         self.token = token or Token(
             service_file=service_file,
             session=self.session.session,  # type: ignore[arg-type]
@@ -86,7 +94,8 @@ class KMS:
         }).encode('utf-8')
 
         s = AioSession(session) if session else self.session
-        resp = await s.post(url, headers=await self.headers(), data=body)
+        resp = await s.post(url, headers=await self.headers(), data=body,
+                            idempotent=True)
 
         plaintext: str = (await resp.json())['plaintext']
         return plaintext
@@ -102,7 +111,8 @@ class KMS:
         }).encode('utf-8')
 
         s = AioSession(session) if session else self.session
-        resp = await s.post(url, headers=await self.headers(), data=body)
+        resp = await s.post(url, headers=await self.headers(), data=body,
+                            idempotent=True)
 
         ciphertext: str = (await resp.json())['ciphertext']
         return ciphertext
@@ -7,6 +7,8 @@ from typing import IO
 
 from gcloud.aio.auth import AioSession  # pylint: disable=no-name-in-module
 from gcloud.aio.auth import BUILD_GCLOUD_REST  # pylint: disable=no-name-in-module
+from gcloud.aio.auth import PoolPolicy  # pylint: disable=no-name-in-module
+from gcloud.aio.auth import RetryPolicy  # pylint: disable=no-name-in-module
 from gcloud.aio.auth import Token  # pylint: disable=no-name-in-module
 
 from .utils import PubsubMessage
@@ -50,10 +52,15 @@ class PublisherClient:
             token: Token | None = None,
             api_root: str | None = None,
             api_is_dev: bool | None = None,
+            pool_policy: PoolPolicy | None = None,
+            retry_policy: RetryPolicy | None = None,
     ) -> None:
         self._api_is_dev, self._api_root = init_api_root(api_root, api_is_dev)
 
-        self.session = AioSession(session, verify_ssl=not self._api_is_dev)
+        self.session = AioSession(
+            session, verify_ssl=not self._api_is_dev,
+            pool_policy=pool_policy, retry_policy=retry_policy,
+        )
         self.token = token or Token(
             service_file=service_file, scopes=SCOPES,
             session=self.session.session,  # type: ignore[arg-type]
@@ -154,10 +161,12 @@ class PublisherClient:
         headers = await self._headers()
         headers['Content-Length'] = str(len(payload))
 
+        # Pub/Sub delivery is at-least-once, so retrying a publish whose
+        # response was lost at worst produces a duplicate delivery
         s = AioSession(session) if session else self.session
         resp = await s.post(
             url, data=payload, headers=headers,
-            timeout=timeout,
+            timeout=timeout, idempotent=True,
         )
         data: dict[str, Any] = await resp.json()
         return data
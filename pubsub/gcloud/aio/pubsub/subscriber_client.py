@@ -7,6 +7,8 @@ from typing import IO
 
 from gcloud.aio.auth import AioSession  # pylint: disable=no-name-in-module
 from gcloud.aio.auth import BUILD_GCLOUD_REST  # pylint: disable=no-name-in-module
+from gcloud.aio.auth import PoolPolicy  # pylint: disable=no-name-in-module
+from gcloud.aio.auth import RetryPolicy  # pylint: disable=no-name-in-module
 from gcloud.aio.auth import Token  # pylint: disable=no-name-in-module
 
 from .subscriber_message import SubscriberMessage
@@ -46,10 +48,15 @@ class SubscriberClient:
             session: Session | None = None,
             api_root: str | None = None,
             api_is_dev: bool | None = None,
+            pool_policy: PoolPolicy | None = None,
+            retry_policy: RetryPolicy | None = None,
     ) -> None:
         self._api_is_dev, self._api_root = init_api_root(api_root, api_is_dev)
 
-        self.session = AioSession(session, verify_ssl=not self._api_is_dev)
+        self.session = AioSession(
+            session, verify_ssl=not self._api_is_dev,
+            pool_policy=pool_policy, retry_policy=retry_policy,
+        )
         self.token = token or Token(
             service_file=service_file, scopes=SCOPES,
             session=self.session.session,  # type: ignore[arg-type]
@@ -154,9 +161,12 @@ class SubscriberClient:
         }
         encoded = json.dumps(payload).encode()
         s = AioSession(session) if session else self.session
+        # pulling is safe to retry: any messages delivered to a lost response
+        # are simply redelivered once their ack deadline expires
         resp = await s.post(
             url, data=encoded,
             headers=headers, timeout=timeout,
+            idempotent=True,
         )
         data = await resp.json()
         return [
@@ -180,7 +190,8 @@ class SubscriberClient:
         }
         encoded = json.dumps(payload).encode()
         s = AioSession(session) if session else self.session
-        await s.post(url, data=encoded, headers=headers, timeout=timeout)
+        await s.post(url, data=encoded, headers=headers, timeout=timeout,
+                     idempotent=True)
 
     # https://cloud.google.com/pubsub/docs/reference/rest/v1/projects.subscriptions/modifyAckDeadline
     async def modify_ack_deadline(
@@ -201,7 +212,8 @@ class SubscriberClient:
             'ackDeadlineSeconds': ack_deadline_seconds,
         }).encode('utf-8')
         s = AioSession(session) if session else self.session
-        await s.post(url, data=data, headers=headers, timeout=timeout)
+        await s.post(url, data=data, headers=headers, timeout=timeout,
+                     idempotent=True)
 
     # https://cloud.google.com/pubsub/docs/reference/rest/v1/projects.subscriptions/get
     async def get_subscription(
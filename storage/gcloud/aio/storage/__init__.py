@@ -10,6 +10,13 @@ Installation
 
     $ pip install --upgrade gcloud-aio-storage
 
+Checksums of transfers are much faster with the C implementation of CRC32C
+from `google-crc32c`_, which the ``crc32c`` extra installs:
+
+.. code-block:: console
+
+    $ pip install --upgrade 'gcloud-aio-storage[crc32c]'
+
 Usage
 -----
 
@@ -83,6 +90,232 @@ management, so long as you give us a hint when to close that session:
     # do stuff
     await client.close()  # close the session explicitly
 
+Signed URLs
+-----------
+
+``Blob.get_signed_url()`` creates a single V4 signed URL. When you need many of
+them, ``Bucket.get_signed_urls()`` is much faster: it computes the parts of the
+request shared by every URL once, signs in batches (optionally in a process
+pool), and streams the URLs back as they are ready:
+
+.. code-block:: python
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    async with Storage() as client:
+        bucket = client.get_bucket('my-bucket-name')
+        with ProcessPoolExecutor() as executor:
+            async for name, url in bucket.get_signed_urls(
+                    object_names, expiration=3600, executor=executor):
+                print(name, url)
+
+Streaming Downloads
+-------------------
+
+``Storage.download_stream()`` returns the object's body as a stream, which can
+be iterated over as chunks arrive or read into a preallocated buffer with
+``readinto()``. With aiohttp, ``high_water`` and ``low_water`` bound how much
+data is buffered before reading from the connection pauses (and how little
+before it resumes), so a slow consumer applies backpressure rather than
+buffering the object in memory:
+
+.. code-block:: python
+
+    async with Storage() as client:
+        stream = await client.download_stream(
+            'my-bucket-name', 'path/to/object', high_water=1024 * 1024,
+            on_progress=lambda read: print(f'{read} bytes read'),
+        )
+        async for chunk in stream:
+            writer.write(chunk)
+            await writer.drain()
+
+Random Access
+-------------
+
+``Storage.download_range()`` downloads part of an object; a negative start
+reads its tail, eg. the footer of a Parquet file. For formats which then read
+scattered blocks of the object, ``Storage.open_reader()`` returns a seekable,
+file-like ``ObjectReader``. It caches blocks of the object, fetches adjacent
+missing blocks with a single ranged request, and reads ahead when reading
+sequentially:
+
+.. code-block:: python
+
+    async with Storage() as client:
+        reader = await client.open_reader(
+            'my-bucket-name', 'path/to/file.parquet', block_size=1024 * 1024,
+        )
+        reader.seek(-8, os.SEEK_END)
+        footer = await reader.read(8)
+
+Sliced Downloads
+----------------
+
+A single download is bound by the throughput of a single connection. For large
+objects, ``Storage.download_sliced()`` and
+``Storage.download_sliced_to_filename()`` instead fetch the object as several
+concurrent ranged requests, writing each slice directly into place: into a
+preallocated buffer, or into a memory-mapped file so the object never needs to
+fit in memory. Failed slices are retried individually (according to the
+``retry_policy`` argument) and the result is checked against the object's
+CRC32C:
+
+.. code-block:: python
+
+    async with Storage() as client:
+        await client.download_sliced_to_filename(
+            'my-bucket-name', 'path/to/large/object', '/path/to/file',
+            slice_size=32 * 1024 * 1024, max_concurrency=16,
+        )
+
+Checksums are computed as slices arrive, so validation does not need another
+pass over the data. Installing `google-crc32c`_ (eg. through the ``crc32c``
+extra) makes this significantly faster; without it, we fall back to a
+pure-Python implementation which may well be slower than the download itself.
+In that case, you may prefer passing ``validate=False``.
+
+Parallel Composite Uploads
+--------------------------
+
+Similarly, a single upload is limited to a single stream. For large local
+files, ``Storage.upload_parallel()`` (or ``upload_from_filename(...,
+parallel=True)``) uploads parts of the file concurrently as temporary objects,
+then composes them into the final object:
+
+.. code-block:: python
+
+    def on_progress(index, uploaded, size):
+        print(f'part {index}: {uploaded}/{size} bytes')
+
+    async with Storage() as client:
+        await client.upload_from_filename(
+            'my-bucket-name', 'path/to/large/object', '/path/to/file',
+            parallel=True, part_size=64 * 1024 * 1024, progress=on_progress,
+        )
+
+Temporary objects are named after the final object and are always deleted
+afterwards. Note that composite objects only have a CRC32C checksum, not an
+MD5 hash, and that the temporary objects may incur early deletion fees in
+storage classes with a minimum storage duration.
+
+Compressed Uploads
+------------------
+
+Passing ``zipped=True`` to ``Storage.upload()`` compresses the data before
+uploading it, and sets the object's ``contentEncoding`` so that GCS can serve
+it decompressed. Large uploads are compressed in a worker thread as they are
+sent, so the compressed object never needs to fit in memory. The
+``compression_level`` argument trades off speed for size, and ``compression``
+selects another encoding: ``'deflate'``, or ``'zstd'`` if the `zstandard`_
+package is installed. Note that GCS only decompresses ``gzip`` objects on
+download; objects with other encodings are always served as they are stored.
+
+Listing Objects
+---------------
+
+``Bucket.list_blobs()`` returns the names of all matching objects at once. For
+large buckets, ``Storage.iter_objects()`` and ``Bucket.iter_blobs()`` instead
+yield objects as the listing arrives, while the next page is already being
+fetched. Passing ``fields`` limits the metadata returned for each object, and
+``prefixes`` lists several prefixes concurrently:
+
+.. code-block:: python
+
+    async for obj in client.iter_objects('my-bucket', fields='name,size',
+                                         prefixes=['2023/', '2024/']):
+        print(obj['name'], obj['size'])
+
+Bulk Operations
+---------------
+
+``Storage.delete_many()``, ``Storage.copy_many()`` and
+``Storage.patch_metadata_many()`` apply an operation to many objects, sending
+up to 100 calls per request to the `batch endpoint`_, with several batches in
+flight at once. Calls failing with a transient status are retried as part of a
+later batch. Each yields a ``BatchResult`` per object rather than raising, and
+accepts the names to operate on as an async iterable, so they compose with
+listing:
+
+.. code-block:: python
+
+    bucket = client.get_bucket('my-bucket')
+    async for result in client.delete_many(
+            'my-bucket', bucket.iter_blobs(prefix='tmp/')):
+        if not result.ok:
+            print(result.object_name, result.status, result.data)
+
+Object data can't be batched, but ``Storage.download_many()`` (and
+``Bucket.download_many()``) downloads many objects with a bounded number of
+requests in flight, yielding a ``DownloadResult`` for each as it completes.
+With ``directory``, objects are streamed to files under it rather than held
+in memory:
+
+.. code-block:: python
+
+    async for result in bucket.download_many(
+            bucket.iter_blobs(prefix='thumbnails/'), directory='/tmp/cache',
+            max_concurrency=32):
+        if not result.ok:
+            print(result.object_name, result.error)
+
+Likewise, ``Storage.upload_many()`` (and ``Bucket.upload_many()``) uploads
+many ``(filename, object_name)`` pairs concurrently over the client's session,
+yielding an ``UploadResult`` for each. Each file is uploaded in a single
+request or as a resumable upload depending on its size, its content type is
+guessed from its name, and uploads failing with transient errors are retried.
+Pass a ``TransferStats`` to follow the progress of the whole transfer:
+
+.. code-block:: python
+
+    stats = TransferStats()
+    async for result in bucket.upload_many(
+            ((path, f'images/{os.path.basename(path)}') for path in paths),
+            stats=stats):
+        if not result.ok:
+            print(result.filename, result.error)
+        print(f'{stats.transferred} files, {stats.throughput:.0f} B/s')
+
+Caching Metadata
+----------------
+
+Applications which check the same objects over and over (with
+``Bucket.get_blob()`` or ``Bucket.blob_exists()``) can give the client a
+``MetadataCache``, which keeps the metadata of recently used objects for a
+while. Concurrent lookups of the same object share a single request, and
+writes made through the same client update the cache as they complete:
+
+.. code-block:: python
+
+    from gcloud.aio.storage import MetadataCache
+
+    async with Storage(metadata_cache=MetadataCache(ttl=30)) as client:
+        bucket = client.get_bucket('my-bucket-name')
+        blob = await bucket.get_blob('path/to/hot/object')
+
+Changes made by other clients are only seen once their entries expire, so pick
+a ``ttl`` your application can tolerate serving stale metadata for.
+
+Syncing Directories
+-------------------
+
+``Storage.sync()`` makes a local directory and a bucket prefix hold the same
+files, in either direction, transferring only files which are missing or
+whose size or checksum differ, with up to ``max_concurrency`` transfers at
+once. Pass ``delete=True`` to also delete files which only exist at the
+destination, and ``dry_run=True`` to only report what would change. Hashing
+large local files is expensive, so a ``HashCache`` backed by a file can be
+used to only hash files again after they are modified:
+
+.. code-block:: python
+
+    from gcloud.aio.storage import HashCache
+
+    cache = HashCache('.gcs-hashes.json')
+    result = await client.sync('build/', 'gs://my-bucket/artifacts/',
+                               delete=True, hash_cache=cache)
+    print(f'uploaded {len(result.transferred)} files')
+
 File Encodings
 --------------
 
@@ -124,13 +357,29 @@ custom http session, you may need to disable SSL verification.
 Customization
 -------------
 
-This library mostly tries to stay agnostic of potential use-cases; as such, we
-do not implement any sort of retrying or other policies under the assumption
-that we wouldn't get things right for every user's situation.
+This library mostly tries to stay agnostic of potential use-cases; as such,
+requests are not retried unless you opt in by passing a ``RetryPolicy`` (from
+``gcloud-aio-auth``) to the client:
+
+.. code-block:: python
+
+    from gcloud.aio.auth import RetryPolicy
+
+    async with Storage(retry_policy=RetryPolicy(max_attempts=5)) as client:
+        ...
+
+The policy only retries idempotent requests which fail with a connection
+error, a timeout, or a transient status code (``429`` and ``5xx``), and backs
+off with jitter between attempts. Upload bodies are streamed and so are never
+replayed by the policy; resumable uploads keep their own retry loop instead.
+They are sent in chunks (8MB by default, see the ``chunk_size`` argument of
+``Storage.upload()``), and after a failure they ask GCS how much data it
+persisted and resume from there, rather than starting over.
 
-As such, we recommend configuring your own policies on an as-needed basis. The
-`tenacity`_ library can make this quite straightforward! For example, you may
-find it useful to configure something like:
+If you need something more specific, we recommend configuring your own
+policies on an as-needed basis. The `tenacity`_ library can make this quite
+straightforward! For example, you may find it useful to configure something
+like:
 
 .. code-block:: python
 
@@ -161,25 +410,48 @@ find it useful to configure something like:
 
 .. _Issue #172: https://github.com/talkiq/gcloud-aio/issues/172
 .. _tenacity: https://pypi.org/project/tenacity/
+.. _zstandard: https://pypi.org/project/zstandard/
+.. _google-crc32c: https://pypi.org/project/google-crc32c/
+.. _batch endpoint: https://cloud.google.com/storage/docs/batch
 .. _chardet: https://pypi.org/project/chardet/
 .. _fsouza/fake-gcs-server: https://github.com/fsouza/fake-gcs-server
 .. _smoke test: https://github.com/talkiq/gcloud-aio/blob/master/storage/tests/integration/smoke_test.py
 """
 import importlib.metadata
 
+from .batch import BatchResult
 from .blob import Blob
 from .bucket import Bucket
+from .cache import MetadataCache
+from .checksums import ChecksumMismatchError
+from .reader import ObjectReader
 from .storage import SCOPES
 from .storage import Storage
-from .storage import StreamResponse
+from .streams import StreamResponse
+from .sync import HashCache
+from .sync import SyncError
+from .sync import SyncResult
+from .transfers import DownloadResult
+from .transfers import TransferStats
+from .transfers import UploadResult
 
 
 __version__ = importlib.metadata.version('gcloud-aio-storage')
 __all__ = [
+    'BatchResult',
     'Blob',
     'Bucket',
+    'ChecksumMismatchError',
+    'DownloadResult',
+    'HashCache',
+    'MetadataCache',
+    'ObjectReader',
     'SCOPES',
     'Storage',
     'StreamResponse',
+    'SyncError',
+    'SyncResult',
+    'TransferStats',
+    'UploadResult',
     '__version__',
 ]
@@ -0,0 +1,489 @@
+"""
+Helpers for the JSON API's batch endpoint.
+
+A batch request bundles up to ``MAX_BATCH_SIZE`` API calls into a single
+``multipart/mixed`` request, each part of which is itself an HTTP request;
+the response holds an HTTP response for each of them, in the same format.
+
+See https://cloud.google.com/storage/docs/batch
+"""
+import asyncio
+import collections
+import functools
+import json
+import logging
+import re
+from collections.abc import AsyncIterable
+from collections.abc import AsyncIterator
+from collections.abc import Awaitable
+from collections.abc import Callable
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Any
+from typing import TYPE_CHECKING
+from urllib.parse import quote
+from urllib.parse import urlencode
+
+from gcloud.aio.auth import AioSession  # pylint: disable=no-name-in-module
+from gcloud.aio.auth import BUILD_GCLOUD_REST  # pylint: disable=no-name-in-module
+from gcloud.aio.auth import RetryPolicy  # pylint: disable=no-name-in-module
+
+from .constants import DEFAULT_TIMEOUT
+from .retries import is_transient
+from .retries import retry_delay
+from .uploads import choose_boundary
+
+# Selectively load libraries based on the package
+if BUILD_GCLOUD_REST:
+    from time import sleep
+    from requests import Session
+else:
+    from asyncio import sleep  # type: ignore[assignment]
+    from aiohttp import ClientSession as Session  # type: ignore[assignment]
+
+MAX_BATCH_SIZE = 100
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchCall:
+    """A single API call in a batch, made on behalf of ``object_name``."""
+    object_name: str
+    method: str
+    path: str
+    params: dict[str, str] | None = None
+    body: dict[str, Any] | None = None
+
+
+@dataclass
+class BatchResult:
+    """
+    The outcome of a single call in a batch.
+
+    Attributes:
+        object_name: The object the call was made for.
+        status: The HTTP status of the call.
+        data: The parsed JSON response of the call, if any. For failed calls,
+            this holds the API's error.
+    """
+    object_name: str
+    status: int
+    data: dict[str, Any]
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+
+def encode_batch(calls: list[BatchCall], boundary: str) -> tuple[bytes, str]:
+    """
+    Encode calls as the body of a batch request, returning the body and its
+    content type. Each call's ``Content-ID`` is its index in ``calls``.
+    """
+    parts = []
+    for index, call in enumerate(calls):
+        target = call.path
+        if call.params:
+            target = f'{target}?{urlencode(call.params)}'
+
+        request = [f'{call.method} {target} HTTP/1.1']
+        body = b''
+        if call.body is not None:
+            body = json.dumps(call.body).encode('utf-8')
+            request.append('Content-Type: application/json; charset=UTF-8')
+        request.append(f'Content-Length: {len(body)}')
+
+        part = '\r\n'.join([
+            f'--{boundary}',
+            'Content-Type: application/http',
+            f'Content-ID: <{index}>',
+            '',
+            *request,
+            '',
+            '',
+        ])
+        parts.append(part.encode('utf-8') + body + b'\r\n')
+
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), f'multipart/mixed; boundary={boundary}'
+
+
+def decode_batch(
+    body: bytes, content_type: str,
+) -> dict[int, tuple[int, dict[str, Any]]]:
+    """
+    Decode the response to a batch request into the ``(status, data)`` of
+    each call, keyed by the index of the call.
+    """
+    match = re.search(r'boundary="?([^";]+)"?', content_type)
+    if not match:
+        raise ValueError(f'invalid batch response type: {content_type!r}')
+    delimiter = f'--{match.group(1)}'.encode()
+
+    results = {}
+    for part in body.split(delimiter)[1:]:
+        if part.startswith(b'--'):
+            break
+
+        # the part's own headers, then the response's status line and
+        # headers, then its body
+        sections = re.split(rb'\r?\n\r?\n', part.strip(), maxsplit=2)
+        if len(sections) < 2:
+            raise ValueError('invalid batch response part')
+        content_id = re.search(rb'(?im)^content-id:\s*<response-(\d+)>',
+                               sections[0])
+        if not content_id:
+            raise ValueError('batch response part has no Content-ID')
+        status = int(sections[1].split(None, 2)[1])
+
+        data: dict[str, Any] = {}
+        if len(sections) > 2 and sections[2].strip():
+            data = json.loads(sections[2])
+        results[int(content_id.group(1))] = (status, data)
+
+    return results
+
+
+class BatchOperations:
+    """
+    Operations on many objects using batch requests, mixed into ``Storage``.
+    """
+    if TYPE_CHECKING:
+        # provided by Storage
+        _api_root: str
+        session: AioSession
+        _headers: Callable[[], Awaitable[dict[str, str]]]
+        _forget_metadata: Callable[..., None]
+        _format_metadata: Callable[[dict[str, Any]], dict[str, Any]]
+        copy: Callable[..., Awaitable[dict[str, Any]]]
+
+    async def copy_many(
+        self, bucket: str,
+        object_names: Iterable[str] | AsyncIterable[str],
+        destination_bucket: str, *,
+        new_name: Callable[[str], str] | None = None,
+        metadata: dict[str, Any] | None = None,
+        params: dict[str, str] | None = None,
+        batch_size: int = MAX_BATCH_SIZE,
+        max_concurrency: int = 8,
+        retry_policy: RetryPolicy | None = None,
+        headers: dict[str, str] | None = None,
+        session: Session | None = None,
+        timeout: int = DEFAULT_TIMEOUT,
+    ) -> AsyncIterator[BatchResult]:
+        """
+        Copy many objects, using batch requests.
+
+        A result is yielded for each object, in the order of
+        ``object_names``, holding the same response as ``copy()``. Copies GCS
+        can not complete in a single call (eg. of large objects between
+        locations) are then completed one by one.
+
+        Args:
+            bucket: The bucket of the objects.
+            object_names: The objects to copy; may be an async iterable.
+            destination_bucket: The bucket to copy the objects to.
+            new_name: Maps each object name to the name of its copy; copies
+                keep the same name by default.
+            metadata: Metadata to apply to every copy.
+            params: Query parameters of each copy.
+            batch_size: Number of calls per batch request, at most 100.
+            max_concurrency: Maximum number of batch requests in flight.
+            retry_policy: Controls retries of failed batch requests and of
+                calls failing with a transient status. Defaults to
+                ``RetryPolicy()``.
+            headers: Custom header values for the batch requests.
+            session: A specific session to (re)use.
+            timeout: Timeout, in seconds, for each batch request.
+        """
+        call = functools.partial(
+            self._copy_call, bucket, destination_bucket, new_name=new_name,
+            params=params, body=self._format_metadata(metadata or {}),
+        )
+        async for result in self._batch(
+                object_names, call, batch_size=batch_size,
+                max_concurrency=max_concurrency, retry_policy=retry_policy,
+                headers=headers, session=session, timeout=timeout):
+            yield await self._finish_copy(
+                result, bucket, destination_bucket, new_name=new_name,
+                metadata=metadata, params=params, headers=headers,
+                session=session, timeout=timeout,
+            )
+
+    def _copy_call(
+        self, bucket: str, destination_bucket: str, name: str, *,
+        new_name: Callable[[str], str] | None,
+        params: dict[str, str] | None, body: dict[str, Any],
+    ) -> BatchCall:
+        target = new_name(name) if new_name else name
+        path = (f'{self._object_path(bucket, name)}/rewriteTo/b/'
+                f'{destination_bucket}/o/{quote(target, safe="")}')
+        return BatchCall(name, 'POST', path, params=params, body=body)
+
+    async def _finish_copy(
+        self, result: BatchResult, bucket: str, destination_bucket: str, *,
+        new_name: Callable[[str], str] | None,
+        metadata: dict[str, Any] | None, params: dict[str, str] | None,
+        headers: dict[str, str] | None, session: Session | None,
+        timeout: int,
+    ) -> BatchResult:
+        """
+        Complete a copy which GCS could not finish in a single call, or else
+        refresh the cached metadata of its destination.
+        """
+        name = result.object_name
+        token = result.data.get('rewriteToken')
+        if result.ok and not result.data.get('done', True) and token:
+            result.data = await self.copy(
+                bucket, name, destination_bucket,
+                new_name=new_name(name) if new_name else None,
+                metadata=metadata,
+                params={**(params or {}), 'rewriteToken': token},
+                headers=dict(headers or {}), session=session,
+                timeout=timeout,
+            )
+        elif result.ok:
+            self._forget_metadata(
+                destination_bucket, new_name(name) if new_name else name,
+                result.data.get('resource'),
+            )
+        return result
+
+    async def delete_many(
+        self, bucket: str,
+        object_names: Iterable[str] | AsyncIterable[str], *,
+        params: dict[str, str] | None = None,
+        batch_size: int = MAX_BATCH_SIZE,
+        max_concurrency: int = 8,
+        retry_policy: RetryPolicy | None = None,
+        headers: dict[str, str] | None = None,
+        session: Session | None = None,
+        timeout: int = DEFAULT_TIMEOUT,
+    ) -> AsyncIterator[BatchResult]:
+        """
+        Delete many objects, using batch requests.
+
+        ``object_names`` may be an async iterable, eg. the names yielded by
+        ``Bucket.iter_blobs()``. A result is yielded for each object, in the
+        order of ``object_names``; failed deletions do not raise.
+
+        Args:
+            bucket: The bucket of the objects.
+            object_names: The objects to delete.
+            params: Query parameters of each deletion.
+            batch_size: Number of calls per batch request, at most 100.
+            max_concurrency: Maximum number of batch requests in flight.
+            retry_policy: Controls retries of failed batch requests and of
+                calls failing with a transient status. Defaults to
+                ``RetryPolicy()``.
+            headers: Custom header values for the batch requests.
+            session: A specific session to (re)use.
+            timeout: Timeout, in seconds, for each batch request.
+        """
+        def call(name: str) -> BatchCall:
+            return BatchCall(name, 'DELETE', self._object_path(bucket, name),
+                             params=params)
+
+        results = self._batch(
+            object_names, call, batch_size=batch_size,
+            max_concurrency=max_concurrency, retry_policy=retry_policy,
+            headers=headers, session=session, timeout=timeout,
+        )
+        async for result in results:
+            if result.ok:
+                self._forget_metadata(bucket, result.object_name)
+            yield result
+
+    async def patch_metadata_many(
+            self, bucket: str,
+            object_names: Iterable[str] | AsyncIterable[str],
+            metadata: dict[str, Any], *,
+            params: dict[str, str] | None = None,
+            batch_size: int = MAX_BATCH_SIZE,
+            max_concurrency: int = 8,
+            retry_policy: RetryPolicy | None = None,
+            headers: dict[str, str] | None = None,
+            session: Session | None = None,
+            timeout: int = DEFAULT_TIMEOUT,
+    ) -> AsyncIterator[BatchResult]:
+        """
+        Patch the metadata of many objects, using batch requests.
+
+        A result is yielded for each object, in the order of
+        ``object_names``, holding the same response as ``patch_metadata()``.
+
+        Args:
+            bucket: The bucket of the objects.
+            object_names: The objects to patch; may be an async iterable.
+            metadata: The metadata to patch every object with.
+            params: Query parameters of each patch.
+            batch_size: Number of calls per batch request, at most 100.
+            max_concurrency: Maximum number of batch requests in flight.
+            retry_policy: Controls retries of failed batch requests and of
+                calls failing with a transient status. Defaults to
+                ``RetryPolicy()``.
+            headers: Custom header values for the batch requests.
+            session: A specific session to (re)use.
+            timeout: Timeout, in seconds, for each batch request.
+        """
+        def call(name: str) -> BatchCall:
+            return BatchCall(name, 'PATCH', self._object_path(bucket, name),
+                             params=params, body=metadata)
+
+        results = self._batch(
+            object_names, call, batch_size=batch_size,
+            max_concurrency=max_concurrency, retry_policy=retry_policy,
+            headers=headers, session=session, timeout=timeout,
+        )
+        async for result in results:
+            if result.ok:
+                self._forget_metadata(bucket, result.object_name, result.data)
+            yield result
+
+    @staticmethod
+    def _object_path(bucket: str, object_name: str) -> str:
+        # https://cloud.google.com/storage/docs/request-endpoints#encoding
+        return f'/storage/v1/b/{bucket}/o/{quote(object_name, safe="")}'
+
+    async def _batch(
+        self, object_names: Iterable[str] | AsyncIterable[str],
+        call: Callable[[str], BatchCall], *, batch_size: int,
+        max_concurrency: int, retry_policy: RetryPolicy | None,
+        headers: dict[str, str] | None, session: Session | None,
+        timeout: int,
+    ) -> AsyncIterator[BatchResult]:
+        if not 0 < batch_size <= MAX_BATCH_SIZE:
+            raise ValueError(f'batch_size must be between 1 and '
+                             f'{MAX_BATCH_SIZE}')
+        if max_concurrency < 1:
+            raise ValueError('max_concurrency must be positive')
+        policy = retry_policy or RetryPolicy()
+
+        pending: collections.deque[
+            'asyncio.Task[list[BatchResult]]'
+        ] = collections.deque()
+        try:
+            async for names in self._batches(object_names, batch_size):
+                sending = asyncio.ensure_future(self._send_batch(
+                    [call(name) for name in names], policy=policy,
+                    headers=headers, session=session, timeout=timeout))
+                pending.append(sending)
+                if len(pending) < max_concurrency:
+                    continue
+
+                for result in await pending.popleft():
+                    yield result
+
+            while pending:
+                for result in await pending.popleft():
+                    yield result
+        finally:
+            if not BUILD_GCLOUD_REST:
+                # the caller may have stopped iterating early
+                for sending in pending:
+                    sending.cancel()
+
+    @staticmethod
+    async def _batches(
+        items: Iterable[str] | AsyncIterable[str], size: int,
+    ) -> AsyncIterator[list[str]]:
+        batch: list[str] = []
+        if isinstance(items, Iterable):
+            for item in items:
+                batch.append(item)
+                if len(batch) == size:
+                    yield batch
+                    batch = []
+        else:
+            async for item in items:
+                batch.append(item)
+                if len(batch) == size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+    async def _send_batch(
+        self, calls: list[BatchCall], *, policy: RetryPolicy,
+        headers: dict[str, str] | None, session: Session | None,
+        timeout: int,
+    ) -> list[BatchResult]:
+        results = [BatchResult(call.object_name, 0, {}) for call in calls]
+        remaining = list(range(len(calls)))
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                responses = await self._post_batch(
+                    [calls[i] for i in remaining], headers=headers,
+                    session=session, timeout=timeout,
+                )
+            except Exception as e:  # pylint: disable=broad-except
+                if not is_transient(e, policy):
+                    raise
+                if not policy.can_retry(attempt):
+                    raise
+
+                delay = retry_delay(e, policy, attempt)
+                log.info('retrying batch of %d calls in %.2fs: %s',
+                         len(remaining), delay, e)
+                await sleep(delay)  # type: ignore[func-returns-value,misc]
+                continue
+
+            failed = self._record(calls, remaining, responses, results,
+                                  policy)
+            if not failed or not policy.can_retry(attempt):
+                return results
+
+            delay = policy.backoff(attempt)
+            log.info('retrying %d of %d calls of a batch in %.2fs',
+                     len(failed), len(remaining), delay)
+            remaining = failed
+            await sleep(delay)  # type: ignore[func-returns-value,misc]
+
+    @staticmethod
+    def _record(
+        calls: list[BatchCall], indices: list[int],
+        responses: list[tuple[int, dict[str, Any]]],
+        results: list[BatchResult], policy: RetryPolicy,
+    ) -> list[int]:
+        """
+        Record the responses to the calls at ``indices`` in ``results``, and
+        return the indices of those worth retrying.
+        """
+        failed = []
+        for index, (status, data) in zip(indices, responses):
+            results[index] = BatchResult(calls[index].object_name, status,
+                                         data)
+            if policy.is_retryable_status(status):
+                failed.append(index)
+        return failed
+
+    async def _post_batch(
+        self, calls: list[BatchCall], *, headers: dict[str, str] | None,
+        session: Session | None, timeout: int,
+    ) -> list[tuple[int, dict[str, Any]]]:
+        body, content_type = encode_batch(calls, choose_boundary())
+        headers = dict(headers or {})
+        headers.update(await self._headers())
+        headers.update({
+            'Content-Length': str(len(body)),
+            'Content-Type': content_type,
+        })
+
+        s = AioSession(session) if session else self.session
+        resp = await s.post(
+            f'{self._api_root}/batch/storage/v1', data=body,
+            headers=headers, timeout=timeout,
+        )
+        try:
+            data: bytes = await resp.read()
+        except (AttributeError, TypeError):
+            data = resp.content  # type: ignore[assignment]
+
+        responses = decode_batch(data, resp.headers['Content-Type'])
+        if set(responses) != set(range(len(calls))):
+            raise ValueError(f'expected {len(calls)} responses to a batch '
+                             f'request, got {len(responses)}')
+        return [responses[i] for i in range(len(calls))]
@@ -1,10 +1,19 @@
+import asyncio
 import binascii
 import collections
 import datetime
 import enum
+import functools
 import hashlib
 import io
+import itertools
 import os
+import sys
+from collections.abc import AsyncIterator
+from collections.abc import Awaitable
+from collections.abc import Callable
+from collections.abc import Iterable
+from concurrent.futures import Executor
 from typing import Any
 from typing import TYPE_CHECKING
 from urllib.parse import quote
@@ -68,29 +77,343 @@ class PemKind(enum.Enum):
     PKCS8 = 1
 
 
-class _SignatureMethod(enum.Enum):
+@functools.lru_cache(maxsize=16)
+def load_private_key(private_key: str) -> rsa.PrivateKey:
     """
-    Indicates where the url signing will be done through Google's
-    IAM API or through local signing with a PEM file, which is faster
-    but requires that the provided token contains client_email and
-    private_key data
+    Parse a PEM-encoded (PKCS1 or PKCS8) RSA private key.
+
+    Parsing the key costs about as much as signing with it, so parsed keys are
+    cached: generating many signed URLs with the same service account only
+    parses its key once (per process).
+    """
+    # N.B. see the ``PemKind`` enum
+    marker_id, key_bytes = pem.readPemBlocksFromFile(
+        io.StringIO(private_key), PKCS1_MARKER, PKCS8_MARKER,
+    )
+    if marker_id == PemKind.INVALID.value:
+        raise ValueError('private key is invalid or unsupported')
+
+    if marker_id == PemKind.PKCS8.value:
+        # convert from pkcs8 to pkcs1
+        key_info, remaining = decoder.decode(
+            key_bytes,
+            asn1Spec=PKCS8_SPEC,
+        )
+        if remaining != b'':
+            raise ValueError(
+                'could not read PKCS8 key: found extra bytes',
+                remaining,
+            )
+
+        private_key_info = key_info.getComponentByName('privateKey')
+        key_bytes = private_key_info.asOctets()
+
+    key: rsa.PrivateKey = rsa.key.PrivateKey.load_pkcs1(key_bytes,
+                                                        format='DER')
+    return key
+
+
+def sign_pem_batch(strs_to_sign: list[str], private_key: str) -> list[bytes]:
+    """
+    Sign several strings with the same key.
+
+    This is a module-level function so that it can be sent to a
+    ``ProcessPoolExecutor``; batching amortizes the cost of shipping work to
+    (and loading the key in) the worker.
+    """
+    key = load_private_key(private_key)
+    return [rsa.pkcs1.sign(s.encode(), key, 'SHA-256') for s in strs_to_sign]
+
+
+class UrlSigner:
+    """
+    Build V4 signed URLs for any number of objects.
+
+    Everything but the object path is shared between URLs signed at the same
+    time with the same options -- the credential scope, timestamp, canonical
+    headers and query string -- so we compute it once up front; signing each
+    URL then only needs to hash its canonical request.
+
+    https://cloud.google.com/storage/docs/access-control/signing-urls-manually
     """
 
-    PEM = 0
-    IAM_API = 1
+    def __init__(
+            self, token: Token, expiration: int,
+            headers: dict[str, str] | None = None,
+            query_params: dict[str, Any] | None = None,
+            http_method: str = 'GET',
+            service_account_email: str | None = None,
+    ) -> None:
+        if expiration > 604800:
+            raise ValueError(
+                "expiration time can't be longer than 604800 "
+                'seconds (7 days)',
+            )
+
+        datetime_now = datetime.datetime.now(datetime.timezone.utc)
+        self.request_timestamp = datetime_now.strftime('%Y%m%dT%H%M%SZ')
+        datestamp = datetime_now.strftime('%Y%m%d')
+
+        self.credential_scope = f'{datestamp}/auto/storage/goog4_request'
+        # Try to sign locally if available
+        client_email = token.service_data.get('client_email')
+        private_key = token.service_data.get('private_key')
+        # the key to sign with locally, or None to use Google's IAM API
+        self.private_key: str | None = None
+        if not client_email or not private_key:
+            # Cannot sign locally, so we'll have to use Google's IAM API
+            credential = f'{service_account_email}/{self.credential_scope}'
+        else:
+            if isinstance(private_key, str):
+                self.private_key = private_key
+            credential = f'{client_email}/{self.credential_scope}'
+
+        headers = dict(headers or {})
+        headers['host'] = HOST
+
+        ordered_headers = collections.OrderedDict(
+            sorted(headers.items(), key=lambda x: x[0].lower()))
+        self.canonical_headers = ''.join(
+            f'{str(k).lower()}:{str(v).lower()}\n'
+            for k, v in ordered_headers.items()
+        )
+
+        self.signed_headers = ';'.join(
+            f'{str(k).lower()}' for k in ordered_headers.keys()
+        )
+
+        query_params = dict(query_params or {})
+        query_params['X-Goog-Algorithm'] = 'GOOG4-RSA-SHA256'
+        query_params['X-Goog-Credential'] = credential
+        query_params['X-Goog-Date'] = self.request_timestamp
+        query_params['X-Goog-Expires'] = expiration
+        query_params['X-Goog-SignedHeaders'] = self.signed_headers
+
+        ordered_query_params = collections.OrderedDict(
+            sorted(query_params.items()),
+        )
+
+        self.canonical_query_str = '&'.join(
+            f'{quote(str(k), safe="")}={quote(str(v), safe="")}'
+            for k, v in ordered_query_params.items()
+        )
+        self.http_method = http_method
+
+    @staticmethod
+    def canonical_uri(bucket_name: str, object_name: str) -> str:
+        quoted_name = quote(object_name, safe=b'/~')
+        return f'/{bucket_name}/{quoted_name}'
+
+    def string_to_sign(self, bucket_name: str, object_name: str) -> str:
+        canonical_req = '\n'.join([
+            self.http_method, self.canonical_uri(bucket_name, object_name),
+            self.canonical_query_str, self.canonical_headers,
+            self.signed_headers, 'UNSIGNED-PAYLOAD',
+        ])
+        canonical_req_hash = hashlib.sha256(canonical_req.encode()).hexdigest()
+
+        return '\n'.join([
+            'GOOG4-RSA-SHA256', self.request_timestamp,
+            self.credential_scope, canonical_req_hash,
+        ])
+
+    def url(self, bucket_name: str, object_name: str,
+            signed_blob: bytes) -> str:
+        signature = binascii.hexlify(signed_blob).decode()
+
+        return (
+            f'https://{HOST}{self.canonical_uri(bucket_name, object_name)}?'
+            f'{self.canonical_query_str}&X-Goog-Signature={signature}'
+        )
+
+    async def sign_batch(
+            self, bucket_name: str, object_names: list[str], *,
+            executor: Executor | None, iam_client: IamClient | None,
+            service_account_email: str | None, session: Session | None,
+    ) -> list[bytes]:
+        strs_to_sign = [self.string_to_sign(bucket_name, name)
+                        for name in object_names]
+
+        if self.private_key:
+            if executor is None or BUILD_GCLOUD_REST:
+                return sign_pem_batch(strs_to_sign, self.private_key)
+            return await asyncio.get_running_loop().run_in_executor(
+                executor, sign_pem_batch, strs_to_sign, self.private_key,
+            )
+
+        assert iam_client is not None
+        return [
+            await Blob.get_iam_api_signature(
+                str_to_sign, iam_client, service_account_email,
+                session or iam_client.session,  # type: ignore[arg-type]
+            )
+            for str_to_sign in strs_to_sign
+        ]
+
+    async def sign_urls(
+            self, bucket_name: str, object_names: Iterable[str], *,
+            token: Token, iam_client: IamClient | None = None,
+            service_account_email: str | None = None,
+            session: Session | None = None,
+            executor: Executor | None = None, batch_size: int = 256,
+            max_concurrency: int = 8,
+    ) -> AsyncIterator[tuple[str, str]]:
+        """
+        Sign URLs for many objects, yielding ``(object_name, url)`` pairs in
+        order; see ``Bucket.get_signed_urls()``.
+        """
+        if batch_size < 1 or max_concurrency < 1:
+            raise ValueError('batch_size and max_concurrency must be positive')
+
+        owned_client = None
+        if not self.private_key:
+            # every IAM API signature is its own request, so batching them
+            # would only serialize those requests
+            batch_size = 1
+            if not iam_client:
+                try:
+                    iam_client = owned_client = IamClient(token=token,
+                                                          session=session)
+                except TypeError as e:
+                    raise TypeError('Blob signing is not yet supported'
+                                    ' for AUTHORIZED_USER tokens') from e
+
+        sign = functools.partial(
+            self.sign_batch, bucket_name, executor=executor,
+            iam_client=iam_client,
+            service_account_email=service_account_email, session=session,
+        )
+        try:
+            async for name, signed_blob in self._sign_in_batches(
+                    sign, object_names, batch_size, max_concurrency):
+                yield name, self.url(bucket_name, name, signed_blob)
+        finally:
+            if owned_client:
+                await owned_client.close()
+
+    @staticmethod
+    async def _sign_in_batches(
+            sign: Callable[[list[str]], Awaitable[list[bytes]]],
+            object_names: Iterable[str], batch_size: int,
+            max_concurrency: int,
+    ) -> AsyncIterator[tuple[str, bytes]]:
+        names = iter(object_names)
+        pending: collections.deque[
+            tuple[list[str], 'asyncio.Task[list[bytes]]']
+        ] = collections.deque()
+        try:
+            while batch := list(itertools.islice(names, batch_size)):
+                pending.append((batch, asyncio.ensure_future(sign(batch))))
+                if len(pending) < max_concurrency:
+                    continue
+
+                batch, signing = pending.popleft()
+                for signed in zip(batch, await signing):
+                    yield signed
+
+            while pending:
+                batch, signing = pending.popleft()
+                for signed in zip(batch, await signing):
+                    yield signed
+        finally:
+            if not BUILD_GCLOUD_REST:
+                # the caller may have stopped iterating early
+                for _, signing in pending:
+                    signing.cancel()
 
 
 class Blob:
+    """
+    An object in a bucket, along with its metadata.
+
+    Every field of the object's metadata (see
+    https://cloud.google.com/storage/docs/json_api/v1/objects#resource) can
+    be read as an attribute, as GCS sent it, eg. ``blob.contentType`` or
+    ``blob.timeCreated``; the exceptions are ``size``, which is an ``int``,
+    and ``bucket``, which is renamed to ``bucket_name``. Fields are only
+    decoded when they are first accessed, and parsed timestamps are available
+    from ``timestamp()``.
+
+    Pass ``fields`` to keep only some fields of the metadata, which makes
+    blobs much smaller when holding many of them, eg. from a listing.
+    """
+    __slots__ = ('bucket', 'name', 'bucket_name', '_metadata', '_size')
+
     def __init__(
         self, bucket: 'Bucket', name: str,
         metadata: dict[str, Any],
+        fields: Iterable[str] | None = None,
     ) -> None:
-        metadata['bucket_name'] = metadata.pop('bucket', '')
-        self.__dict__.update(**metadata)
-
         self.bucket = bucket
         self.name = name
-        self.size: int = int(self.size)
+        # the same bucket name is repeated in the metadata of every object
+        self.bucket_name = sys.intern(metadata.get('bucket', ''))
+        self._size: int | None = None
+
+        wanted = None if fields is None else set(fields) | {'size'}
+        # keys are interned, so that many blobs share them
+        self._metadata = {
+            sys.intern(key): value for key, value in metadata.items()
+            if key not in {'bucket', 'name'}
+            and (wanted is None or key in wanted)
+        }
+
+    def __getattr__(self, name: str) -> Any:
+        # only called for attributes which aren't set slots; private ones are
+        # never metadata (and _metadata itself may not be set yet, eg. when
+        # unpickling)
+        if name.startswith('_'):
+            raise AttributeError(name)
+        try:
+            return self._metadata[name]
+        except KeyError:
+            raise AttributeError(
+                f'{type(self).__name__!r} object has no attribute {name!r}',
+            ) from None
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in self.__slots__ or name == 'size':
+            super().__setattr__(name, value)
+        else:
+            self._metadata[sys.intern(name)] = value
+
+    def __repr__(self) -> str:
+        return f'<Blob {self.bucket_name}/{self.name}>'
+
+    @property
+    def size(self) -> int:
+        if self._size is None:
+            self._size = int(self._metadata.get('size', 0))
+        return self._size
+
+    @size.setter
+    def size(self, value: int) -> None:
+        self._size = int(value)
+
+    def as_dict(self) -> dict[str, Any]:
+        """The metadata of the object, as GCS sent it."""
+        return {**self._metadata, 'bucket': self.bucket_name,
+                'name': self.name}
+
+    def timestamp(self, field: str = 'updated') -> datetime.datetime | None:
+        """
+        Parse one of the object's RFC 3339 timestamps, eg. ``timeCreated`` or
+        ``updated``; returns ``None`` if the object does not have it.
+        """
+        value = self._metadata.get(field)
+        if not value:
+            return None
+        # datetime only understands the "Z" suffix from Python 3.11
+        return datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+    def _update(self, metadata: dict[str, Any]) -> None:
+        self.bucket_name = sys.intern(metadata.get('bucket',
+                                                   self.bucket_name))
+        self._size = None
+        self._metadata.update(
+            (sys.intern(key), value) for key, value in metadata.items()
+            if key not in {'bucket', 'name'}
+        )
 
     @property
     def chunk_size(self) -> int:
@@ -123,96 +446,51 @@ class Blob:
             session=session,
         )
 
+        self._update(metadata)
         metadata['bucket_name'] = metadata.pop('bucket', '')
-        self.__dict__.update(metadata)
 
         return metadata
 
-    async def get_signed_url(  # pylint: disable=too-many-locals
+    async def get_signed_url(
             self, expiration: int, headers: dict[str, str] | None = None,
             query_params: dict[str, Any] | None = None,
             http_method: str = 'GET', iam_client: IamClient | None = None,
             service_account_email: str | None = None,
             token: Token | None = None, session: Session | None = None,
+            executor: Executor | None = None,
     ) -> str:
         """
         Create a temporary access URL for Storage Blob accessible by anyone
         with the link.
 
+        When signing locally with a service account key, ``executor`` may be
+        set to run the (CPU-bound) RSA signature in a thread or process pool
+        rather than on the event loop. Since signing is pure Python, only a
+        ``ProcessPoolExecutor`` lets signatures actually run in parallel.
+        Ignored by ``gcloud-rest``.
+
+        To sign many URLs at once, see ``Bucket.get_signed_urls()``.
+
         Adapted from Google Documentation:
         https://cloud.google.com/storage/docs/access-control/signing-urls-manually#python-sample
         """
-        if expiration > 604800:
-            raise ValueError(
-                "expiration time can't be longer than 604800 "
-                'seconds (7 days)',
-            )
-
-        quoted_name = quote(self.name, safe=b'/~')
-        canonical_uri = f'/{self.bucket.name}/{quoted_name}'
-
-        datetime_now = datetime.datetime.now(datetime.timezone.utc)
-        request_timestamp = datetime_now.strftime('%Y%m%dT%H%M%SZ')
-        datestamp = datetime_now.strftime('%Y%m%d')
-
         token = token or self.bucket.storage.token
-        credential_scope = f'{datestamp}/auto/storage/goog4_request'
-        # Try to sign locally if available
-        client_email = token.service_data.get('client_email')
-        private_key = token.service_data.get('private_key')
-        if not client_email or not private_key:
-            # Cannot sign locally, so we'll have to use Google's IAM API
-            signature_method = _SignatureMethod.IAM_API
-            credential = f'{service_account_email}/{credential_scope}'
-        else:
-            signature_method = _SignatureMethod.PEM
-            credential = f'{client_email}/{credential_scope}'
-
-        headers = headers or {}
-        headers['host'] = HOST
-
-        ordered_headers = collections.OrderedDict(
-            sorted(headers.items(), key=lambda x: x[0].lower()))
-        canonical_headers = ''.join(
-            f'{str(k).lower()}:{str(v).lower()}\n'
-            for k, v in ordered_headers.items()
-        )
-
-        signed_headers = ';'.join(
-            f'{str(k).lower()}' for k in ordered_headers.keys()
-        )
-
-        query_params = query_params or {}
-        query_params['X-Goog-Algorithm'] = 'GOOG4-RSA-SHA256'
-        query_params['X-Goog-Credential'] = credential
-        query_params['X-Goog-Date'] = request_timestamp
-        query_params['X-Goog-Expires'] = expiration
-        query_params['X-Goog-SignedHeaders'] = signed_headers
-
-        ordered_query_params = collections.OrderedDict(
-            sorted(query_params.items()),
-        )
-
-        canonical_query_str = '&'.join(
-            f'{quote(str(k), safe="")}={quote(str(v), safe="")}'
-            for k, v in ordered_query_params.items()
+        signer = UrlSigner(
+            token, expiration, headers=headers, query_params=query_params,
+            http_method=http_method,
+            service_account_email=service_account_email,
         )
-
-        canonical_req = '\n'.join([
-            http_method, canonical_uri,
-            canonical_query_str, canonical_headers,
-            signed_headers, 'UNSIGNED-PAYLOAD',
-        ])
-        canonical_req_hash = hashlib.sha256(canonical_req.encode()).hexdigest()
-
-        str_to_sign = '\n'.join([
-            'GOOG4-RSA-SHA256', request_timestamp,
-            credential_scope, canonical_req_hash,
-        ])
-
-        if (signature_method == _SignatureMethod.PEM and private_key
-                and isinstance(private_key, str)):
-            signed_blob = self.get_pem_signature(str_to_sign, private_key)
+        str_to_sign = signer.string_to_sign(self.bucket.name, self.name)
+
+        if signer.private_key:
+            if executor is None or BUILD_GCLOUD_REST:
+                signed_blob = self.get_pem_signature(str_to_sign,
+                                                     signer.private_key)
+            else:
+                signed_blob = await asyncio.get_running_loop().run_in_executor(
+                    executor, self.get_pem_signature, str_to_sign,
+                    signer.private_key,
+                )
         else:
             provided_session: bool = bool(iam_client or session)
             try:
@@ -230,38 +508,11 @@ class Blob:
             if not provided_session:
                 await iam_client.close()
 
-        signature = binascii.hexlify(signed_blob).decode()
-
-        return (
-            f'https://{HOST}{canonical_uri}?'
-            f'{canonical_query_str}&X-Goog-Signature={signature}'
-        )
+        return signer.url(self.bucket.name, self.name, signed_blob)
 
     @staticmethod
     def get_pem_signature(str_to_sign: str, private_key: str) -> bytes:
-        # N.B. see the ``PemKind`` enum
-        marker_id, key_bytes = pem.readPemBlocksFromFile(
-            io.StringIO(private_key), PKCS1_MARKER, PKCS8_MARKER,
-        )
-        if marker_id == PemKind.INVALID.value:
-            raise ValueError('private key is invalid or unsupported')
-
-        if marker_id == PemKind.PKCS8.value:
-            # convert from pkcs8 to pkcs1
-            key_info, remaining = decoder.decode(
-                key_bytes,
-                asn1Spec=PKCS8_SPEC,
-            )
-            if remaining != b'':
-                raise ValueError(
-                    'could not read PKCS8 key: found extra bytes',
-                    remaining,
-                )
-
-            private_key_info = key_info.getComponentByName('privateKey')
-            key_bytes = private_key_info.asOctets()
-
-        key = rsa.key.PrivateKey.load_pkcs1(key_bytes, format='DER')
+        key = load_private_key(private_key)
         signed_blob = rsa.pkcs1.sign(
             str_to_sign.encode(),
             key,
@@ -1,11 +1,22 @@
 import logging
+from collections.abc import AsyncIterable
+from collections.abc import AsyncIterator
+from collections.abc import Iterable
+from collections.abc import Sequence
+from concurrent.futures import Executor
 from typing import Any
 from typing import TYPE_CHECKING
 
 from gcloud.aio.auth import BUILD_GCLOUD_REST  # pylint: disable=no-name-in-module
+from gcloud.aio.auth import IamClient  # pylint: disable=no-name-in-module
+from gcloud.aio.auth import Token  # pylint: disable=no-name-in-module
 
 from .blob import Blob
+from .blob import UrlSigner
 from .constants import DEFAULT_TIMEOUT
+from .transfers import DownloadResult
+from .transfers import TransferStats
+from .transfers import UploadResult
 
 # Selectively load libraries based on the package
 if BUILD_GCLOUD_REST:
@@ -31,15 +42,28 @@ class Bucket:
 
     async def get_blob(
         self, blob_name: str, timeout: int = DEFAULT_TIMEOUT,
-        session: Session | None = None,
+        session: Session | None = None, *,
+        fields: Iterable[str] | None = None,
     ) -> Blob:
-        metadata = await self.storage.download_metadata(
-            self.name, blob_name,
-            timeout=timeout,
-            session=session,
-        )
+        """
+        Get a blob along with its metadata, which is served from the
+        ``Storage`` client's ``metadata_cache`` if it has one. ``fields``
+        limits the metadata the blob keeps (see ``Blob``).
+        """
+        async def fetch() -> dict[str, Any]:
+            return await self.storage.download_metadata(
+                self.name, blob_name,
+                timeout=timeout,
+                session=session,
+            )
+
+        cache = self.storage.metadata_cache
+        if cache is None:
+            metadata = await fetch()
+        else:
+            metadata = await cache.get(self.name, blob_name, fetch)
 
-        return Blob(self, blob_name, metadata)
+        return Blob(self, blob_name, metadata, fields=fields)
 
     async def blob_exists(
         self, blob_name: str,
@@ -62,27 +86,74 @@ class Bucket:
         self, prefix: str = '', match_glob: str = '',
         delimiter: str = '', session: Session | None = None,
     ) -> list[str]:
-        params = {
-            'delimiter': delimiter,
-            'matchGlob': match_glob,
-            'pageToken': '',
-            'prefix': prefix,
-        }
-        items = []
-        while True:
-            content = await self.storage.list_objects(
-                self.name,
-                params=params,
+        return [
+            name async for name in self.iter_blobs(
+                prefix=prefix, match_glob=match_glob, delimiter=delimiter,
                 session=session,
             )
-            items.extend([x['name'] for x in content.get('items', [])])
-            if delimiter:
-                items.extend(content.get('prefixes', []))
-            params['pageToken'] = content.get('nextPageToken', '')
-            if not params['pageToken']:
-                break
+        ]
 
-        return items
+    async def iter_blobs(
+        self, prefix: str = '', match_glob: str = '',
+        delimiter: str = '', session: Session | None = None, *,
+        prefixes: Sequence[str] | None = None, max_concurrency: int = 8,
+    ) -> AsyncIterator[str]:
+        """
+        Iterate over the names of the blobs in this bucket (and, with a
+        ``delimiter``, of the "directories" up to it) as they are listed.
+
+        Unlike ``list_blobs()``, names are yielded as each page of the listing
+        arrives, and only names are requested from the API. See
+        ``Storage.iter_object_pages()`` for listing several ``prefixes`` at
+        once.
+        """
+        pages = self.storage.iter_object_pages(
+            self.name, prefix=prefix, prefixes=prefixes,
+            match_glob=match_glob, delimiter=delimiter, fields='name',
+            max_concurrency=max_concurrency, session=session,
+        )
+        async for page in pages:
+            for item in page.get('items', []):
+                yield item['name']
+            for dirname in page.get('prefixes', []):
+                yield dirname
+
+    async def download_many(
+        self, blob_names: Iterable[str] | AsyncIterable[str], *,
+        directory: str | None = None, max_concurrency: int = 16,
+        validate: bool = False, timeout: int = DEFAULT_TIMEOUT,
+        session: Session | None = None,
+    ) -> AsyncIterator[DownloadResult]:
+        """
+        Download many blobs concurrently, yielding results as each completes;
+        see ``Storage.download_many()``.
+        """
+        results = self.storage.download_many(
+            self.name, blob_names, directory=directory,
+            max_concurrency=max_concurrency, validate=validate,
+            timeout=timeout, session=session,
+        )
+        async for result in results:
+            yield result
+
+    async def upload_many(
+        self, files: Iterable[tuple[str, str]]
+        | AsyncIterable[tuple[str, str]], *,
+        max_concurrency: int = 16, stats: TransferStats | None = None,
+        metadata: dict[str, Any] | None = None, validate: bool = False,
+        timeout: int = DEFAULT_TIMEOUT, session: Session | None = None,
+    ) -> AsyncIterator[UploadResult]:
+        """
+        Upload many ``(filename, blob_name)`` pairs concurrently, yielding
+        results as each completes; see ``Storage.upload_many()``.
+        """
+        results = self.storage.upload_many(
+            self.name, files, max_concurrency=max_concurrency, stats=stats,
+            metadata=metadata, validate=validate, timeout=timeout,
+            session=session,
+        )
+        async for result in results:
+            yield result
 
     def new_blob(self, blob_name: str) -> Blob:
         return Blob(self, blob_name, {'size': 0})
@@ -95,3 +166,42 @@ class Bucket:
             self.name, params=params,
             session=session,
         )
+
+    async def get_signed_urls(
+            self, blob_names: Iterable[str], expiration: int, *,
+            headers: dict[str, str] | None = None,
+            query_params: dict[str, Any] | None = None,
+            http_method: str = 'GET', iam_client: IamClient | None = None,
+            service_account_email: str | None = None,
+            token: Token | None = None, session: Session | None = None,
+            executor: Executor | None = None, batch_size: int = 256,
+            max_concurrency: int = 8,
+    ) -> AsyncIterator[tuple[str, str]]:
+        """
+        Create signed URLs for many blobs at once, yielding ``(blob_name,
+        url)`` pairs in the order of ``blob_names``.
+
+        This is equivalent to calling ``Blob.get_signed_url()`` for every
+        blob, but much faster: the parts of the canonical request shared by
+        all URLs are only computed once, and blobs are signed in batches of
+        ``batch_size``, with up to ``max_concurrency`` batches in flight.
+
+        When signing locally with a service account key, pass a
+        ``ProcessPoolExecutor`` as ``executor`` to sign batches in parallel
+        worker processes. Otherwise, each blob requires a request to the IAM
+        API, and ``max_concurrency`` bounds how many of these are in flight
+        (``batch_size`` is then ignored).
+        ``gcloud-rest`` signs one batch at a time.
+        """
+        token = token or self.storage.token
+        signer = UrlSigner(
+            token, expiration, headers=headers, query_params=query_params,
+            http_method=http_method,
+            service_account_email=service_account_email,
+        )
+        async for signed_url in signer.sign_urls(
+                self.name, blob_names, token=token, iam_client=iam_client,
+                service_account_email=service_account_email,
+                session=session, executor=executor, batch_size=batch_size,
+                max_concurrency=max_concurrency):
+            yield signed_url
@@ -0,0 +1,147 @@
+"""
+A cache of object metadata, for clients which look up the same objects often.
+"""
+import asyncio
+import collections
+import threading
+import time
+from collections.abc import Awaitable
+from collections.abc import Callable
+from typing import Any
+
+from gcloud.aio.auth import BUILD_GCLOUD_REST  # pylint: disable=no-name-in-module
+
+Key = tuple[str, str]
+
+
+def _version(metadata: dict[str, Any]) -> tuple[int, int]:
+    return (int(metadata.get('generation', 0)),
+            int(metadata.get('metageneration', 0)))
+
+
+class MetadataCache:
+    """
+    An LRU cache of object metadata, whose entries expire ``ttl`` seconds
+    after they were fetched.
+
+    Concurrent lookups of an object which is not cached share a single
+    request. Writes made through the ``Storage`` client holding the cache
+    (uploads, copies, composes, metadata patches, and deletions) invalidate
+    the entries of the objects they change, replacing them with the metadata
+    returned for the write where there is one; changes made by anyone else
+    are only noticed once entries expire. An entry is never replaced by an
+    older generation or metageneration of its object, so that a lookup which
+    raced a write can not reinstate what the write replaced.
+
+    In ``gcloud-rest``, concurrent lookups are not coalesced.
+
+    Args:
+        max_size: The number of objects to cache; beyond it, the least
+            recently used entries are evicted.
+        ttl: How long, in seconds, an entry may be used for.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 60.0) -> None:
+        if max_size < 1 or ttl <= 0:
+            raise ValueError('max_size and ttl must be positive')
+
+        self.max_size = max_size
+        self.ttl = ttl
+        # the time each entry expires at, and its metadata
+        self._entries: collections.OrderedDict[
+            Key, tuple[float, dict[str, Any]]
+        ] = collections.OrderedDict()
+        # the lookups in flight, which only cache their result if they have
+        # not been invalidated in the meantime
+        self._pending: dict[Key, Any] = {}
+        # gcloud-rest clients may be shared between threads
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(
+        self, bucket: str, object_name: str,
+        fetch: Callable[[], Awaitable[dict[str, Any]]],
+    ) -> dict[str, Any]:
+        """
+        Get the metadata of an object, calling ``fetch`` to look it up if it
+        is not cached. Errors raised by ``fetch`` are not cached.
+        """
+        key = (bucket, object_name)
+        with self._lock:
+            metadata = self._lookup(key)
+        if metadata is not None:
+            return dict(metadata)
+
+        if BUILD_GCLOUD_REST:
+            token = object()
+            with self._lock:
+                self._pending[key] = token
+            metadata = await fetch()
+            with self._lock:
+                if self._pending.get(key) is token:
+                    del self._pending[key]
+                    self._put(key, metadata)
+            return dict(metadata)
+
+        lookup = self._pending.get(key)
+        if lookup is None:
+            lookup = asyncio.ensure_future(fetch())
+            lookup.add_done_callback(lambda f: self._fetched(key, f))
+            self._pending[key] = lookup
+        # other callers may still be waiting on the lookup if this one is
+        # cancelled
+        return dict(await asyncio.shield(lookup))
+
+    def invalidate(
+        self, bucket: str, object_name: str,
+        metadata: dict[str, Any] | None = None,
+    ) -> None:
+        """
+        Forget the metadata of an object which has changed; or, if
+        ``metadata`` is its new metadata, cache that instead.
+        """
+        key = (bucket, object_name)
+        with self._lock:
+            self._pending.pop(key, None)
+            self._entries.pop(key, None)
+            if metadata and 'generation' in metadata \
+                    and 'metageneration' in metadata:
+                self._put(key, metadata)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pending.clear()
+            self._entries.clear()
+
+    def _fetched(
+        self, key: Key, lookup: 'asyncio.Future[dict[str, Any]]',
+    ) -> None:
+        with self._lock:
+            if self._pending.get(key) is not lookup:
+                return
+            del self._pending[key]
+            if not lookup.cancelled() and lookup.exception() is None:
+                self._put(key, lookup.result())
+
+    def _lookup(self, key: Key) -> dict[str, Any] | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def _put(self, key: Key, metadata: dict[str, Any]) -> None:
+        current = self._entries.get(key)
+        if current is not None and _version(current[1]) > _version(metadata):
+            return
+
+        self._entries[key] = (time.monotonic() + self.ttl, metadata)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
@@ -0,0 +1,176 @@
+"""
+Checksum helpers for validating object data against GCS metadata.
+
+GCS reports the CRC32C (Castagnoli) checksum of every object, base64-encoded
+in big-endian byte order. The ``google-crc32c`` package is used to compute it
+when installed; otherwise we fall back to a (much slower) pure-Python table
+implementation.
+"""
+import base64
+import hashlib
+import struct
+
+try:
+    import google_crc32c
+    HAS_C_CRC32C = google_crc32c.implementation == 'c'
+    HAS_GOOGLE_CRC32C = True
+except ImportError:  # pragma: no cover
+    HAS_C_CRC32C = False
+    HAS_GOOGLE_CRC32C = False
+
+
+# reversed Castagnoli polynomial
+_CRC32C_POLY = 0x82F63B78
+
+
+def _make_table() -> tuple[int, ...]:
+    table = []
+    for n in range(256):
+        crc = n
+        for _ in range(8):
+            crc = (crc >> 1) ^ _CRC32C_POLY if crc & 1 else crc >> 1
+        table.append(crc)
+    return tuple(table)
+
+
+_CRC32C_TABLE = _make_table()
+
+
+class ChecksumMismatchError(ValueError):
+    """
+    Data did not match the checksum GCS reported for it.
+
+    Attributes:
+        expected: The checksum reported by GCS, as sent by the API.
+        actual: The checksum of the data we received, in the same encoding.
+    """
+
+    def __init__(self, message: str, expected: str, actual: str) -> None:
+        super().__init__(f'{message}: expected {expected}, got {actual}')
+        self.expected = expected
+        self.actual = actual
+
+
+def _crc32c_py(data: bytes | bytearray | memoryview, value: int) -> int:
+    crc = value ^ 0xFFFFFFFF
+    table = _CRC32C_TABLE
+    for byte in bytes(data):
+        crc = table[(crc ^ byte) & 0xFF] ^ (crc >> 8)
+    return crc ^ 0xFFFFFFFF
+
+
+def crc32c(data: bytes | bytearray | memoryview, value: int = 0) -> int:
+    """
+    Compute the CRC32C of data, continuing from a previous ``value``.
+
+    As with ``zlib.crc32()``, passing the checksum of some prefix as ``value``
+    extends it, so that a stream can be checksummed chunk by chunk.
+    """
+    if HAS_GOOGLE_CRC32C:
+        # N.B. the C implementation reads any buffer without copying it
+        if not HAS_C_CRC32C:
+            data = bytes(data)
+        result: int = google_crc32c.extend(value, data)
+        return result
+    return _crc32c_py(data, value)
+
+
+def _gf2_matrix_times(mat: list[int], vec: int) -> int:
+    total = 0
+    i = 0
+    while vec:
+        if vec & 1:
+            total ^= mat[i]
+        vec >>= 1
+        i += 1
+    return total
+
+
+def _gf2_matrix_square(mat: list[int]) -> list[int]:
+    return [_gf2_matrix_times(mat, mat[n]) for n in range(32)]
+
+
+def crc32c_combine(crc1: int, crc2: int, length2: int) -> int:
+    """
+    Combine the CRC32Cs of two adjacent blocks of data.
+
+    Given the checksums ``crc1`` of block A and ``crc2`` of block B (which is
+    ``length2`` bytes long), returns the checksum of A followed by B without
+    needing the data itself. This is the algorithm of zlib's
+    ``crc32_combine()``, applied to the Castagnoli polynomial.
+    """
+    if length2 <= 0:
+        return crc1
+
+    # operator for a single zero bit
+    odd = [_CRC32C_POLY] + [1 << n for n in range(31)]
+    # operators for two, then four zero bits
+    even = _gf2_matrix_square(odd)
+    odd = _gf2_matrix_square(even)
+
+    # apply length2 zero bytes to crc1, squaring the operator for each bit of
+    # length2 (the first squaring yields the operator for one zero byte)
+    while True:
+        even = _gf2_matrix_square(odd)
+        if length2 & 1:
+            crc1 = _gf2_matrix_times(even, crc1)
+        length2 >>= 1
+        if not length2:
+            break
+
+        odd = _gf2_matrix_square(even)
+        if length2 & 1:
+            crc1 = _gf2_matrix_times(odd, crc1)
+        length2 >>= 1
+        if not length2:
+            break
+
+    return crc1 ^ crc2
+
+
+def encode_crc32c(value: int) -> str:
+    """Encode a CRC32C the way GCS reports it in object metadata."""
+    return base64.b64encode(struct.pack('>I', value)).decode('ascii')
+
+
+def decode_crc32c(value: str) -> int:
+    result: int = struct.unpack('>I', base64.b64decode(value))[0]
+    return result
+
+
+def parse_goog_hash(value: str) -> dict[str, str]:
+    """
+    Parse an ``x-goog-hash`` header, eg. ``crc32c=n03x6A==,md5=Ojk9c3dh...``,
+    into a mapping of hash names to their (base64) values.
+    """
+    hashes = {}
+    for item in value.split(','):
+        name, _, encoded = item.strip().partition('=')
+        if name and encoded:
+            hashes[name.lower()] = encoded
+    return hashes
+
+
+class Checksum:
+    """
+    A ``crc32c`` or ``md5`` checksum, computed incrementally and encoded the
+    way GCS reports it.
+    """
+
+    def __init__(self, algorithm: str = 'crc32c') -> None:
+        if algorithm not in {'crc32c', 'md5'}:
+            raise ValueError(f'unsupported checksum: {algorithm!r}')
+        self.algorithm = algorithm
+        self._crc32c = 0
+        self._md5 = hashlib.md5(usedforsecurity=False)
+
+    def update(self, data: bytes | bytearray | memoryview) -> None:
+        if self.algorithm == 'crc32c':
+            self._crc32c = crc32c(data, self._crc32c)
+        else:
+            self._md5.update(data)
+
+    def digest(self) -> str:
+        if self.algorithm == 'crc32c':
+            return encode_crc32c(self._crc32c)
+        return base64.b64encode(self._md5.digest()).decode('ascii')
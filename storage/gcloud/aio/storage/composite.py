@@ -0,0 +1,261 @@
+"""
+Parallel composite uploads, which upload parts of a file concurrently and
+compose them into the final object.
+
+See https://cloud.google.com/storage/docs/parallel-composite-uploads
+"""
+import functools
+import io
+import logging
+import mimetypes
+import os
+import uuid
+from collections.abc import Awaitable
+from collections.abc import Callable
+from typing import Any
+from typing import TYPE_CHECKING
+
+from gcloud.aio.auth import BUILD_GCLOUD_REST  # pylint: disable=no-name-in-module
+from gcloud.aio.auth import NotFoundError  # pylint: disable=no-name-in-module
+
+from .concurrency import run_concurrently
+
+# Selectively load libraries based on the package
+if BUILD_GCLOUD_REST:
+    from requests import Session
+else:
+    from aiohttp import ClientSession as Session  # type: ignore[assignment]
+
+DEFAULT_PART_SIZE = 64 * 1024 * 1024  # 64 MB
+MAX_COMPOSE_COMPONENTS = 32
+# the options of upload_from_filename() which parallel uploads can honour
+PARALLEL_UPLOAD_OPTIONS = frozenset({
+    'part_size', 'max_concurrency', 'content_type', 'metadata', 'progress',
+    'headers', 'session', 'timeout',
+})
+
+log = logging.getLogger(__name__)
+
+
+def split_file(
+    object_name: str, size: int, part_size: int,
+) -> list[tuple[str, int, int]]:
+    """
+    Split a file of ``size`` bytes into parts of at most ``part_size`` bytes,
+    returning the name of the temporary object, offset and length of each.
+    """
+    prefix = f'{object_name}.{uuid.uuid4().hex}'
+    return [(f'{prefix}.part{index:05d}', start, min(part_size, size - start))
+            for index, start in enumerate(range(0, size, part_size))]
+
+
+class FilePart(io.RawIOBase):
+    """
+    A read-only, seekable view of ``length`` bytes of a file, starting at
+    ``start``, such as a single part of a parallel composite upload.
+
+    ``on_read`` is called with the current position after every read.
+    """
+
+    def __init__(self, filename: str, start: int, length: int,
+                 on_read: Callable[[int], None] | None = None) -> None:
+        super().__init__()
+        self._file = open(filename, 'rb')  # pylint: disable=consider-using-with
+        self._start = start
+        self._length = length
+        self._position = 0
+        self._on_read = on_read
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_CUR:
+            offset += self._position
+        elif whence == os.SEEK_END:
+            offset += self._length
+        self._position = max(0, min(offset, self._length))
+        return self._position
+
+    def read(self, size: int | None = -1) -> bytes:
+        remaining = self._length - self._position
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        self._file.seek(self._start + self._position)
+        data = self._file.read(size)
+        self._position += len(data)
+        if self._on_read:
+            self._on_read(self._position)
+        return data
+
+    def close(self) -> None:
+        self._file.close()
+        super().close()
+
+
+class ParallelUploads:
+    """Parallel composite uploads, mixed into ``Storage``."""
+    if TYPE_CHECKING:
+        # provided by Storage
+        compose: Callable[..., Awaitable[dict[str, Any]]]
+        delete: Callable[..., Awaitable[str]]
+        upload: Callable[..., Awaitable[dict[str, Any]]]
+        upload_from_filename: Callable[..., Awaitable[dict[str, Any]]]
+
+    # https://cloud.google.com/storage/docs/parallel-composite-uploads
+    async def upload_parallel(
+        self, bucket: str, object_name: str, filename: str, *,
+        part_size: int = DEFAULT_PART_SIZE,
+        max_concurrency: int = 8,
+        content_type: str | None = None,
+        metadata: dict[str, Any] | None = None,
+        progress: Callable[[int, int, int], None] | None = None,
+        headers: dict[str, str] | None = None,
+        session: Session | None = None,
+        timeout: int = 30,
+    ) -> dict[str, Any]:
+        """
+        Upload a large file as several concurrent uploads.
+
+        The file is split into parts of ``part_size`` bytes, which are uploaded
+        concurrently as temporary objects and then composed into the final
+        object. Temporary objects are deleted afterwards, whether or not the
+        upload succeeded.
+
+        Note that composite objects do not have an MD5 hash (only a CRC32C),
+        and that the temporary objects may incur early deletion charges in
+        some storage classes.
+
+        Args:
+            bucket: The bucket to upload to.
+            object_name: The name of the final object.
+            filename: The local file to upload.
+            part_size: Size, in bytes, of each part.
+            max_concurrency: Maximum number of parts to upload at once.
+            content_type: Content type of the final object; guessed from
+                ``object_name`` by default.
+            metadata: Metadata of the final object.
+            progress: Called as ``progress(index, uploaded, size)`` as part
+                ``index`` is uploaded, where ``uploaded`` is the number of its
+                ``size`` bytes sent so far. Since parts are read in worker
+                threads, this is called from several threads.
+            headers: Custom header values for the requests.
+            session: A specific session to (re)use.
+            timeout: Timeout, in seconds, for each request.
+
+        Returns:
+            dict: The metadata of the final object.
+        """
+        if part_size <= 0:
+            raise ValueError('part_size must be positive')
+
+        content_type = content_type or mimetypes.guess_type(object_name)[0]
+        parts = split_file(object_name, os.path.getsize(filename), part_size)
+        if len(parts) <= 1:
+            # not worth splitting
+            return await self.upload_from_filename(
+                bucket, object_name, filename, content_type=content_type,
+                metadata=metadata, headers=headers, session=session,
+                timeout=timeout,
+            )
+
+        temporary: list[str] = []
+        try:
+            await run_concurrently([
+                functools.partial(
+                    self._upload_part, bucket, name, filename, start, length,
+                    index=index, progress=progress, temporary=temporary,
+                    headers=headers, session=session, timeout=timeout,
+                )
+                for index, (name, start, length) in enumerate(parts)
+            ], max_concurrency)
+
+            sources = await self._compose_tree(
+                bucket, object_name, [name for name, _, _ in parts],
+                temporary=temporary, max_concurrency=max_concurrency,
+                headers=headers, session=session, timeout=timeout,
+            )
+            return await self.compose(
+                bucket, object_name, sources, content_type=content_type,
+                metadata=metadata, headers=dict(headers or {}),
+                session=session, timeout=timeout,
+            )
+        finally:
+            await run_concurrently([
+                functools.partial(
+                    self._delete_temporary, bucket, name,
+                    headers=headers, session=session,
+                )
+                for name in temporary
+            ], max_concurrency)
+
+    async def _compose_tree(
+        self, bucket: str, object_name: str, sources: list[str], *,
+        temporary: list[str], max_concurrency: int,
+        headers: dict[str, str] | None, session: Session | None,
+        timeout: int,
+    ) -> list[str]:
+        """
+        Compose ``sources`` into temporary objects until there are few enough
+        of them to compose into ``object_name``, and return those.
+        """
+        # compose is limited to a number of components, so larger uploads
+        # need to be composed in several steps
+        prefix = f'{object_name}.{uuid.uuid4().hex}'
+        level = 0
+        while len(sources) > MAX_COMPOSE_COMPONENTS:
+            groups = [sources[i:i + MAX_COMPOSE_COMPONENTS]
+                      for i in range(0, len(sources), MAX_COMPOSE_COMPONENTS)]
+            sources = [f'{prefix}.compose{level}-{i:05d}'
+                       for i in range(len(groups))]
+            temporary.extend(sources)
+            await run_concurrently([
+                functools.partial(
+                    self.compose, bucket, name, group,
+                    headers=dict(headers or {}), session=session,
+                    timeout=timeout,
+                )
+                for name, group in zip(sources, groups)
+            ], max_concurrency)
+            level += 1
+        return sources
+
+    async def _upload_part(
+        self, bucket: str, object_name: str, filename: str, start: int,
+        length: int, *, index: int,
+        progress: Callable[[int, int, int], None] | None,
+        temporary: list[str], headers: dict[str, str] | None,
+        session: Session | None, timeout: int,
+    ) -> None:
+        def on_read(position: int) -> None:
+            if progress:
+                progress(index, position, length)
+
+        # recorded before uploading, so that a part is cleaned up even if we
+        # fail after it was created
+        temporary.append(object_name)
+        await self.upload(
+            bucket, object_name, FilePart(filename, start, length, on_read),
+            content_type='application/octet-stream',
+            headers=dict(headers or {}), session=session,
+            force_resumable_upload=True, timeout=timeout,
+        )
+
+    async def _delete_temporary(
+        self, bucket: str, object_name: str, *,
+        headers: dict[str, str] | None, session: Session | None,
+    ) -> None:
+        try:
+            await self.delete(bucket, object_name,
+                              headers=dict(headers or {}), session=session)
+        except NotFoundError:
+            pass
+        except Exception as e:  # pylint: disable=broad-except
+            log.warning('could not delete temporary object %s/%s: %s',
+                        bucket, object_name, e)
@@ -0,0 +1,51 @@
+"""
+Incremental compressors for pre-encoding uploads.
+
+``gzip`` and ``deflate`` use the standard library; ``zstd`` requires the
+``zstandard`` package. Note that GCS only transcodes (ie. decompresses on
+download) objects encoded with ``gzip``; objects with any other encoding are
+always served as stored.
+"""
+import zlib
+from typing import Protocol
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:  # pragma: no cover
+    HAS_ZSTD = False
+
+
+class Compressor(Protocol):
+    def compress(self, data: bytes, /) -> bytes:
+        ...
+
+    def flush(self) -> bytes:
+        ...
+
+
+def compressor(encoding: str, level: int | None = None) -> Compressor:
+    """
+    Create a compressor producing data with the given ``Content-Encoding``.
+
+    Args:
+        encoding: One of ``'gzip'``, ``'deflate'``, or ``'zstd'``.
+        level: Compression level; defaults to the highest level for ``gzip``
+            and ``deflate`` and to the library default for ``zstd``.
+    """
+    if encoding in {'gzip', 'deflate'}:
+        # the zlib "wbits" control the container format: +16 for a gzip
+        # header and trailer, or a plain zlib stream (HTTP's "deflate")
+        wbits = zlib.MAX_WBITS | 16 if encoding == 'gzip' else zlib.MAX_WBITS
+        return zlib.compressobj(9 if level is None else level,
+                                zlib.DEFLATED, wbits)
+
+    if encoding == 'zstd':
+        if not HAS_ZSTD:
+            raise ValueError('zstd compression requires the zstandard '
+                             'package')
+        options = {} if level is None else {'level': level}
+        zstd: Compressor = zstandard.ZstdCompressor(**options).compressobj()
+        return zstd
+
+    raise ValueError(f'unsupported content encoding: {encoding!r}')
@@ -0,0 +1,203 @@
+"""
+Helpers for running many requests at once.
+"""
+import asyncio
+from collections.abc import AsyncIterable
+from collections.abc import AsyncIterator
+from collections.abc import Awaitable
+from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Sequence
+from typing import Any
+from typing import TypeVar
+
+from gcloud.aio.auth import BUILD_GCLOUD_REST  # pylint: disable=no-name-in-module
+
+# Selectively load libraries based on the package
+if BUILD_GCLOUD_REST:
+    from concurrent.futures import FIRST_COMPLETED
+    from concurrent.futures import ThreadPoolExecutor
+    from concurrent.futures import wait
+
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+async def run_concurrently(
+    calls: Sequence[Callable[[], Awaitable[T]]], max_concurrency: int,
+) -> list[T]:
+    """
+    Call each of ``calls`` with at most ``max_concurrency`` of them in flight
+    at a time, and return their results in order.
+
+    In ``gcloud-rest``, calls are made from a thread pool; sessions are safe to
+    share between threads. If any call fails, the remaining calls are
+    cancelled before the error is raised, so that none of them keeps running
+    in the background.
+    """
+    if max_concurrency <= 0:
+        raise ValueError('max_concurrency must be positive')
+
+    if BUILD_GCLOUD_REST:
+        pool = ThreadPoolExecutor(max_workers=max_concurrency)
+        try:
+            futures = [pool.submit(call) for call in calls]
+            return [await f.result() for f in futures]
+        finally:
+            pool.shutdown(cancel_futures=True)
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def bounded(call: Callable[[], Awaitable[T]]) -> T:
+        async with semaphore:
+            return await call()
+
+    tasks = [asyncio.ensure_future(bounded(call)) for call in calls]
+    try:
+        return list(await asyncio.gather(*tasks))
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def iterate_concurrently(
+    iterators: Sequence[Callable[[], AsyncIterator[T]]], max_concurrency: int,
+) -> AsyncIterator[T]:
+    """
+    Consume the iterators created by ``iterators``, with at most
+    ``max_concurrency`` of them in flight at a time, and yield their items as
+    they arrive.
+
+    Items of a single iterator are yielded in order, but those of different
+    iterators are interleaved. In ``gcloud-rest``, the iterators are instead
+    consumed one after the other. If any iterator fails, or the caller stops
+    iterating, the others are cancelled.
+    """
+    if max_concurrency <= 0:
+        raise ValueError('max_concurrency must be positive')
+
+    if BUILD_GCLOUD_REST:
+        for iterator in iterators:
+            async for item in iterator():
+                yield item
+        return
+
+    async for item in _interleave(iterators, max_concurrency):
+        yield item
+
+
+async def _interleave(
+    iterators: Sequence[Callable[[], AsyncIterator[T]]], max_concurrency: int,
+) -> AsyncIterator[T]:
+    # each producer puts its items, then either None once it is done or the
+    # error it failed with
+    queue: asyncio.Queue[tuple[T] | Exception | None] = asyncio.Queue(
+        maxsize=max_concurrency,
+    )
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def produce(iterator: Callable[[], AsyncIterator[T]]) -> None:
+        try:
+            async with semaphore:
+                async for item in iterator():
+                    await queue.put((item,))
+        except Exception as e:  # pylint: disable=broad-except
+            await queue.put(e)
+        else:
+            await queue.put(None)
+
+    tasks = [asyncio.ensure_future(produce(iterator))
+             for iterator in iterators]
+    try:
+        remaining = len(tasks)
+        while remaining:
+            result = await queue.get()
+            if result is None:
+                remaining -= 1
+            elif isinstance(result, Exception):
+                raise result
+            else:
+                yield result[0]
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def map_as_completed(
+    call: Callable[[T], Awaitable[R]],
+    items: Iterable[T] | AsyncIterable[T], max_concurrency: int,
+) -> AsyncIterator[R]:
+    """
+    Call ``call`` on each of ``items``, with at most ``max_concurrency`` calls
+    in flight at a time, and yield their results in the order they complete.
+
+    ``items`` may be an async iterable; items are only taken from it as calls
+    complete. In ``gcloud-rest``, calls are made from a thread pool. If any
+    call fails, or the caller stops iterating, the calls in flight are
+    cancelled.
+    """
+    if max_concurrency <= 0:
+        raise ValueError('max_concurrency must be positive')
+
+    if BUILD_GCLOUD_REST:
+        pool = ThreadPoolExecutor(max_workers=max_concurrency)
+        try:
+            futures: set[Any] = set()
+            async for item in _iterate(items):
+                futures.add(pool.submit(call, item))
+                if len(futures) < max_concurrency:
+                    continue
+                done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield await future.result()
+            while futures:
+                done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield await future.result()
+        finally:
+            pool.shutdown(cancel_futures=True)
+        return
+
+    async for result in _map_tasks(call, items, max_concurrency):
+        yield result
+
+
+async def _map_tasks(
+    call: Callable[[T], Awaitable[R]],
+    items: Iterable[T] | AsyncIterable[T], max_concurrency: int,
+) -> AsyncIterator[R]:
+    pending: set[asyncio.Future[R]] = set()
+    try:
+        async for item in _iterate(items):
+            pending.add(asyncio.ensure_future(call(item)))
+            if len(pending) < max_concurrency:
+                continue
+            finished, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED,
+            )
+            for task in finished:
+                yield task.result()
+        while pending:
+            finished, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED,
+            )
+            for task in finished:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def _iterate(
+    items: Iterable[T] | AsyncIterable[T],
+) -> AsyncIterator[T]:
+    if isinstance(items, Iterable):
+        for item in items:
+            yield item
+    else:
+        async for item in items:
+            yield item
@@ -0,0 +1,316 @@
+"""
+A seekable reader for random access to GCS objects, eg. by columnar formats
+which read a footer and then scattered blocks of a file.
+"""
+import collections
+import functools
+import os
+from collections.abc import Awaitable
+from collections.abc import Callable
+from typing import Any
+from typing import TYPE_CHECKING
+
+from gcloud.aio.auth import BUILD_GCLOUD_REST  # pylint: disable=no-name-in-module
+
+from .concurrency import run_concurrently
+from .constants import DEFAULT_TIMEOUT
+from .sliced import IncompleteSliceError
+
+# Selectively load libraries based on the package
+if BUILD_GCLOUD_REST:
+    from requests import Session
+else:
+    from aiohttp import ClientSession as Session  # type: ignore[assignment]
+
+DEFAULT_READ_BLOCK_SIZE = 256 * 1024  # 256 KB
+DEFAULT_READ_CACHE_SIZE = 64  # blocks
+
+
+class BlockCache:
+    """
+    The ``cache_size`` most recently used blocks of ``block_size`` bytes of an
+    object of ``size`` bytes, which fetches the blocks it's missing with
+    ``fetch(start, end)``.
+    """
+
+    def __init__(
+        self, fetch: Callable[[int, int], Awaitable[bytes]], size: int, *,
+        block_size: int, cache_size: int, max_concurrency: int,
+    ) -> None:
+        self.size = size
+        self.block_size = block_size
+        self.cache_size = cache_size
+        self.max_concurrency = max_concurrency
+        self._fetch = fetch
+        self._blocks: collections.OrderedDict[int, bytes] = (
+            collections.OrderedDict()
+        )
+
+    def __contains__(self, index: int) -> bool:
+        return index in self._blocks
+
+    def clear(self) -> None:
+        self._blocks.clear()
+
+    async def get(
+        self, first: int, last: int, missing: list[int],
+    ) -> dict[int, bytes]:
+        """
+        Get blocks ``first`` to ``last`` (inclusive), fetching those in
+        ``missing`` (which may also include others to read ahead).
+        """
+        # the blocks this read needs may not all fit in the cache
+        blocks = {i: self._blocks[i] for i in range(first, last + 1)
+                  if i in self._blocks}
+        blocks.update(await self._fetch_blocks(missing))
+        for i in range(first, last + 1):
+            if i in self._blocks:
+                self._blocks.move_to_end(i)
+        return blocks
+
+    async def _fetch_blocks(self, indices: list[int]) -> dict[int, bytes]:
+        # coalesce runs of adjacent blocks into a single request each
+        runs: list[list[int]] = []
+        for i in indices:
+            if runs and runs[-1][-1] == i - 1:
+                runs[-1].append(i)
+            else:
+                runs.append([i])
+
+        async def fetch(run: list[int]) -> dict[int, bytes]:
+            start = run[0] * self.block_size
+            end = min((run[-1] + 1) * self.block_size, self.size)
+            data = await self._fetch(start, end)
+            return {i: data[(i - run[0]) * self.block_size:
+                            (i - run[0] + 1) * self.block_size]
+                    for i in run}
+
+        blocks: dict[int, bytes] = {}
+        for fetched in await run_concurrently(
+                [functools.partial(fetch, run) for run in runs],
+                self.max_concurrency):
+            blocks.update(fetched)
+
+        for i, block in blocks.items():
+            self._blocks[i] = block
+            self._blocks.move_to_end(i)
+        while len(self._blocks) > self.cache_size:
+            self._blocks.popitem(last=False)
+        return blocks
+
+
+class ObjectReader:
+    """
+    A file-like reader of a GCS object, with ``seek()``, ``read()`` and
+    ``readinto()``.
+
+    The object is read in aligned blocks of ``block_size`` bytes, of which the
+    ``cache_size`` most recently used are cached. A read fetches all the
+    blocks it's missing at once, as one ranged request per run of adjacent
+    blocks; reads which continue where the previous one left off also fetch
+    the next ``read_ahead`` blocks along with them.
+
+    Create readers with ``Storage.open_reader()``; ``fetch(start, end)`` must
+    return bytes ``start`` to ``end`` (exclusive) of the object.
+    """
+
+    def __init__(
+        self, fetch: Callable[[int, int], Awaitable[bytes]], size: int, *,
+        block_size: int = DEFAULT_READ_BLOCK_SIZE,
+        cache_size: int = DEFAULT_READ_CACHE_SIZE,
+        read_ahead: int = 1,
+        max_concurrency: int = 8,
+    ) -> None:
+        if block_size < 1 or cache_size < 1 or max_concurrency < 1:
+            raise ValueError('block_size, cache_size and max_concurrency must '
+                             'be positive')
+        if read_ahead < 0:
+            raise ValueError('read_ahead must not be negative')
+
+        self.size = size
+        self.block_size = block_size
+        self.read_ahead = read_ahead
+        self._position = 0
+        # where the last read ended, to spot sequential reads
+        self._last_end = -1
+        self._blocks = BlockCache(fetch, size, block_size=block_size,
+                                  cache_size=cache_size,
+                                  max_concurrency=max_concurrency)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_CUR:
+            offset += self._position
+        elif whence == os.SEEK_END:
+            offset += self.size
+        elif whence != os.SEEK_SET:
+            raise ValueError(f'invalid whence: {whence}')
+        if offset < 0:
+            raise ValueError('negative seek position')
+        self._position = offset
+        return self._position
+
+    async def read(self, size: int = -1) -> bytes:
+        """
+        Read up to ``size`` bytes from the current position, or until the
+        end of the object if ``size`` is negative.
+        """
+        start = min(self._position, self.size)
+        end = self.size if size < 0 else min(start + size, self.size)
+        data = await self._read_range(start, end)
+        self._position = max(self._position, end)
+        return data
+
+    async def readinto(self, buffer: bytearray | memoryview) -> int:
+        """
+        Read up to ``len(buffer)`` bytes from the current position into a
+        writable ``buffer``, and return the number of bytes read.
+        """
+        view = memoryview(buffer).cast('B')
+        data = await self.read(view.nbytes)
+        view[:len(data)] = data
+        return len(data)
+
+    def close(self) -> None:
+        self._blocks.clear()
+
+    async def __aenter__(self) -> 'ObjectReader':
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    async def _read_range(self, start: int, end: int) -> bytes:
+        if start >= end:
+            return b''
+
+        first = start // self.block_size
+        last = (end - 1) // self.block_size
+        missing = [i for i in range(first, last + 1) if i not in self._blocks]
+        if missing and start == self._last_end:
+            last_block = (self.size - 1) // self.block_size
+            missing.extend(
+                i for i in range(last + 1,
+                                 min(last + self.read_ahead, last_block) + 1)
+                if i not in self._blocks
+            )
+        self._last_end = end
+
+        blocks = await self._blocks.get(first, last, missing)
+        data = b''.join(blocks[i] for i in range(first, last + 1))
+        offset = first * self.block_size
+        return data[start - offset:end - offset]
+
+
+class RangeReads:
+    """
+    Random access to objects with ranged requests, mixed into ``Storage``.
+    """
+    if TYPE_CHECKING:
+        # provided by Storage
+        download_metadata: Callable[..., Awaitable[dict[str, Any]]]
+        _download: Callable[..., Awaitable[bytes]]
+
+    async def download_range(
+        self, bucket: str, object_name: str, start: int,
+        end: int | None = None, *,
+        params: dict[str, str] | None = None,
+        headers: dict[str, Any] | None = None,
+        timeout: int = DEFAULT_TIMEOUT,
+        session: Session | None = None,
+    ) -> bytes:
+        """
+        Download bytes ``start`` to ``end`` (exclusive, or the end of the
+        object if ``None``) of a GCS object. A negative ``start`` downloads
+        the last ``-start`` bytes of the object instead, without needing to
+        know its size, eg. to read a file's footer.
+
+        Note that ranges of objects which GCS decompresses for us are
+        ignored; pass ``'Accept-Encoding': 'gzip'`` in ``headers`` to read
+        the object as stored.
+        """
+        if start < 0:
+            if end is not None:
+                raise ValueError('a tail read can not have an end')
+            byte_range = f'bytes={start}'
+        elif end is None:
+            byte_range = f'bytes={start}-'
+        elif end <= start:
+            return b''
+        else:
+            byte_range = f'bytes={start}-{end - 1}'
+
+        return await self._download(
+            bucket, object_name,
+            headers={**(headers or {}), 'Range': byte_range},
+            timeout=timeout, params={**(params or {}), 'alt': 'media'},
+            session=session,
+        )
+
+    async def open_reader(
+        self, bucket: str, object_name: str, *,
+        block_size: int = DEFAULT_READ_BLOCK_SIZE,
+        cache_size: int = DEFAULT_READ_CACHE_SIZE,
+        read_ahead: int = 1,
+        max_concurrency: int = 8,
+        headers: dict[str, Any] | None = None,
+        timeout: int = DEFAULT_TIMEOUT,
+        session: Session | None = None,
+    ) -> ObjectReader:
+        """
+        Open a GCS object for random access, as a seekable file-like
+        ``ObjectReader``.
+
+        Reads are served from a cache of ``cache_size`` blocks of
+        ``block_size`` bytes; those missing are fetched with as few ranged
+        requests as possible, along with ``read_ahead`` more blocks when
+        reading sequentially. The reader is pinned to the object's current
+        generation, so it keeps reading consistent data even if the object is
+        overwritten, and it reads objects as they are stored, ie. compressed
+        objects are not decompressed.
+
+        Args:
+            bucket: The bucket from which to read.
+            object_name: The object within the bucket to read.
+            block_size: The size of the blocks the object is read in.
+            cache_size: The number of blocks to cache.
+            read_ahead: The number of blocks to fetch past the end of a
+                sequential read.
+            max_concurrency: Maximum number of ranged requests in flight for
+                a single read.
+            headers: Custom header values for the requests.
+            timeout: Timeout, in seconds, for each request.
+            session: A specific session to (re)use.
+        """
+        metadata = await self.download_metadata(
+            bucket, object_name, headers=dict(headers or {}),
+            timeout=timeout, session=session,
+        )
+        size = int(metadata['size'])
+        params = {'generation': str(metadata['generation'])}
+
+        async def fetch(start: int, end: int) -> bytes:
+            data = await self.download_range(
+                bucket, object_name, start, end, params=params,
+                headers={**(headers or {}), 'Accept-Encoding': 'gzip'},
+                timeout=timeout, session=session,
+            )
+            if len(data) != end - start:
+                raise IncompleteSliceError(
+                    f'got {len(data)} of {end - start} bytes from '
+                    f'{bucket}/{object_name} at offset {start}',
+                )
+            return data
+
+        return ObjectReader(
+            fetch, size, block_size=block_size, cache_size=cache_size,
+            read_ahead=read_ahead, max_concurrency=max_concurrency,
+        )
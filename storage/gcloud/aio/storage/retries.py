@@ -0,0 +1,25 @@
+"""
+Helpers for operations which retry their own requests, eg. each slice of a
+sliced download.
+"""
+from gcloud.aio.auth import GoogleAPIError  # pylint: disable=no-name-in-module
+from gcloud.aio.auth import RetryPolicy  # pylint: disable=no-name-in-module
+
+
+def is_transient(error: Exception, policy: RetryPolicy) -> bool:
+    """Whether ``policy`` considers ``error`` worth retrying."""
+    if isinstance(error, GoogleAPIError):
+        return policy.is_retryable_status(error.status)
+    return policy.is_retryable_error(error)
+
+
+def retry_delay(error: Exception, policy: RetryPolicy, attempt: int) -> float:
+    """
+    How long to wait before retrying after ``error``, on the given (1-indexed)
+    attempt, honouring any ``Retry-After`` header up to ``policy``'s
+    ``max_backoff``.
+    """
+    retry_after = None
+    if isinstance(error, GoogleAPIError):
+        retry_after = (error.headers or {}).get('Retry-After')
+    return policy.backoff(attempt, retry_after)
@@ -0,0 +1,309 @@
+"""
+Downloads of objects as several concurrent ranged requests.
+"""
+import asyncio
+import contextlib
+import functools
+import logging
+import mmap
+import os
+from collections.abc import Awaitable
+from collections.abc import Callable
+from collections.abc import Iterator
+from typing import Any
+from typing import TYPE_CHECKING
+
+from gcloud.aio.auth import BUILD_GCLOUD_REST  # pylint: disable=no-name-in-module
+from gcloud.aio.auth import RetryPolicy  # pylint: disable=no-name-in-module
+
+from .checksums import ChecksumMismatchError
+from .checksums import crc32c
+from .checksums import crc32c_combine
+from .checksums import encode_crc32c
+from .checksums import HAS_C_CRC32C
+from .concurrency import run_concurrently
+from .constants import DEFAULT_TIMEOUT
+from .retries import is_transient
+from .retries import retry_delay
+from .streams import StreamResponse
+
+# Selectively load libraries based on the package
+if BUILD_GCLOUD_REST:
+    from time import sleep
+    from requests import Session
+else:
+    from asyncio import sleep  # type: ignore[assignment]
+    from aiohttp import ClientSession as Session  # type: ignore[assignment]
+
+DEFAULT_SLICE_SIZE = 16 * 1024 * 1024  # 16 MB
+SLICE_READ_SIZE = 256 * 1024  # 256 KB
+
+log = logging.getLogger(__name__)
+
+
+class IncompleteSliceError(Exception):
+    """The connection was closed before a slice was fully downloaded."""
+
+
+@contextlib.contextmanager
+def map_file(filename: str, size: int) -> Iterator[memoryview]:
+    """
+    Create a file of ``size`` bytes and map it into memory, so that it can be
+    written in place. If writing it fails, the file is removed: being
+    preallocated, it would otherwise look like a complete one.
+    """
+    try:
+        with open(filename, 'wb+') as f:
+            f.truncate(size)
+            if not size:
+                # empty files can not be memory-mapped
+                yield memoryview(bytearray())
+                return
+            with mmap.mmap(f.fileno(), size) as mm, memoryview(mm) as view:
+                yield view
+    except BaseException:
+        if os.path.exists(filename):
+            os.unlink(filename)
+        raise
+
+
+async def update_crc32c(data: bytes, value: int) -> int:
+    """
+    Extend the CRC32C ``value`` with ``data``. Without google-crc32c's C
+    implementation this is slow enough that it mustn't block the event loop,
+    so it runs in the default executor instead.
+    """
+    if BUILD_GCLOUD_REST or HAS_C_CRC32C:
+        return crc32c(data, value)
+    crc: int = await asyncio.get_running_loop().run_in_executor(
+        None, crc32c, data, value,
+    )
+    return crc
+
+
+def check_slices(
+    name: str, slices: list[tuple[int, int]], crcs: list[int], expected: str,
+) -> None:
+    """
+    Check the CRC32C of each of the ``(start, end)`` slices of an object,
+    combined, against that of the whole object.
+    """
+    crc = 0
+    for (start, end), slice_crc in zip(slices, crcs):
+        crc = crc32c_combine(crc, slice_crc, end - start)
+    if encode_crc32c(crc) != expected:
+        raise ChecksumMismatchError(f'CRC32C mismatch downloading {name}',
+                                    expected, encode_crc32c(crc))
+
+
+class SlicedDownloads:
+    """
+    Downloads of objects as several concurrent ranged requests, mixed into
+    ``Storage``.
+    """
+    if TYPE_CHECKING:
+        # provided by Storage
+        download: Callable[..., Awaitable[bytes]]
+        download_metadata: Callable[..., Awaitable[dict[str, Any]]]
+        download_to_filename: Callable[..., Awaitable[None]]
+        _download_stream: Callable[..., Awaitable[StreamResponse]]
+
+    async def download_sliced(
+        self, bucket: str, object_name: str, *,
+        slice_size: int = DEFAULT_SLICE_SIZE,
+        max_concurrency: int = 8,
+        validate: bool = True,
+        retry_policy: RetryPolicy | None = None,
+        headers: dict[str, Any] | None = None,
+        timeout: int = DEFAULT_TIMEOUT,
+        session: Session | None = None,
+    ) -> bytearray:
+        """
+        Download a GCS object as several concurrent ranged requests.
+
+        A single download is limited by the throughput of a single connection;
+        for large objects, fetching slices in parallel is often much faster.
+        Each slice is written straight into a preallocated buffer and is
+        retried on its own if it fails, so a dropped connection only costs us
+        that one slice.
+
+        Args:
+            bucket: The bucket from which to download.
+            object_name: The object within the bucket to download.
+            slice_size: Size, in bytes, of each ranged request.
+            max_concurrency: Maximum number of slices to download at once.
+            validate: Whether to check the downloaded data against the
+                object's CRC32C.
+            retry_policy: Controls retries of failed slices. Defaults to
+                ``RetryPolicy()``.
+            headers: Custom header values for the requests.
+            timeout: Timeout, in seconds, for each request.
+            session: A specific session to (re)use.
+
+        Returns:
+            bytearray: The object's data.
+
+        Raises:
+            ChecksumMismatchError: The data did not match the object's CRC32C.
+        """
+        metadata = await self.download_metadata(
+            bucket, object_name, headers=dict(headers or {}),
+            timeout=timeout, session=session,
+        )
+        if metadata.get('contentEncoding') == 'gzip':
+            # ranges are ignored when GCS decompresses objects for us
+            return bytearray(await self.download(
+                bucket, object_name, headers=headers,
+                timeout=timeout, session=session,
+            ))
+
+        buffer = bytearray(int(metadata['size']))
+        with memoryview(buffer) as view:
+            await self._download_slices(
+                bucket, object_name, metadata, view,
+                slice_size=slice_size, max_concurrency=max_concurrency,
+                validate=validate, retry_policy=retry_policy,
+                headers=headers, timeout=timeout, session=session,
+            )
+        return buffer
+
+    async def download_sliced_to_filename(
+        self, bucket: str, object_name: str, filename: str, *,
+        slice_size: int = DEFAULT_SLICE_SIZE,
+        max_concurrency: int = 8,
+        validate: bool = True,
+        retry_policy: RetryPolicy | None = None,
+        headers: dict[str, Any] | None = None,
+        timeout: int = DEFAULT_TIMEOUT,
+        session: Session | None = None,
+    ) -> None:
+        """
+        Download a GCS object to a file as several concurrent ranged requests.
+
+        Works as ``download_sliced()``, except that the file is preallocated
+        and memory-mapped, so slices are written to disk in place rather than
+        ever holding the whole object in memory. If the download fails, the
+        partially written file is removed.
+        """
+        metadata = await self.download_metadata(
+            bucket, object_name, headers=dict(headers or {}),
+            timeout=timeout, session=session,
+        )
+        if metadata.get('contentEncoding') == 'gzip':
+            # ranges are ignored when GCS decompresses objects for us
+            await self.download_to_filename(
+                bucket, object_name, filename, headers=headers,
+                timeout=timeout, session=session,
+            )
+            return
+
+        with map_file(filename, int(metadata['size'])) as view:
+            await self._download_slices(
+                bucket, object_name, metadata, view,
+                slice_size=slice_size, max_concurrency=max_concurrency,
+                validate=validate, retry_policy=retry_policy,
+                headers=headers, timeout=timeout, session=session,
+            )
+
+    async def _download_slices(
+        self, bucket: str, object_name: str, metadata: dict[str, Any],
+        view: memoryview, *, slice_size: int, max_concurrency: int,
+        validate: bool, retry_policy: RetryPolicy | None, **kwargs: Any,
+    ) -> None:
+        # kwargs hold the headers, timeout and session of each request
+        if slice_size <= 0:
+            raise ValueError('slice_size must be positive')
+
+        slices = [(start, min(start + slice_size, len(view)))
+                  for start in range(0, len(view), slice_size)]
+        params = {'alt': 'media'}
+        if 'generation' in metadata:
+            # make sure every slice comes from the same version of the object
+            params['generation'] = str(metadata['generation'])
+        policy = retry_policy or RetryPolicy()
+        expected = metadata.get('crc32c') if validate else None
+
+        crcs = await run_concurrently([
+            functools.partial(
+                self._download_slice, bucket, object_name, view, start, end,
+                params=params, policy=policy, validate=bool(expected),
+                **kwargs,
+            )
+            for start, end in slices
+        ], max_concurrency)
+
+        if expected:
+            check_slices(f'{bucket}/{object_name}', slices, crcs, expected)
+
+    async def _download_slice(
+        self, bucket: str, object_name: str, view: memoryview,
+        start: int, end: int, *, params: dict[str, str],
+        policy: RetryPolicy, validate: bool,
+        headers: dict[str, Any] | None, timeout: int,
+        session: Session | None,
+    ) -> int:
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return await self._download_range(
+                    bucket, object_name, view, start, end, params=params,
+                    validate=validate, headers=headers, timeout=timeout,
+                    session=session,
+                )
+            except Exception as e:  # pylint: disable=broad-except
+                if not (isinstance(e, IncompleteSliceError)
+                        or is_transient(e, policy)):
+                    raise
+                if not policy.can_retry(attempt):
+                    raise
+
+                delay = retry_delay(e, policy, attempt)
+                log.info('retrying bytes %d-%d of %s/%s in %.2fs: %s',
+                         start, end - 1, bucket, object_name, delay, e)
+                await sleep(delay)  # type: ignore[func-returns-value,misc]
+
+    async def _download_range(
+        self, bucket: str, object_name: str, view: memoryview,
+        start: int, end: int, *, params: dict[str, str], validate: bool,
+        headers: dict[str, Any] | None, timeout: int,
+        session: Session | None,
+    ) -> int:
+        """
+        Download bytes ``start`` to ``end`` of an object into place in
+        ``view``, and return their CRC32C if ``validate``, or else 0.
+        """
+        stream = await self._download_stream(
+            bucket, object_name, params=dict(params),
+            headers={**(headers or {}), 'Range': f'bytes={start}-{end - 1}'},
+            timeout=timeout, session=session,
+        )
+        async with stream:
+            if stream.content_length not in {0, end - start}:
+                # eg. the server ignored our Range header
+                raise ValueError(
+                    f'expected {end - start} bytes from {bucket}/'
+                    f'{object_name} at offset {start}, got a response of '
+                    f'{stream.content_length} bytes',
+                )
+
+            crc = 0
+            offset = start
+            while offset < end:
+                chunk = await stream.read(min(SLICE_READ_SIZE, end - offset))
+                if not chunk:
+                    break
+                if offset + len(chunk) > end:
+                    raise ValueError(f'received too many bytes from {bucket}/'
+                                     f'{object_name} at offset {start}')
+                view[offset:offset + len(chunk)] = chunk
+                offset += len(chunk)
+                if validate:
+                    crc = await update_crc32c(chunk, crc)
+
+        if offset < end:
+            raise IncompleteSliceError(
+                f'connection closed after {offset - start} of {end - start} '
+                f'bytes from {bucket}/{object_name} at offset {start}',
+            )
+        return crc
@@ -1,13 +1,15 @@
-import binascii
-import enum
-import gzip
-import io
+import asyncio
+import contextlib
+import errno
+import functools
 import json
 import logging
-import mimetypes
+import mmap
 import os
 import warnings
-from collections.abc import Iterator
+from collections.abc import AsyncIterator
+from collections.abc import Callable
+from collections.abc import Sequence
 from typing import Any
 from typing import AnyStr
 from typing import IO
@@ -15,26 +17,42 @@ from urllib.parse import quote
 
 from gcloud.aio.auth import AioSession  # pylint: disable=no-name-in-module
 from gcloud.aio.auth import BUILD_GCLOUD_REST  # pylint: disable=no-name-in-module
+from gcloud.aio.auth import PoolPolicy  # pylint: disable=no-name-in-module
+from gcloud.aio.auth import RetryPolicy  # pylint: disable=no-name-in-module
 from gcloud.aio.auth import Token  # pylint: disable=no-name-in-module
 
+from .batch import BatchOperations
 from .bucket import Bucket
+from .cache import MetadataCache
+from .checksums import Checksum
+from .checksums import ChecksumMismatchError
+from .composite import PARALLEL_UPLOAD_OPTIONS
+from .composite import ParallelUploads
+from .concurrency import iterate_concurrently
 from .constants import DEFAULT_TIMEOUT
+from .reader import RangeReads
+from .sliced import SLICE_READ_SIZE
+from .sliced import SlicedDownloads
+from .streams import StreamResponse
+from .sync import delete_extra
+from .sync import HashCache
+from .sync import plan_sync
+from .sync import SyncResult
+from .sync import transfer_files
+from .transfers import BulkTransfers
+from .uploads import BufferStream
+from .uploads import DEFAULT_UPLOAD_CHUNK_SIZE
+from .uploads import Uploads
+from .uploads import UploadType
 
 # Selectively load libraries based on the package
 if BUILD_GCLOUD_REST:
-    from time import sleep
-    from requests import HTTPError as ResponseError
     from requests import Session
     from builtins import open as file_open
 else:
     from aiofiles import open as file_open  # type: ignore[no-redef]
-    from asyncio import sleep  # type: ignore[assignment]
-    from aiohttp import (  # type: ignore[assignment]
-        ClientResponseError as ResponseError,
-    )
     from aiohttp import ClientSession as Session  # type: ignore[assignment]
 
-MAX_CONTENT_LENGTH_SIMPLE_UPLOAD = 5 * 1024 * 1024  # 5 MB
 SCOPES = [
     'https://www.googleapis.com/auth/devstorage.full_control',
 ]
@@ -59,95 +77,50 @@ def init_api_root(
     return False, 'https://www.googleapis.com'
 
 
-def choose_boundary() -> str:
-    """Stolen from urllib3.filepost.choose_boundary() as of v1.26.2."""
-    return binascii.hexlify(os.urandom(16)).decode('ascii')
-
-
-def encode_multipart_formdata(
-    fields: list[tuple[dict[str, str], bytes]],
-    boundary: str,
-) -> tuple[bytes, str]:
-    """
-    Stolen from urllib3.filepost.encode_multipart_formdata() as of v1.26.2.
-
-    Very heavily modified to be compatible with our gcloud-rest converter and
-    to avoid unnecessary urllib3 dependencies (since that's only included with
-    requests, not aiohttp).
+def preallocate(fd: int, size: int) -> None:
     """
-    body: list[bytes] = []
-    for headers, data in fields:
-        body.append(f'--{boundary}\r\n'.encode())
-
-        # The below is from RequestFields.render_headers()
-        # Since we only use Content-Type, we could simplify the below to a
-        # single line... but probably best to be safe for future modifications.
-        for field in [
-            'Content-Disposition', 'Content-Type',
-            'Content-Location',
-        ]:
-            value = headers.pop(field, None)
-            if value:
-                body.append(f'{field}: {value}\r\n'.encode())
-        for field, value in headers.items():
-            # N.B. potential bug copied from urllib3 code; zero values should
-            # be sent! Keeping it for now, since Google libs use urllib3 for
-            # their examples.
-            if value:
-                body.append(f'{field}: {value}\r\n'.encode())
-
-        body.append(b'\r\n')
-        body.append(data)
-        body.append(b'\r\n')
-
-    body.append(f'--{boundary}--\r\n'.encode())
-
-    # N.B. 'multipart/form-data' in upstream, but Google wants 'related'
-    content_type = f'multipart/related; boundary={boundary}'
-
-    return b''.join(body), content_type
-
-
-class UploadType(enum.Enum):
-    SIMPLE = 1
-    RESUMABLE = 2
-    MULTIPART = 3  # unused: SIMPLE upgrades to MULTIPART when metadata exists
-
-
-class StreamResponse:
+    Reserve ``size`` bytes of disk for a file up front, so that it is not
+    fragmented and we run out of space before writing rather than halfway
+    through. Does nothing where the filesystem doesn't support it.
     """
-    This class provides an abstraction between the slightly different
-    recommended streaming implementations between requests and aiohttp.
-    """
-
-    def __init__(self, response: Any) -> None:
-        self._response = response
-        self._iter: Iterator[bytes] | None = None
+    if size <= 0 or not hasattr(os, 'posix_fallocate'):
+        return
+    try:
+        os.posix_fallocate(fd, 0, size)
+    except OSError as e:
+        if e.errno not in {errno.EINVAL, errno.EOPNOTSUPP}:
+            raise
 
-    @property
-    def content_length(self) -> int:
-        return int(self._response.headers.get('content-length', 0))
 
-    async def read(self, size: int = -1) -> bytes:
-        chunk: bytes
-        if BUILD_GCLOUD_REST:
-            if self._iter is None:
-                self._iter = self._response.iter_content(chunk_size=size)
-            chunk = next(self._iter, b'')
-        else:
-            chunk = await self._response.content.read(size)
-        return chunk
+def resume_offset(partial: str, metadata: dict[str, Any]) -> int:
+    """
+    The number of bytes of an object left in the ``partial`` file of an
+    earlier download, from which a download can resume.
+    """
+    # ranges are ignored when GCS decompresses objects for us; and since a
+    # finished download is renamed straight away, a partial file of full size
+    # is one which was preallocated but never completed
+    if metadata.get('contentEncoding') == 'gzip' \
+            or not os.path.exists(partial):
+        return 0
+    size = os.path.getsize(partial)
+    return size if size < int(metadata['size']) else 0
 
-    async def __aenter__(self) -> Any:
-        # strictly speaking, since this method can't be called via gcloud-rest,
-        # we know the return type is aiohttp.ClientResponse
-        return await self._response.__aenter__()
 
-    async def __aexit__(self, *exc_info: Any) -> None:
-        await self._response.__aexit__(*exc_info)
+def stored_crc32c(metadata: dict[str, Any]) -> str | None:
+    """
+    The crc32c to check a download written to disk against, if any: that of
+    a gzip-encoded object covers its compressed data, while we write it
+    decompressed.
+    """
+    if metadata.get('contentEncoding') == 'gzip':
+        return None
+    crc: str | None = metadata.get('crc32c')
+    return crc
 
 
-class Storage:
+class Storage(BatchOperations, BulkTransfers, ParallelUploads, RangeReads,
+              SlicedDownloads, Uploads):
     _api_root: str
     _api_is_dev: bool
     _api_root_read: str
@@ -160,16 +133,23 @@ class Storage:
             session: Session | None = None,
             api_root: str | None = None,
             api_is_dev: bool | None = None,
+            pool_policy: PoolPolicy | None = None,
+            retry_policy: RetryPolicy | None = None,
+            metadata_cache: MetadataCache | None = None,
     ) -> None:
         self._api_is_dev, self._api_root = init_api_root(api_root, api_is_dev)
         self._api_root_read = f'{self._api_root}/storage/v1/b'
         self._api_root_write = f'{self._api_root}/upload/storage/v1/b'
 
-        self.session = AioSession(session, verify_ssl=not self._api_is_dev)
+        self.session = AioSession(
+            session, verify_ssl=not self._api_is_dev,
+            pool_policy=pool_policy, retry_policy=retry_policy,
+        )
         self.token = token or Token(
             service_file=service_file, scopes=SCOPES,
             session=self.session.session,  # type: ignore[arg-type]
         )
+        self.metadata_cache = metadata_cache
 
     async def _headers(self) -> dict[str, str]:
         if self._api_is_dev:
@@ -180,6 +160,14 @@ class Storage:
             'Authorization': f'Bearer {token}',
         }
 
+    def _forget_metadata(
+        self, bucket: str, object_name: str,
+        metadata: dict[str, Any] | None = None,
+    ) -> None:
+        # we wrote to the object, so any metadata we cached for it is stale
+        if self.metadata_cache is not None:
+            self.metadata_cache.invalidate(bucket, object_name, metadata)
+
     # This method makes the following API call:
     # https://cloud.google.com/storage/docs/json_api/v1/buckets/list
     async def list_buckets(
@@ -255,18 +243,7 @@ class Storage:
         # object, which explains why `rewriteTo` is a POST endpoint; when no
         # metadata is given, we have to send an empty body.
         # * https://cloud.google.com/storage/docs/json_api/v1/objects#resource
-        metadict = (metadata or {}).copy()
-        metadict = {
-            self._format_metadata_key(k): v
-            for k, v in metadict.items()
-        }
-        if 'metadata' in metadict:
-            metadict['metadata'] = {
-                str(k): str(v) if v is not None else None
-                for k, v in metadict['metadata'].items()
-            }
-
-        metadata_ = json.dumps(metadict)
+        metadata_ = json.dumps(self._format_metadata(metadata or {}))
 
         headers = headers or {}
         headers.update(await self._headers())
@@ -293,6 +270,8 @@ class Storage:
             )
             data = await resp.json(content_type=None)
 
+        self._forget_metadata(destination_bucket, new_name,
+                              data.get('resource'))
         return data
 
     async def delete(
@@ -319,6 +298,7 @@ class Storage:
         except (AttributeError, TypeError):
             data = str(resp.text)
 
+        self._forget_metadata(bucket, object_name)
         return data
 
     async def download(
@@ -326,25 +306,194 @@ class Storage:
         headers: dict[str, Any] | None = None,
         timeout: int = DEFAULT_TIMEOUT,
         session: Session | None = None,
+        validate: bool = False,
     ) -> bytes:
+        """
+        Download a GCS object.
+
+        With ``validate``, the data is checksummed as it is received and
+        checked against the ``x-goog-hash`` of the response, raising a
+        ``ChecksumMismatchError`` if they differ. Responses to ranged or
+        compressed requests can't be checked, since that hash covers the
+        whole object as stored.
+        """
         return await self._download(
             bucket, object_name, headers=headers,
             timeout=timeout, params={'alt': 'media'},
-            session=session,
+            session=session, validate=validate,
         )
 
     async def download_to_filename(
-        self, bucket: str, object_name: str,
-        filename: str, **kwargs: Any,
+        self, bucket: str, object_name: str, filename: str, *,
+        headers: dict[str, Any] | None = None,
+        timeout: int = DEFAULT_TIMEOUT,
+        session: Session | None = None,
+        validate: bool = False,
+        resume: bool = False,
     ) -> None:
+        """
+        Download a GCS object to a file, writing it to disk as it arrives
+        rather than holding it in memory.
+
+        The object is written to a partial file next to ``filename``, which
+        is preallocated to the object's size where the platform supports it,
+        and only renamed to ``filename`` once complete. If the download
+        fails, the partial file is removed, unless ``resume`` is set.
+
+        Args:
+            bucket: The bucket from which to download.
+            object_name: The object within the bucket to download.
+            filename: The file to write the object to.
+            headers: Custom header values for the request.
+            timeout: Timeout, in seconds, for the request. This is the time
+                to the beginning of the response data (TTFB).
+            session: A specific session to (re)use.
+            validate: Whether to check the data against the object's CRC32C
+                (see ``download()``), raising a ``ChecksumMismatchError`` if
+                they differ.
+            resume: Whether to keep the partial file of a failed download, and
+                to complete one left by an earlier call by only requesting its
+                missing tail. Partial files are tied to the generation of the
+                object, so an object which has since changed is downloaded
+                anew.
+        """
+        headers = dict(headers or {})
+        params = {'alt': 'media'}
+        partial = f'{filename}.part'
+        offset = 0
+        metadata: dict[str, Any] = {}
+        if resume:
+            metadata = await self.download_metadata(
+                bucket, object_name, headers=dict(headers), timeout=timeout,
+                session=session,
+            )
+            params['generation'] = str(metadata['generation'])
+            partial = f'{filename}.{params["generation"]}.part'
+            offset = resume_offset(partial, metadata)
+            if offset:
+                headers['Range'] = f'bytes={offset}-'
+
+        stream = await self._download_stream(
+            bucket, object_name, params=params, headers=headers,
+            timeout=timeout, session=session,
+            validate=validate and not offset,
+        )
+        try:
+            await self._write_stream(
+                stream, partial, offset if stream.status == 206 else 0,
+                stored_crc32c(metadata) if validate else None,
+            )
+        except BaseException as e:
+            stream.close()
+            if (not resume or isinstance(e, ChecksumMismatchError)) \
+                    and os.path.exists(partial):
+                os.unlink(partial)
+            raise
+
+        os.replace(partial, filename)
+
+    @staticmethod
+    async def _write_stream(
+        stream: StreamResponse, filename: str, offset: int,
+        expected_crc32c: str | None,
+    ) -> None:
+        checksum = None
+        if expected_crc32c:
+            # x-goog-hash only covers whole objects, so check the tail and
+            # whatever we already had against the object's metadata
+            checksum = Checksum('crc32c')
+            if offset:
+                with open(filename, 'rb') as partial:
+                    while chunk := partial.read(SLICE_READ_SIZE):
+                        checksum.update(chunk)
+
+        position = offset
         async with file_open(  # type: ignore[attr-defined]
                 filename,
-                mode='wb+',
-        ) as file_object:
-            await file_object.write(
-                await self.download(bucket, object_name, **kwargs),
+                mode='r+b' if offset else 'wb',
+        ) as f:
+            try:
+                await f.seek(offset)
+                if 'content-encoding' not in stream.headers:
+                    preallocate(f.fileno(), offset + stream.content_length)
+
+                async for chunk in stream:
+                    await f.write(chunk)
+                    position += len(chunk)
+                    if checksum is not None:
+                        checksum.update(chunk)
+            finally:
+                # drop any preallocated space we didn't get to fill, so that
+                # a resumed download picks up from the right place
+                await f.truncate(position)
+
+        if checksum is not None and checksum.digest() != expected_crc32c:
+            assert expected_crc32c is not None
+            raise ChecksumMismatchError(
+                'downloaded data does not match its crc32c',
+                expected_crc32c, checksum.digest(),
             )
 
+    async def sync(
+        self, source: str, destination: str, *,
+        delete: bool = False,
+        checksum: str = 'crc32c',
+        hash_cache: HashCache | None = None,
+        max_concurrency: int = 8,
+        dry_run: bool = False,
+        session: Session | None = None,
+        timeout: int = DEFAULT_TIMEOUT,
+    ) -> SyncResult:
+        """
+        Make a local directory and a bucket prefix hold the same files, like
+        ``rsync``.
+
+        One of ``source`` and ``destination`` is a ``gs://bucket/prefix`` URL
+        and the other a local directory; files are uploaded or downloaded
+        accordingly. Files which exist on both sides are only transferred if
+        their size or checksum differ.
+
+        Args:
+            source: The directory or prefix to copy files from.
+            destination: The directory or prefix to copy files to.
+            delete: Whether to delete files from the destination which do not
+                exist in the source.
+            checksum: Compare files by their ``'crc32c'`` or ``'md5'`` hash.
+                Objects without an MD5 hash (ie. composite objects) are
+                compared by CRC32C regardless.
+            hash_cache: Cache of the hashes of local files. Pass a cache with
+                a filename to avoid hashing unchanged files again in later
+                syncs; it is saved once the sync is done.
+            max_concurrency: Maximum number of files compared or transferred
+                at once.
+            dry_run: Only report what would be transferred and deleted.
+            session: A specific session to (re)use.
+            timeout: Timeout, in seconds, for each request.
+
+        Returns:
+            SyncResult: The files transferred, skipped, and deleted.
+        """
+        if checksum not in {'crc32c', 'md5'}:
+            raise ValueError(f'unsupported checksum: {checksum!r}')
+        plan = await plan_sync(self, source, destination, session=session,
+                               timeout=timeout)
+        cache = hash_cache or HashCache()
+
+        result = await transfer_files(
+            self, plan, checksum=checksum, cache=cache, dry_run=dry_run,
+            max_concurrency=max_concurrency, session=session, timeout=timeout,
+        )
+        try:
+            if delete and dry_run:
+                result.deleted = plan.extra
+            elif delete:
+                await delete_extra(self, plan, result,
+                                   max_concurrency=max_concurrency,
+                                   session=session, timeout=timeout)
+        finally:
+            cache.save()
+        return result
+
     async def download_metadata(
         self, bucket: str, object_name: str, *,
         headers: dict[str, Any] | None = None,
@@ -364,6 +513,10 @@ class Storage:
         headers: dict[str, Any] | None = None,
         timeout: int = DEFAULT_TIMEOUT,
         session: Session | None = None,
+        validate: bool = False,
+        high_water: int | None = None,
+        low_water: int | None = None,
+        on_progress: Callable[[int], None] | None = None,
     ) -> StreamResponse:
         """
         Download a GCS object in a buffered stream.
@@ -376,16 +529,29 @@ class Storage:
                 function, this is the time to the beginning of the response
                 data (TTFB).
             session: A specific session to (re)use.
+            validate: Whether to checksum the data as it is read and check it
+                against the ``x-goog-hash`` of the response (see
+                ``download()``). The final ``read()`` raises a
+                ``ChecksumMismatchError`` if they differ.
+            high_water: How much data may be buffered before reading from the
+                connection is paused (see ``StreamResponse``).
+            low_water: How little data must be buffered before reading from
+                the connection resumes.
+            on_progress: Called with the total number of bytes read so far
+                after every read.
 
         Returns:
             StreamResponse: A object encapsulating the stream, similar to
-            io.BufferedIOBase, but it only supports the read() function.
+            io.BufferedIOBase, which supports ``read()``, ``readinto()``, and
+            iteration over its chunks.
         """
         return await self._download_stream(
             bucket, object_name,
             headers=headers, timeout=timeout,
             params={'alt': 'media'},
-            session=session,
+            session=session, validate=validate,
+            high_water=high_water, low_water=low_water,
+            on_progress=on_progress,
         )
 
     async def list_objects(
@@ -407,6 +573,129 @@ class Storage:
         data: dict[str, Any] = await resp.json(content_type=None)
         return data
 
+    async def iter_objects(
+        self, bucket: str, *, prefix: str = '',
+        prefixes: Sequence[str] | None = None,
+        match_glob: str = '', delimiter: str = '',
+        fields: str | None = None,
+        max_concurrency: int = 8,
+        params: dict[str, str] | None = None,
+        headers: dict[str, Any] | None = None,
+        session: Session | None = None,
+        timeout: int = DEFAULT_TIMEOUT,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Iterate over the metadata of the objects in a bucket, as the listing
+        is fetched.
+
+        See ``iter_object_pages()`` for the arguments.
+        """
+        pages = self.iter_object_pages(
+            bucket, prefix=prefix, prefixes=prefixes, match_glob=match_glob,
+            delimiter=delimiter, fields=fields,
+            max_concurrency=max_concurrency, params=params, headers=headers,
+            session=session, timeout=timeout,
+        )
+        async for page in pages:
+            for item in page.get('items', []):
+                yield item
+
+    async def iter_object_pages(
+        self, bucket: str, *, prefix: str = '',
+        prefixes: Sequence[str] | None = None,
+        match_glob: str = '', delimiter: str = '',
+        fields: str | None = None,
+        max_concurrency: int = 8,
+        params: dict[str, str] | None = None,
+        headers: dict[str, Any] | None = None,
+        session: Session | None = None,
+        timeout: int = DEFAULT_TIMEOUT,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Iterate over the pages of a bucket's object listing.
+
+        In ``gcloud-aio``, the next page is requested as soon as a page
+        arrives, so that it is fetched while the caller handles the current
+        one.
+
+        Args:
+            bucket: The bucket to list.
+            prefix: Only list objects whose names start with this prefix.
+            prefixes: List objects under each of these prefixes instead, with
+                up to ``max_concurrency`` listings in flight at a time. Pages
+                of different listings are interleaved as they arrive (in
+                ``gcloud-rest``, prefixes are listed one after the other).
+            match_glob: Only list objects whose names match this glob.
+            delimiter: List the "directories" of object names up to this
+                delimiter as ``prefixes`` of the pages, rather than the
+                objects within them.
+            fields: The fields of each object to return, eg. ``'name,size'``,
+                to reduce the size of responses; all fields by default.
+            max_concurrency: Maximum number of prefixes listed at once.
+            params: Any further query parameters of the listing, eg.
+                ``maxResults`` or ``versions``.
+            headers: Custom header values for the requests.
+            session: A specific session to (re)use.
+            timeout: Timeout, in seconds, for each request.
+        """
+        params = dict(params or {})
+        params.update({k: v for k, v in (('matchGlob', match_glob),
+                                         ('delimiter', delimiter)) if v})
+        if fields is not None:
+            params['fields'] = f'items({fields}),prefixes,nextPageToken'
+
+        if prefixes is None:
+            prefixes = [prefix]
+        listings = [
+            functools.partial(
+                self._iter_listing, bucket, {**params, 'prefix': p},
+                headers=headers, session=session, timeout=timeout,
+            )
+            for p in prefixes
+        ]
+
+        if len(listings) == 1:
+            pages = listings[0]()
+        else:
+            pages = iterate_concurrently(listings, max_concurrency)
+        async for page in pages:
+            yield page
+
+    async def _iter_listing(
+        self, bucket: str, params: dict[str, str], *,
+        headers: dict[str, Any] | None,
+        session: Session | None, timeout: int,
+    ) -> AsyncIterator[dict[str, Any]]:
+        def fetch(page_token: str) -> Any:
+            return self.list_objects(
+                bucket, params={**params, 'pageToken': page_token},
+                headers=dict(headers or {}), session=session,
+                timeout=timeout,
+            )
+
+        if BUILD_GCLOUD_REST:
+            page_token = ''
+            while True:
+                page: dict[str, Any] = await fetch(page_token)
+                yield page
+                page_token = page.get('nextPageToken', '')
+                if not page_token:
+                    return
+
+        next_page = asyncio.ensure_future(fetch(''))
+        try:
+            while True:
+                page = await next_page
+                page_token = page.get('nextPageToken', '')
+                if page_token:
+                    # prefetch the next page while this one is consumed
+                    next_page = asyncio.ensure_future(fetch(page_token))
+                yield page
+                if not page_token:
+                    return
+        finally:
+            next_page.cancel()
+
     # https://cloud.google.com/storage/docs/json_api/v1/how-tos/upload
     # pylint: disable=too-many-locals
     async def upload(
@@ -419,76 +708,79 @@ class Storage:
         force_resumable_upload: bool | None = None,
         zipped: bool = False,
         timeout: int = 30,
+        chunk_size: int = DEFAULT_UPLOAD_CHUNK_SIZE,
+        compression: str = 'gzip',
+        compression_level: int | None = None,
+        validate: bool = False,
     ) -> dict[str, Any]:
-        url = f'{self._api_root_write}/{bucket}/o'
-        stream = self._preprocess_data(file_data)
-
-        parameters = parameters or {}
-        if zipped:
-            parameters['contentEncoding'] = 'gzip'
-            # Here we load the file-like object data into memory in chunks and
-            # re-write it compressed. This is implemented like this so we don't
-            # load the whole file into memory at once.
-            stream = self._compress_file_in_chunks(input_stream=stream)
-
-        if BUILD_GCLOUD_REST and isinstance(stream, io.StringIO):
-            # HACK: `requests` library does not accept `str` as `data` in `put`
-            # HTTP request.
-            stream = io.BytesIO(stream.getvalue().encode('utf-8'))
-
-        content_length = self._get_stream_len(stream)
-
-        # mime detection method same as in aiohttp 3.4.4
-        content_type = content_type or mimetypes.guess_type(object_name)[0]
-
-        headers = headers or {}
-        headers.update(await self._headers())
-        headers.update({
-            'Content-Length': str(content_length),
-            'Content-Type': content_type or '',
-        })
+        """
+        Upload data to a GCS object.
 
-        upload_type = self._decide_upload_type(
-            force_resumable_upload,
-            content_length,
+        With ``validate``, the CRC32C of the data is computed as it is sent.
+        Resumable uploads send it along with their final chunk, so that GCS
+        rejects the upload if the data it received differs; otherwise, it is
+        checked against the CRC32C GCS reports for the new object, raising a
+        ``ChecksumMismatchError`` if they differ.
+        """
+        data = await self._upload(
+            bucket, object_name, file_data, content_type=content_type,
+            parameters=parameters, headers=headers, metadata=metadata,
+            session=session, force_resumable_upload=force_resumable_upload,
+            zipped=zipped, timeout=timeout, chunk_size=chunk_size,
+            compression=compression, compression_level=compression_level,
+            validate=validate,
         )
-        log.debug('using %r gcloud storage upload method', upload_type)
-
-        if upload_type == UploadType.RESUMABLE:
-            return await self._upload_resumable(
-                url, object_name, stream, parameters, headers,
-                metadata=metadata, session=session, timeout=timeout,
-            )
-        if upload_type == UploadType.SIMPLE:
-            if metadata:
-                return await self._upload_multipart(
-                    url, object_name, stream, parameters, headers, metadata,
-                    session=session, timeout=timeout,
-                )
-            return await self._upload_simple(
-                url, object_name, stream, parameters, headers, session=session,
-                timeout=timeout,
-            )
-
-        raise TypeError(f'upload type {upload_type} not supported')
+        self._forget_metadata(bucket, object_name, data)
+        return data
 
     async def upload_from_filename(
         self, bucket: str, object_name: str,
-        filename: str,
+        filename: str, *, parallel: bool = False,
         **kwargs: Any,
     ) -> dict[str, Any]:
-        async with file_open(  # type: ignore[attr-defined]
-                filename,
-                mode='rb',
-        ) as file_object:
-            contents = await file_object.read()
-            return await self.upload(bucket, object_name, contents, **kwargs)
+        if parallel:
+            unsupported = sorted(set(kwargs) - PARALLEL_UPLOAD_OPTIONS)
+            if unsupported:
+                raise TypeError(f'parallel uploads do not support '
+                                f'{", ".join(unsupported)}')
+            return await self.upload_parallel(bucket, object_name, filename,
+                                              **kwargs)
+
+        size = os.path.getsize(filename)
+        upload_type = self._decide_upload_type(
+            kwargs.get('force_resumable_upload'), size,
+        )
+        if upload_type == UploadType.RESUMABLE:
+            # stream large files, so that we only ever read a single chunk
+            # of them into memory
+            with open(filename, 'rb') as f:
+                return await self.upload(bucket, object_name, f, **kwargs)
+
+        if not size:
+            # empty files can't be memory-mapped
+            return await self.upload(bucket, object_name, b'', **kwargs)
+
+        # send the file straight from the page cache, rather than reading it
+        # into memory (and copying it again into a multipart body)
+        with open(filename, 'rb') as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            with BufferStream([mapping]) as contents:
+                return await self.upload(bucket, object_name, contents,
+                                         **kwargs)
+        finally:
+            # a view of the mapping may outlive the upload, eg. in the
+            # traceback of a failed request, in which case it gets unmapped
+            # once garbage collected instead
+            with contextlib.suppress(BufferError):
+                mapping.close()
 
     # https://cloud.google.com/storage/docs/json_api/v1/objects/compose
     async def compose(
         self, bucket: str, object_name: str,
         source_object_names: list[str], *,
         content_type: str | None = None,
+        metadata: dict[str, Any] | None = None,
         params: dict[str, str] | None = None,
         headers: dict[str, Any] | None = None,
         session: Session | None = None,
@@ -505,8 +797,11 @@ class Storage:
         payload: dict[str, Any] = {
             'sourceObjects': [{'name': name} for name in source_object_names],
         }
+        destination = self._format_metadata(metadata or {})
         if content_type:
-            payload['destination'] = {'contentType': content_type}
+            destination['contentType'] = content_type
+        if destination:
+            payload['destination'] = destination
         body = json.dumps(payload).encode('utf-8')
         headers.update({
             'Content-Length': str(len(body)),
@@ -519,106 +814,16 @@ class Storage:
             data=body,
         )
         data: dict[str, Any] = await resp.json(content_type=None)
+        self._forget_metadata(bucket, object_name, data)
         return data
 
-    @staticmethod
-    def _get_stream_len(stream: IO[AnyStr]) -> int:
-        current = stream.tell()
-        try:
-            return stream.seek(0, os.SEEK_END)
-        finally:
-            stream.seek(current)
-
-    @staticmethod
-    def _preprocess_data(data: Any) -> IO[Any]:
-        if data is None:
-            return io.StringIO('')
-
-        if isinstance(data, bytes):
-            return io.BytesIO(data)
-        if isinstance(data, str):
-            return io.StringIO(data)
-        if isinstance(data, io.IOBase):
-            return data  # type: ignore[return-value]
-
-        raise TypeError(f'unsupported upload type: "{type(data)}"')
-
-    @staticmethod
-    def _compress_file_in_chunks(input_stream: IO[AnyStr],
-                                 chunk_size: int = 8192) -> IO[bytes]:
-        """
-        Reads the contents of input_stream and writes it gzip-compressed to
-        output_stream in chunks. The chunk size is 8Kb by default, which is a
-        standard filesystem block size.
-        """
-        compressed_stream = io.BytesIO()
-
-        with gzip.open(compressed_stream, 'wb') as gzipped_file:
-            chunk_bytes: bytes
-            while True:
-                chunk = input_stream.read(chunk_size)
-                if not chunk:
-                    break
-                if isinstance(chunk, str):
-                    chunk_bytes = chunk.encode('utf-8')
-                else:
-                    chunk_bytes = chunk
-
-                gzipped_file.write(chunk_bytes)
-
-        # After finishing writing, reset the buffer position so it can be read
-        compressed_stream.seek(0)
-
-        return compressed_stream
-
-    @staticmethod
-    def _decide_upload_type(
-        force_resumable_upload: bool | None,
-        content_length: int,
-    ) -> UploadType:
-        # force resumable
-        if force_resumable_upload is True:
-            return UploadType.RESUMABLE
-
-        # force simple
-        if force_resumable_upload is False:
-            return UploadType.SIMPLE
-
-        # decide based on Content-Length
-        if content_length > MAX_CONTENT_LENGTH_SIMPLE_UPLOAD:
-            return UploadType.RESUMABLE
-
-        return UploadType.SIMPLE
-
-    @staticmethod
-    def _split_content_type(content_type: str) -> tuple[str, str | None]:
-        content_type_and_encoding_split = content_type.split(';')
-        content_type = content_type_and_encoding_split[0].lower().strip()
-
-        encoding = None
-        if len(content_type_and_encoding_split) > 1:
-            encoding_str = content_type_and_encoding_split[1].lower().strip()
-            encoding = encoding_str.split('=')[-1]
-
-        return content_type, encoding
-
-    @staticmethod
-    def _format_metadata_key(key: str) -> str:
-        """
-        Formats the fixed-key metadata keys as wanted by the multipart API.
-
-        Ex: Content-Disposition --> contentDisposition
-        """
-        parts = key.split('-')
-        parts = [parts[0].lower()] + [p.capitalize() for p in parts[1:]]
-        return ''.join(parts)
-
     async def _download(
         self, bucket: str, object_name: str, *,
         params: dict[str, str] | None = None,
         headers: dict[str, str] | None = None,
         timeout: int = DEFAULT_TIMEOUT,
         session: Session | None = None,
+        validate: bool = False,
     ) -> bytes:
         # https://cloud.google.com/storage/docs/request-endpoints#encoding
         encoded_object_name = quote(object_name, safe='')
@@ -655,10 +860,14 @@ class Storage:
             # N.B. the GCS API sometimes returns 'application/octet-stream'
             # when a string was uploaded. To avoid potential weirdness, always
             # return a bytes object.
-            try:
-                data = await response.read()
-            except (AttributeError, TypeError):
-                data = response.content  # type: ignore[assignment]
+            if validate:
+                data = await self._read_validated(StreamResponse(response,
+                                                                 validate))
+            else:
+                try:
+                    data = await response.read()
+                except (AttributeError, TypeError):
+                    data = response.content  # type: ignore[assignment]
 
         return data
 
@@ -668,6 +877,10 @@ class Storage:
         headers: dict[str, str] | None = None,
         timeout: int = DEFAULT_TIMEOUT,
         session: Session | None = None,
+        validate: bool = False,
+        high_water: int | None = None,
+        low_water: int | None = None,
+        on_progress: Callable[[int], None] | None = None,
     ) -> StreamResponse:
         # https://cloud.google.com/storage/docs/request-endpoints#encoding
         encoded_object_name = quote(object_name, safe='')
@@ -694,186 +907,25 @@ class Storage:
                     url, headers=headers, params=params or {},
                     timeout=timeout, stream=True,
                 ),
+                validate, high_water=high_water, low_water=low_water,
+                on_progress=on_progress,
             )
         return StreamResponse(
             await s.get(
                 url, headers=headers, params=params or {},
                 timeout=timeout, auto_decompress=auto_decompress,
             ),
+            validate, high_water=high_water, low_water=low_water,
+            on_progress=on_progress,
         )
 
-    async def _upload_simple(
-        self, url: str, object_name: str,
-        stream: IO[AnyStr], params: dict[str, str],
-        headers: dict[str, str], *,
-        session: Session | None = None,
-        timeout: int = 30,
-    ) -> dict[str, Any]:
-        # https://cloud.google.com/storage/docs/json_api/v1/how-tos/simple-upload
-        params['name'] = object_name
-        params['uploadType'] = 'media'
-
-        s = AioSession(session) if session else self.session
-        resp = await s.post(
-            url, data=stream, headers=headers, params=params,
-            timeout=timeout,
-        )
-        data: dict[str, Any] = await resp.json(content_type=None)
-        return data
-
-    async def _upload_multipart(
-        self, url: str, object_name: str,
-        stream: IO[AnyStr], params: dict[str, str],
-        headers: dict[str, str],
-        metadata: dict[str, Any], *,
-        session: Session | None = None,
-        timeout: int = 30,
-    ) -> dict[str, Any]:
-        # https://cloud.google.com/storage/docs/json_api/v1/how-tos/multipart-upload
-        params['uploadType'] = 'multipart'
-
-        metadata_headers = {'Content-Type': 'application/json; charset=UTF-8'}
-        metadata = {
-            self._format_metadata_key(k): v
-            for k, v in metadata.items()
-        }
-        if 'metadata' in metadata:
-            metadata['metadata'] = {
-                str(k): str(v) if v is not None else None
-                for k, v in metadata['metadata'].items()
-            }
-
-        metadata['name'] = object_name
-
-        raw_body: AnyStr = stream.read()
-        if isinstance(raw_body, str):
-            bytes_body: bytes = raw_body.encode('utf-8')
-        else:
-            bytes_body = raw_body
-
-        parts = [
-            (metadata_headers, json.dumps(metadata).encode('utf-8')),
-            ({'Content-Type': headers['Content-Type']}, bytes_body),
-        ]
-        boundary = choose_boundary()
-        body, content_type = encode_multipart_formdata(parts, boundary)
-        headers.update({
-            'Content-Type': content_type,
-            'Content-Length': str(len(body)),
-            'Accept': 'application/json',
-        })
-
-        s = AioSession(session) if session else self.session
-        if not BUILD_GCLOUD_REST:
-            # Wrap data in BytesIO to ensure aiohttp does not emit warning
-            # when payload size > 1MB
-            body = io.BytesIO(body)  # type: ignore[assignment]
-
-        resp = await s.post(
-            url, data=body, headers=headers, params=params,
-            timeout=timeout,
-        )
-        data: dict[str, Any] = await resp.json(content_type=None)
-        return data
-
-    async def _upload_resumable(
-        self, url: str, object_name: str,
-        stream: IO[AnyStr], params: dict[str, str],
-        headers: dict[str, str], *,
-        metadata: dict[str, Any] | None = None,
-        session: Session | None = None,
-        timeout: int = 30,
-    ) -> dict[str, Any]:
-        # https://cloud.google.com/storage/docs/json_api/v1/how-tos/resumable-upload
-        session_uri = await self._initiate_upload(
-            url, object_name, params,
-            headers, metadata=metadata,
-            session=session,
-        )
-        return await self._do_upload(
-            session_uri, stream, headers=headers,
-            session=session, timeout=timeout,
-        )
-
-    async def _initiate_upload(
-        self, url: str, object_name: str,
-        params: dict[str, str], headers: dict[str, str],
-        *, metadata: dict[str, Any] | None = None,
-        timeout: int = DEFAULT_TIMEOUT,
-        session: Session | None = None,
-    ) -> str:
-        params['uploadType'] = 'resumable'
-
-        metadict = (metadata or {}).copy()
-        metadict = {
-            self._format_metadata_key(k): v
-            for k, v in metadict.items()
-        }
-        if 'metadata' in metadict:
-            metadict['metadata'] = {
-                str(k): str(v) if v is not None else None
-                for k, v in metadict['metadata'].items()
-            }
-
-        metadict.update({'name': object_name})
-        metadata_ = json.dumps(metadict)
-
-        post_headers = headers.copy()
-        post_headers.update({
-            'Content-Length': str(len(metadata_)),
-            'Content-Type': 'application/json; charset=UTF-8',
-            'X-Upload-Content-Type': headers['Content-Type'],
-            'X-Upload-Content-Length': headers['Content-Length'],
-        })
-
-        s = AioSession(session) if session else self.session
-        resp = await s.post(
-            url, headers=post_headers, params=params,
-            data=metadata_, timeout=timeout,
-        )
-        session_uri: str = resp.headers['Location']
-        return session_uri
-
-    async def _do_upload(
-        self, session_uri: str, stream: IO[AnyStr],
-        headers: dict[str, str], *, retries: int = 5,
-        session: Session | None = None,
-        timeout: int = 30,
-    ) -> dict[str, Any]:
-        s = AioSession(session) if session else self.session
-
-        original_close = stream.close
-        original_position = stream.tell()
-        # Prevent the stream being closed if put operation fails
-        stream.close = lambda: None  # type: ignore[method-assign]
-        resp = None
-        try:
-            for tries in range(retries):
-                try:
-                    resp = await s.put(
-                        session_uri, headers=headers,
-                        data=stream, timeout=timeout,
-                    )
-                except ResponseError:
-                    if tries == retries - 1:
-                        raise
-
-                    headers.update({'Content-Range': 'bytes */*'})
-                    stream.seek(original_position)
-
-                    await sleep(  # type: ignore[func-returns-value,misc]
-                        2. ** tries,
-                    )
-                else:
-                    break
-        finally:
-            original_close()
-
-        if resp is None:
-            raise ValueError('null response, this should not happen')
-
-        data: dict[str, Any] = await resp.json(content_type=None)
-        return data
+    @staticmethod
+    async def _read_validated(stream: StreamResponse) -> bytes:
+        # checksum the data as it arrives, rather than once it's all here
+        chunks = []
+        while chunk := await stream.read(SLICE_READ_SIZE):
+            chunks.append(chunk)
+        return b''.join(chunks)
 
     async def patch_metadata(
             self, bucket: str, object_name: str, metadata: dict[str, Any],
@@ -897,6 +949,7 @@ class Storage:
             timeout=timeout,
         )
         data: dict[str, Any] = await resp.json(content_type=None)
+        self._forget_metadata(bucket, object_name, data)
         return data
 
     async def get_bucket_metadata(
@@ -0,0 +1,242 @@
+"""
+Streaming of object downloads, over both aiohttp and requests.
+"""
+from collections.abc import Callable
+from collections.abc import Iterator
+from typing import Any
+
+from gcloud.aio.auth import BUILD_GCLOUD_REST  # pylint: disable=no-name-in-module
+
+from .checksums import Checksum
+from .checksums import ChecksumMismatchError
+from .checksums import parse_goog_hash
+
+STREAM_CHUNK_SIZE = 256 * 1024  # 256 KB
+
+
+class ChunkBuffer:
+    """
+    Hands out the chunks of a requests response in pieces of at most the size
+    asked for, since requests' chunks are only handed out whole.
+    """
+
+    def __init__(self, chunks: Iterator[bytes]) -> None:
+        self._chunks = chunks
+        self._pending = b''
+        self._offset = 0
+
+    def read(self, size: int) -> bytes:
+        if size < 0:
+            rest = self._pending[self._offset:]
+            self._pending = b''
+            return rest + b''.join(self._chunks)
+
+        if self._offset >= len(self._pending):
+            self._pending = next(self._chunks, b'')
+            self._offset = 0
+            if len(self._pending) <= size:
+                # hand out the whole chunk, without copying it
+                chunk = self._pending
+                self._offset = len(chunk)
+                return chunk
+
+        start = self._offset
+        self._offset = min(start + size, len(self._pending))
+        return self._pending[start:self._offset]
+
+
+class StreamResponse:
+    """
+    This class provides an abstraction between the slightly different
+    recommended streaming implementations between requests and aiohttp.
+
+    Besides ``read()``, the stream can be iterated over (``async for chunk in
+    stream``), yielding chunks as they arrive, or read into a caller's buffer
+    with ``readinto()``.
+
+    Args:
+        response: The response to stream.
+        validate: Whether to checksum the data as it is read (see
+            ``Storage.download_stream()``).
+        high_water: With aiohttp, the number of bytes which may be buffered
+            before reading from the connection is paused, which applies
+            backpressure to the server. With requests, which only reads from
+            the connection when asked to, this is the size of the chunks it
+            reads. Defaults to the session's setting with aiohttp, and to
+            ``STREAM_CHUNK_SIZE`` with requests. With aiohttp, this relies on
+            internals of its response streams, so it is best-effort: versions
+            which lack them keep the session's setting.
+        low_water: With aiohttp, the number of buffered bytes below which
+            reading from the connection resumes; defaults to half of
+            ``high_water``. Unused with requests.
+        on_progress: Called with the total number of bytes read so far after
+            every read.
+    """
+
+    def __init__(
+        self, response: Any, validate: bool = False, *,
+        high_water: int | None = None, low_water: int | None = None,
+        on_progress: Callable[[int], None] | None = None,
+    ) -> None:
+        self._response = response
+        self._buffer: ChunkBuffer | None = None
+        self._checksum: Checksum | None = None
+        self._expected_checksum = ''
+        self._bytes_read = 0
+        self._on_progress = on_progress
+
+        self._chunk_size = high_water or STREAM_CHUNK_SIZE
+        if high_water is not None or low_water is not None:
+            self._set_watermarks(self._chunk_size, low_water)
+
+        if validate:
+            self._init_checksum()
+
+    @property
+    def status(self) -> int:
+        status: int = (self._response.status_code if BUILD_GCLOUD_REST
+                       else self._response.status)
+        return status
+
+    @property
+    def headers(self) -> Any:
+        return self._response.headers
+
+    @property
+    def content_length(self) -> int:
+        return int(self._response.headers.get('content-length', 0))
+
+    @property
+    def bytes_read(self) -> int:
+        return self._bytes_read
+
+    async def read(self, size: int = -1) -> bytes:
+        """
+        Read up to ``size`` bytes, or until the end of the stream if ``size``
+        is negative. Returns an empty result once the stream is exhausted.
+        """
+        chunk: bytes
+        if BUILD_GCLOUD_REST:
+            chunk = self._read_pending(size)
+        else:
+            chunk = await self._response.content.read(size)
+        self._consume(chunk)
+        return chunk
+
+    async def readany(self) -> bytes:
+        """
+        Read the next chunk of the stream as it arrived, without waiting for
+        any particular amount of data.
+        """
+        chunk: bytes
+        if BUILD_GCLOUD_REST:
+            chunk = self._read_pending(self._chunk_size)
+        else:
+            chunk = await self._response.content.readany()
+        self._consume(chunk)
+        return chunk
+
+    async def readinto(self, buffer: bytearray | memoryview) -> int:
+        """
+        Read up to ``len(buffer)`` bytes directly into a writable ``buffer``,
+        such as a preallocated ``bytearray`` or ``memoryview``, and return the
+        number of bytes read.
+        """
+        view = memoryview(buffer).cast('B')
+        if not view.nbytes:
+            return 0
+
+        chunk: bytes
+        if BUILD_GCLOUD_REST:
+            chunk = self._read_pending(view.nbytes)
+        else:
+            chunk = await self._response.content.read(view.nbytes)
+        view[:len(chunk)] = chunk
+        self._consume(chunk)
+        return len(chunk)
+
+    def close(self) -> None:
+        """Release the connection, eg. after giving up on the stream."""
+        self._response.close()
+
+    def __aiter__(self) -> 'StreamResponse':
+        return self
+
+    async def __anext__(self) -> bytes:
+        chunk = await self.readany()
+        if not chunk:
+            raise StopAsyncIteration
+        return chunk
+
+    def _read_pending(self, size: int) -> bytes:
+        if self._buffer is None:
+            self._buffer = ChunkBuffer(self._response.iter_content(
+                chunk_size=self._chunk_size,
+            ))
+        return self._buffer.read(size)
+
+    def _consume(self, chunk: bytes) -> None:
+        self._bytes_read += len(chunk)
+        if self._on_progress and chunk:
+            self._on_progress(self._bytes_read)
+        if self._checksum is not None:
+            self._checksum.update(chunk)
+            if not chunk or 0 < self.content_length <= self._bytes_read:
+                self._validate()
+
+    def _set_watermarks(self, high_water: int, low_water: int | None) -> None:
+        low_water = high_water // 2 if low_water is None else low_water
+        if not 0 <= low_water <= high_water:
+            raise ValueError('low_water must be between 0 and high_water')
+        if BUILD_GCLOUD_REST:
+            return
+
+        # aiohttp pauses the transport once more than _high_water bytes are
+        # buffered, and resumes it once fewer than _low_water are; there's
+        # no public way to change them for a single response, so this is
+        # best-effort, and versions of aiohttp without them keep the
+        # session's settings
+        # pylint: disable=protected-access
+        content = self._response.content
+        if hasattr(content, '_high_water') and hasattr(content, '_low_water'):
+            content._high_water = high_water
+            content._low_water = low_water
+
+    def _init_checksum(self) -> None:
+        headers = self._response.headers
+        # x-goog-hash covers the object as stored, so it can't be checked
+        # against partial or transcoded responses
+        stored_encoding = headers.get('x-goog-stored-content-encoding',
+                                      'identity')
+        if self.status != 200 or headers.get('content-encoding') \
+                or stored_encoding != 'identity':
+            return
+
+        if BUILD_GCLOUD_REST:
+            # requests joins repeated headers with commas
+            hashes = parse_goog_hash(headers.get('x-goog-hash', ''))
+        else:
+            hashes = parse_goog_hash(','.join(headers.getall('x-goog-hash',
+                                                             [])))
+        for algorithm in ('crc32c', 'md5'):
+            if algorithm in hashes:
+                self._checksum = Checksum(algorithm)
+                self._expected_checksum = hashes[algorithm]
+                return
+
+    def _validate(self) -> None:
+        assert self._checksum is not None
+        actual = self._checksum.digest()
+        self._checksum = None
+        if actual != self._expected_checksum:
+            raise ChecksumMismatchError('downloaded data does not match its '
+                                        'x-goog-hash',
+                                        self._expected_checksum, actual)
+
+    async def __aenter__(self) -> Any:
+        # strictly speaking, since this method can't be called via gcloud-rest,
+        # we know the return type is aiohttp.ClientResponse
+        return await self._response.__aenter__()
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self._response.__aexit__(*exc_info)
@@ -0,0 +1,361 @@
+"""
+Helpers for synchronizing local directories with bucket prefixes.
+"""
+import asyncio
+import base64
+import functools
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+from typing import TYPE_CHECKING
+
+from gcloud.aio.auth import BUILD_GCLOUD_REST  # pylint: disable=no-name-in-module
+
+from .batch import BatchResult
+from .checksums import crc32c
+from .checksums import encode_crc32c
+from .concurrency import run_concurrently
+
+# Selectively load libraries based on the package
+if BUILD_GCLOUD_REST:
+    from requests import Session
+else:
+    from aiohttp import ClientSession as Session  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from .storage import Storage  # pylint: disable=cyclic-import
+
+HASH_READ_SIZE = 1024 * 1024  # 1 MB
+
+log = logging.getLogger(__name__)
+
+
+class SyncError(Exception):
+    """
+    Some files could not be deleted from the destination of a sync.
+
+    Attributes:
+        failed: The results of the failed deletions.
+    """
+
+    def __init__(self, message: str, failed: list[BatchResult]) -> None:
+        super().__init__(message)
+        self.failed = failed
+
+
+@dataclass
+class SyncResult:
+    """
+    The outcome of a sync, or for a dry run, what it would do.
+
+    Each attribute lists paths relative to the synchronized directory (and
+    bucket prefix), using ``/`` as a separator.
+
+    Attributes:
+        transferred: Files which were missing or differed at the destination.
+        skipped: Files which were already identical at the destination.
+        deleted: Files which were only at the destination, and so deleted.
+    """
+    transferred: list[str] = field(default_factory=list)
+    skipped: list[str] = field(default_factory=list)
+    deleted: list[str] = field(default_factory=list)
+
+
+def hash_file(filename: str, key: str) -> str:
+    """
+    Hash a file, encoded as GCS reports it in the object metadata field
+    ``key``: either ``crc32c`` or ``md5Hash``.
+    """
+    with open(filename, 'rb') as f:
+        if key == 'md5Hash':
+            md5 = hashlib.md5(usedforsecurity=False)
+            while chunk := f.read(HASH_READ_SIZE):
+                md5.update(chunk)
+            return base64.b64encode(md5.digest()).decode('ascii')
+
+        crc = 0
+        while chunk := f.read(HASH_READ_SIZE):
+            crc = crc32c(chunk, crc)
+        return encode_crc32c(crc)
+
+
+class HashCache:
+    """
+    Remembers the hashes of local files, keyed on their path, size and
+    modification time, so that unchanged files are not hashed again. Each
+    hash is only computed once it is asked for.
+
+    If ``filename`` is given, the cache is loaded from that file (if it
+    exists), and ``save()`` writes it back.
+    """
+
+    def __init__(self, filename: str | None = None) -> None:
+        self.filename = filename
+        self._entries: dict[str, list[Any]] = {}
+        if filename and os.path.exists(filename):
+            with open(filename, encoding='utf-8') as f:
+                self._entries = json.load(f)
+
+    def hash(self, path: str, key: str) -> str:
+        """
+        Get a hash of a file, as ``hash_file()`` does, hashing it only if it
+        has changed.
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        hashes: dict[str, str] = {}
+        entry = self._entries.get(path)
+        if entry and entry[:2] == [stat.st_size, stat.st_mtime_ns] \
+                and len(entry) == 3:
+            hashes = entry[2]
+        if key not in hashes:
+            hashes = {**hashes, key: hash_file(path, key)}
+            self.put(path, hashes, stat)
+        return hashes[key]
+
+    def put(self, path: str, hashes: dict[str, str],
+            stat: os.stat_result | None = None) -> None:
+        """
+        Record the known hashes of a file, eg. one just downloaded, keyed on
+        the object metadata field each is reported in.
+        """
+        path = os.path.abspath(path)
+        stat = stat or os.stat(path)
+        self._entries[path] = [stat.st_size, stat.st_mtime_ns, hashes]
+
+    def save(self) -> None:
+        if not self.filename:
+            return
+
+        temporary = f'{self.filename}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(self._entries, f)
+        os.replace(temporary, self.filename)
+
+
+def parse_location(location: str) -> tuple[str | None, str]:
+    """
+    Split a ``gs://bucket/prefix`` URL into its bucket and prefix; local paths
+    are returned as they are, without a bucket.
+    """
+    if not location.startswith('gs://'):
+        return None, location
+
+    bucket, _, prefix = location[len('gs://'):].partition('/')
+    if not bucket:
+        raise ValueError(f'invalid GCS location: {location!r}')
+    if prefix and not prefix.endswith('/'):
+        prefix += '/'
+    return bucket, prefix
+
+
+def list_directory(directory: str) -> dict[str, str]:
+    """
+    Map the relative path (with ``/`` separators) of every file under
+    ``directory`` to its full path.
+    """
+    files = {}
+    for root, _, filenames in os.walk(directory):
+        for filename in filenames:
+            path = os.path.join(root, filename)
+            relative = os.path.relpath(path, directory)
+            files[relative.replace(os.sep, '/')] = path
+    return files
+
+
+@dataclass
+class SyncPlan:
+    """
+    The two sides of a sync: the objects under a bucket prefix and the files
+    under a local directory, keyed on their relative paths.
+    """
+    bucket: str
+    prefix: str
+    directory: str
+    upload: bool
+    objects: dict[str, dict[str, Any]] = field(default_factory=dict)
+    files: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def names(self) -> list[str]:
+        """The paths to transfer, unless they are already identical."""
+        return sorted(self.files if self.upload else self.objects)
+
+    @property
+    def extra(self) -> list[str]:
+        """The paths which only exist at the destination."""
+        destination = self.objects if self.upload else self.files
+        return sorted(set(destination) - set(self.names))
+
+
+def plan_sides(source: str, destination: str) -> SyncPlan:
+    """
+    Work out which side of a sync from ``source`` to ``destination`` is the
+    bucket prefix and which the local directory, and list the latter.
+    """
+    source_bucket, source_path = parse_location(source)
+    destination_bucket, destination_path = parse_location(destination)
+    if (source_bucket is None) == (destination_bucket is None):
+        raise ValueError('exactly one of source and destination must be a '
+                         'gs:// location')
+
+    upload = destination_bucket is not None
+    bucket = destination_bucket or source_bucket
+    assert bucket is not None
+    prefix, directory = ((destination_path, source_path) if upload
+                         else (source_path, destination_path))
+    return SyncPlan(bucket, prefix, directory, upload,
+                    files=list_directory(directory))
+
+
+async def plan_sync(
+    storage: 'Storage', source: str, destination: str, *,
+    session: Session | None, timeout: int,
+) -> SyncPlan:
+    """
+    List both sides of a sync from ``source`` to ``destination``, leaving out
+    objects which would be downloaded outside of the local directory.
+    """
+    plan = plan_sides(source, destination)
+    bucket, prefix = plan.bucket, plan.prefix
+    async for obj in storage.iter_objects(
+            bucket, prefix=prefix, session=session, timeout=timeout,
+            fields='name,size,crc32c,md5Hash'):
+        # skip "directory" placeholders
+        if not obj['name'].endswith('/'):
+            plan.objects[obj['name'][len(prefix):]] = obj
+
+    if not plan.upload:
+        root = os.path.abspath(plan.directory)
+        for name in list(plan.objects):
+            path = os.path.abspath(os.path.join(root, name))
+            if os.path.commonpath([root, path]) != root:
+                log.warning('not syncing %s/%s%s: it would be written '
+                            'outside of %s', bucket, prefix, name, root)
+                del plan.objects[name]
+    return plan
+
+
+def checksum_key(obj: dict[str, Any], checksum: str) -> str:
+    """
+    The metadata field of ``obj`` to compare for the given ``checksum``.
+    Composite objects have no MD5, so we fall back to their CRC32C.
+    """
+    if checksum == 'md5' and obj.get('md5Hash'):
+        return 'md5Hash'
+    return 'crc32c'
+
+
+async def differs(
+    obj: dict[str, Any], path: str, checksum: str, cache: HashCache,
+) -> bool:
+    """Whether the file at ``path`` differs from the object ``obj``."""
+    if int(obj['size']) != os.path.getsize(path):
+        return True
+
+    key = checksum_key(obj, checksum)
+    if not obj.get(key):
+        return True
+
+    if BUILD_GCLOUD_REST:
+        local = cache.hash(path, key)
+    else:
+        local = await asyncio.get_running_loop().run_in_executor(
+            None, cache.hash, path, key,
+        )
+    return bool(local != obj[key])
+
+
+async def sync_file(
+    storage: 'Storage', plan: SyncPlan, name: str, *, checksum: str,
+    cache: HashCache, dry_run: bool, session: Session | None, timeout: int,
+) -> bool:
+    """
+    Transfer a single file of a sync, unless it is already identical at the
+    destination, and return whether it was (or would be) transferred.
+    """
+    obj = plan.objects.get(name)
+    path = (plan.files.get(name)
+            or os.path.join(plan.directory, *name.split('/')))
+    if obj is not None and name in plan.files and not await differs(
+            obj, path, checksum, cache):
+        return False
+    if dry_run:
+        return True
+
+    if plan.upload:
+        await storage.upload_from_filename(
+            plan.bucket, f'{plan.prefix}{name}', path, session=session,
+            timeout=timeout,
+        )
+        return True
+
+    assert obj is not None
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    await storage.download_to_filename(
+        plan.bucket, obj['name'], path, session=session, timeout=timeout,
+    )
+    key = checksum_key(obj, checksum)
+    if obj.get(key):
+        cache.put(path, {key: obj[key]})
+    return True
+
+
+async def transfer_files(
+    storage: 'Storage', plan: SyncPlan, *, checksum: str, cache: HashCache,
+    dry_run: bool, max_concurrency: int, session: Session | None,
+    timeout: int,
+) -> SyncResult:
+    """
+    Transfer the files of a sync which are missing or differ at the
+    destination, with at most ``max_concurrency`` of them at once.
+    """
+    names = plan.names
+    transferred = await run_concurrently([
+        functools.partial(
+            sync_file, storage, plan, name, checksum=checksum, cache=cache,
+            dry_run=dry_run, session=session, timeout=timeout,
+        )
+        for name in names
+    ], max_concurrency)
+
+    result = SyncResult()
+    for name, was_transferred in zip(names, transferred):
+        if was_transferred:
+            result.transferred.append(name)
+        else:
+            result.skipped.append(name)
+    return result
+
+
+async def delete_extra(
+    storage: 'Storage', plan: SyncPlan, result: SyncResult, *,
+    max_concurrency: int, session: Session | None, timeout: int,
+) -> None:
+    """
+    Delete the files which only exist at the destination of a sync, recording
+    them in ``result``.
+    """
+    if not plan.upload:
+        for name in plan.extra:
+            os.remove(plan.files[name])
+            result.deleted.append(name)
+        return
+
+    deletions = storage.delete_many(
+        plan.bucket, [f'{plan.prefix}{name}' for name in plan.extra],
+        max_concurrency=max_concurrency, session=session, timeout=timeout,
+    )
+    failed = []
+    async for deletion in deletions:
+        if deletion.ok or deletion.status == 404:
+            result.deleted.append(deletion.object_name[len(plan.prefix):])
+        else:
+            failed.append(deletion)
+    if failed:
+        raise SyncError(f'could not delete {len(failed)} objects from '
+                        f'{plan.bucket}', failed)
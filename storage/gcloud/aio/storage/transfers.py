@@ -0,0 +1,273 @@
+"""
+Concurrent downloads and uploads of many objects at once, and their
+results.
+"""
+import logging
+import mimetypes
+import os
+import time
+from collections.abc import AsyncIterable
+from collections.abc import AsyncIterator
+from collections.abc import Awaitable
+from collections.abc import Callable
+from collections.abc import Iterable
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+from typing import TYPE_CHECKING
+
+from gcloud.aio.auth import BUILD_GCLOUD_REST  # pylint: disable=no-name-in-module
+from gcloud.aio.auth import RetryPolicy  # pylint: disable=no-name-in-module
+
+from .concurrency import map_as_completed
+from .constants import DEFAULT_TIMEOUT
+from .retries import is_transient
+from .retries import retry_delay
+
+# Selectively load libraries based on the package
+if BUILD_GCLOUD_REST:
+    from time import sleep
+    from requests import Session
+else:
+    from asyncio import sleep  # type: ignore[assignment]
+    from aiohttp import ClientSession as Session  # type: ignore[assignment]
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class DownloadResult:
+    """
+    The outcome of downloading a single object with ``download_many()``.
+
+    Attributes:
+        object_name: The object downloaded.
+        data: The object's data, unless it was written to ``filename``.
+        filename: The file the object was written to, if any.
+        error: The error the download failed with, if it did.
+    """
+    object_name: str
+    data: bytes | None = None
+    filename: str | None = None
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class UploadResult:
+    """
+    The outcome of uploading a single file with ``upload_many()``.
+
+    Attributes:
+        filename: The file uploaded.
+        object_name: The object it was uploaded to.
+        size: The size of the file, in bytes.
+        elapsed: How long the upload took, in seconds, including retries.
+        metadata: The metadata of the new object, if the upload succeeded.
+        error: The error the upload failed with, if it did.
+    """
+    filename: str
+    object_name: str
+    size: int = 0
+    elapsed: float = 0.0
+    metadata: dict[str, Any] | None = None
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class TransferStats:
+    """
+    Running totals of a bulk transfer, updated as each result is yielded.
+
+    Attributes:
+        transferred: The number of files transferred.
+        failed: The number of files which failed to transfer.
+        bytes: The number of bytes transferred.
+        started: When the transfer started, as a ``time.monotonic()`` value.
+    """
+    transferred: int = 0
+    failed: int = 0
+    bytes: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def throughput(self) -> float:
+        """Bytes transferred per second, so far."""
+        elapsed = self.elapsed
+        return self.bytes / elapsed if elapsed > 0 else 0.0
+
+    def add(self, result: UploadResult) -> None:
+        if result.ok:
+            self.transferred += 1
+            self.bytes += result.size
+        else:
+            self.failed += 1
+
+
+class BulkTransfers:
+    """Concurrent transfers of many objects, mixed into ``Storage``."""
+    if TYPE_CHECKING:
+        # provided by Storage
+        download: Callable[..., Awaitable[bytes]]
+        download_to_filename: Callable[..., Awaitable[None]]
+        upload_from_filename: Callable[..., Awaitable[dict[str, Any]]]
+
+    async def download_many(
+        self, bucket: str,
+        object_names: Iterable[str] | AsyncIterable[str], *,
+        directory: str | None = None,
+        max_concurrency: int = 16,
+        validate: bool = False,
+        headers: dict[str, Any] | None = None,
+        timeout: int = DEFAULT_TIMEOUT,
+        session: Session | None = None,
+    ) -> AsyncIterator[DownloadResult]:
+        """
+        Download many objects concurrently, yielding a ``DownloadResult`` for
+        each as it completes (ie. not in the order of ``object_names``).
+
+        A failed download does not raise, nor affect the others; its result
+        holds the error instead. Requests are retried according to the
+        client's ``retry_policy``.
+
+        Args:
+            bucket: The bucket from which to download.
+            object_names: The objects to download; may be an async iterable,
+                eg. the names yielded by ``Bucket.iter_blobs()``.
+            directory: If given, each object is written to a file under it,
+                at the path of the object's name (see
+                ``download_to_filename()``), rather than held in memory.
+                Objects whose names would be written outside of
+                ``directory`` fail with a ``ValueError``.
+            max_concurrency: Maximum number of downloads in flight.
+            validate: Whether to check the data of each object against its
+                checksum (see ``download()``).
+            headers: Custom header values for each request.
+            timeout: Timeout, in seconds, for each request.
+            session: A specific session to (re)use.
+        """
+        root = os.path.abspath(directory) if directory is not None else None
+
+        async def download(name: str) -> DownloadResult:
+            result = DownloadResult(name)
+            try:
+                if root is None:
+                    result.data = await self.download(
+                        bucket, name, headers=dict(headers or {}),
+                        timeout=timeout, session=session, validate=validate,
+                    )
+                    return result
+
+                path = os.path.abspath(os.path.join(root, name))
+                if os.path.commonpath([root, path]) != root \
+                        or name.endswith('/'):
+                    raise ValueError(f'{name!r} can not be written to a '
+                                     f'file under {root}')
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                await self.download_to_filename(
+                    bucket, name, path, headers=dict(headers or {}),
+                    timeout=timeout, session=session, validate=validate,
+                )
+                result.filename = path
+            except Exception as e:  # pylint: disable=broad-except
+                result.error = e
+            return result
+
+        async for result in map_as_completed(download, object_names,
+                                             max_concurrency):
+            yield result
+
+    async def upload_many(
+        self, bucket: str,
+        files: Iterable[tuple[str, str]] | AsyncIterable[tuple[str, str]], *,
+        max_concurrency: int = 16,
+        retry_policy: RetryPolicy | None = None,
+        stats: TransferStats | None = None,
+        metadata: dict[str, Any] | None = None,
+        validate: bool = False,
+        timeout: int = DEFAULT_TIMEOUT,
+        session: Session | None = None,
+    ) -> AsyncIterator[UploadResult]:
+        """
+        Upload many files concurrently, yielding an ``UploadResult`` for each
+        as it completes (ie. not in the order of ``files``).
+
+        Each file is uploaded as by ``upload_from_filename()``, ie. in a
+        single request or as a resumable upload depending on its size. A
+        failed upload does not raise, nor affect the others; its result holds
+        the error instead.
+
+        Args:
+            bucket: The bucket to upload to.
+            files: ``(filename, object_name)`` pairs of the files to upload
+                and the objects to upload them to; may be an async iterable.
+            max_concurrency: Maximum number of uploads in flight.
+            retry_policy: Controls retries of uploads failing with a
+                transient error, which are retried from the start of the file.
+                Defaults to ``RetryPolicy()``.
+            stats: Running totals of the transfer, such as its throughput,
+                which are updated as each result is yielded.
+            metadata: Metadata to apply to every object.
+            validate: Whether to check the data GCS received against the
+                files (see ``upload()``).
+            timeout: Timeout, in seconds, for each request.
+            session: A specific session to (re)use.
+        """
+        policy = retry_policy or RetryPolicy()
+
+        async def upload(item: tuple[str, str]) -> UploadResult:
+            filename, object_name = item
+            result = UploadResult(filename, object_name)
+            started = time.monotonic()
+            try:
+                result.size = os.path.getsize(filename)
+                # the object's name may not have an extension we recognize
+                content_type = (mimetypes.guess_type(object_name)[0]
+                                or mimetypes.guess_type(filename)[0])
+                result.metadata = await self._upload_file(
+                    bucket, object_name, filename, policy=policy,
+                    content_type=content_type, metadata=metadata,
+                    validate=validate, timeout=timeout, session=session,
+                )
+            except Exception as e:  # pylint: disable=broad-except
+                result.error = e
+            result.elapsed = time.monotonic() - started
+            return result
+
+        async for result in map_as_completed(upload, files, max_concurrency):
+            if stats is not None:
+                stats.add(result)
+            yield result
+
+    async def _upload_file(
+        self, bucket: str, object_name: str, filename: str, *,
+        policy: RetryPolicy, **kwargs: Any,
+    ) -> dict[str, Any]:
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return await self.upload_from_filename(
+                    bucket, object_name, filename, **kwargs,
+                )
+            except Exception as e:  # pylint: disable=broad-except
+                if not is_transient(e, policy):
+                    raise
+                if not policy.can_retry(attempt):
+                    raise
+
+                delay = retry_delay(e, policy, attempt)
+                log.info('retrying upload of %s to %s/%s in %.2fs: %s',
+                         filename, bucket, object_name, delay, e)
+                await sleep(delay)  # type: ignore[func-returns-value,misc]
@@ -0,0 +1,165 @@
+# pylint: disable=redefined-outer-name
+import pytest
+from gcloud.aio.auth import BUILD_GCLOUD_REST  # pylint: disable=no-name-in-module
+from gcloud.aio.auth import RetryPolicy  # pylint: disable=no-name-in-module
+from gcloud.aio.storage import Storage
+from gcloud.aio.storage.batch import BatchCall
+from gcloud.aio.storage.batch import decode_batch
+from gcloud.aio.storage.batch import encode_batch
+
+from .fake_gcs import serve_fake_gcs
+
+# Selectively load libraries based on the package
+if BUILD_GCLOUD_REST:
+    from requests import Session
+else:
+    from aiohttp import ClientSession as Session
+
+
+NAMES = [f'tmp/{i:03d}' for i in range(250)]
+RETRY_POLICY = RetryPolicy(initial_backoff=0.01)
+
+
+@pytest.fixture(scope='function')
+def gcs_server():
+    with serve_fake_gcs() as server:
+        yield server
+
+
+@pytest.fixture(scope='function')
+def batch_server(gcs_server):
+    for name in NAMES:
+        gcs_server.store('bucket', name, name.encode())
+    return gcs_server
+
+
+def test_encode_batch():
+    calls = [
+        BatchCall('a b', 'DELETE', '/storage/v1/b/bucket/o/a%20b',
+                  params={'generation': '1'}),
+        BatchCall('c', 'PATCH', '/storage/v1/b/bucket/o/c',
+                  body={'contentType': 'text/plain'}),
+    ]
+    body, content_type = encode_batch(calls, 'xyz')
+
+    assert content_type == 'multipart/mixed; boundary=xyz'
+    assert body == (
+        b'--xyz\r\n'
+        b'Content-Type: application/http\r\n'
+        b'Content-ID: <0>\r\n'
+        b'\r\n'
+        b'DELETE /storage/v1/b/bucket/o/a%20b?generation=1 HTTP/1.1\r\n'
+        b'Content-Length: 0\r\n'
+        b'\r\n'
+        b'\r\n'
+        b'--xyz\r\n'
+        b'Content-Type: application/http\r\n'
+        b'Content-ID: <1>\r\n'
+        b'\r\n'
+        b'PATCH /storage/v1/b/bucket/o/c HTTP/1.1\r\n'
+        b'Content-Type: application/json; charset=UTF-8\r\n'
+        b'Content-Length: 29\r\n'
+        b'\r\n'
+        b'{"contentType": "text/plain"}\r\n'
+        b'--xyz--\r\n'
+    )
+
+
+def test_decode_batch():
+    body = (
+        b'--batch_abc\r\n'
+        b'Content-Type: application/http\r\n'
+        b'Content-ID: <response-1>\r\n'
+        b'\r\n'
+        b'HTTP/1.1 404 Not Found\r\n'
+        b'Content-Type: application/json; charset=UTF-8\r\n'
+        b'\r\n'
+        b'{"error": {"code": 404}}\r\n'
+        b'--batch_abc\r\n'
+        b'Content-Type: application/http\r\n'
+        b'Content-ID: <response-0>\r\n'
+        b'\r\n'
+        b'HTTP/1.1 204 No Content\r\n'
+        b'Content-Length: 0\r\n'
+        b'\r\n'
+        b'\r\n'
+        b'--batch_abc--\r\n'
+    )
+
+    assert decode_batch(body, 'multipart/mixed; boundary=batch_abc') == {
+        0: (204, {}),
+        1: (404, {'error': {'code': 404}}),
+    }
+    with pytest.raises(ValueError):
+        decode_batch(body, 'application/json')
+
+
+@pytest.mark.asyncio
+async def test_delete_many(batch_server):  # pylint: disable=redefined-outer-name
+    async with Session() as session:
+        storage = Storage(session=session, api_root=batch_server.api_root)
+        names = storage.get_bucket('bucket').iter_blobs(prefix='tmp/')
+        results = [result async for result in storage.delete_many(
+            'bucket', names, max_concurrency=2,
+        )]
+
+        missing = [result async for result in storage.delete_many(
+            'bucket', ['tmp/000'],
+        )]
+
+    assert [r.object_name for r in results] == NAMES
+    assert all(r.ok for r in results)
+    assert not batch_server.objects
+    assert batch_server.batches == [100, 100, 50, 1]
+    assert missing[0].status == 404
+    assert not missing[0].ok
+
+
+@pytest.mark.asyncio
+async def test_failed_calls_are_retried(
+        batch_server,  # pylint: disable=redefined-outer-name
+):
+    batch_server.fail('DELETE', r'/tmp%2F003$', 503)
+    batch_server.fail('POST', r'^/batch/', 503)
+
+    async with Session() as session:
+        storage = Storage(session=session, api_root=batch_server.api_root)
+        results = [result async for result in storage.delete_many(
+            'bucket', NAMES[:10], retry_policy=RETRY_POLICY,
+        )]
+
+    assert all(r.ok for r in results)
+    # the failed request was resent, then the failed call on its own
+    assert batch_server.batches == [10, 1]
+
+
+@pytest.mark.asyncio
+async def test_copy_many(batch_server):  # pylint: disable=redefined-outer-name
+    async with Session() as session:
+        storage = Storage(session=session, api_root=batch_server.api_root)
+        results = [result async for result in storage.copy_many(
+            'bucket', NAMES[:3], 'other',
+            new_name=lambda name: name.replace('tmp/', 'copy/'),
+            metadata={'Content-Type': 'text/plain'},
+        )]
+
+    assert all(r.data['done'] for r in results)
+    for name in NAMES[:3]:
+        copy = batch_server.objects[('other', name.replace('tmp/', 'copy/'))]
+        assert copy['data'] == name.encode()
+        assert copy['metadata']['contentType'] == 'text/plain'
+
+
+@pytest.mark.asyncio
+async def test_patch_metadata_many(
+        batch_server,  # pylint: disable=redefined-outer-name
+):
+    async with Session() as session:
+        storage = Storage(session=session, api_root=batch_server.api_root)
+        results = [result async for result in storage.patch_metadata_many(
+            'bucket', NAMES[:3], {'metadata': {'tag': 'x'}},
+        )]
+
+    assert [r.data['metadata'] for r in results] == [{'tag': 'x'}] * 3
+    assert batch_server.objects[('bucket', NAMES[3])]['metadata'].get(
+        'metadata') is None
@@ -1,5 +1,125 @@
+# pylint: disable=redefined-outer-name
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import rsa
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa as crypto_rsa
 from gcloud.aio.storage import blob  # pylint: disable=unused-import
 
 
+@pytest.fixture(scope='module')
+def keys():
+    """An RSA key, as PKCS1 and PKCS8 PEMs and an ``rsa`` public key."""
+    key = crypto_rsa.generate_private_key(public_exponent=65537, key_size=1024)
+    pkcs1 = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.TraditionalOpenSSL,
+        serialization.NoEncryption(),
+    ).decode()
+    pkcs8 = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    public = rsa.PublicKey.load_pkcs1(key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.PKCS1,
+    ))
+    return pkcs1, pkcs8, public
+
+
 def test_importable():
     assert True
+
+
+def test_load_private_key_formats(keys):
+    pkcs1, pkcs8, public = keys
+    assert blob.load_private_key(pkcs1) == blob.load_private_key(pkcs8)
+    assert blob.load_private_key(pkcs1).n == public.n
+
+    with pytest.raises(ValueError):
+        blob.load_private_key('not a key')
+
+
+def test_load_private_key_is_cached(keys):
+    pkcs1, _, _ = keys
+    blob.load_private_key.cache_clear()
+    first = blob.load_private_key(pkcs1)
+    assert blob.load_private_key(pkcs1) is first
+    assert blob.load_private_key.cache_info().hits == 1
+
+
+def test_pem_signature(keys):
+    pkcs1, _, public = keys
+    signature = blob.Blob.get_pem_signature('payload', pkcs1)
+    assert rsa.verify(b'payload', signature, public) == 'SHA-256'
+
+
+@pytest.mark.asyncio
+async def test_signed_url_in_executor(keys):
+    pkcs1, _, _ = keys
+    token = types.SimpleNamespace(service_data={
+        'client_email': 'test@example.iam.gserviceaccount.com',
+        'private_key': pkcs1,
+    })
+    bucket = types.SimpleNamespace(
+        name='bucket', storage=types.SimpleNamespace(token=token),
+    )
+    b = blob.Blob(bucket, 'some/object', {'size': 1})
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        url = await b.get_signed_url(60, executor=executor)
+
+    assert url.startswith(f'https://{blob.HOST}/bucket/some/object?')
+    assert 'X-Goog-Signature=' in url
+
+
+METADATA = {
+    'kind': 'storage#object',
+    'bucket': 'bucket',
+    'name': 'some/object',
+    'size': '1234',
+    'contentType': 'text/plain',
+    'timeCreated': '2024-01-02T03:04:05.678Z',
+    'updated': '2024-01-02T03:04:05.678Z',
+    'metadata': {'a': 'b'},
+}
+
+
+def test_blob_metadata():
+    b = blob.Blob(None, 'some/object', dict(METADATA))
+
+    assert b.name == 'some/object'
+    assert b.bucket_name == 'bucket'
+    assert b.size == 1234
+    assert b.chunk_size == 262144
+    assert b.contentType == 'text/plain'
+    assert b.metadata == {'a': 'b'}
+    assert b.timestamp('timeCreated').isoformat() == \
+        '2024-01-02T03:04:05.678000+00:00'
+    assert b.timestamp('customTime') is None
+    assert b.as_dict() == METADATA
+    with pytest.raises(AttributeError):
+        _ = b.md5Hash
+
+    b.contentType = 'application/json'
+    b.size = 5
+    assert b.contentType == 'application/json'
+    assert b.size == 5
+    assert not hasattr(b, '__dict__')
+
+
+def test_blob_fields():
+    b = blob.Blob(None, 'some/object', dict(METADATA), fields=['updated'])
+
+    assert b.size == 1234
+    assert b.updated == METADATA['updated']
+    assert b.bucket_name == 'bucket'
+    with pytest.raises(AttributeError):
+        _ = b.contentType
+
+    # a distinct string object, as each response would hold
+    other = blob.Blob(None, 'other', {'bucket': ''.join(['buck', 'et'])})
+    assert other.bucket_name is b.bucket_name
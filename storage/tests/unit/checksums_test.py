@@ -0,0 +1,62 @@
+import base64
+import hashlib
+import os
+
+import pytest
+from gcloud.aio.storage.checksums import _crc32c_py
+from gcloud.aio.storage.checksums import Checksum
+from gcloud.aio.storage.checksums import crc32c
+from gcloud.aio.storage.checksums import crc32c_combine
+from gcloud.aio.storage.checksums import decode_crc32c
+from gcloud.aio.storage.checksums import encode_crc32c
+from gcloud.aio.storage.checksums import parse_goog_hash
+
+
+def test_crc32c_check_value():
+    assert crc32c(b'123456789') == 0xE3069283
+    assert _crc32c_py(b'123456789', 0) == 0xE3069283
+    assert crc32c(b'') == 0
+
+
+def test_crc32c_is_incremental():
+    data = os.urandom(1000)
+    assert crc32c(data[600:], crc32c(data[:600])) == crc32c(data)
+    assert crc32c(memoryview(data)) == crc32c(data)
+
+
+@pytest.mark.parametrize('split', [0, 1, 7, 500, 999, 1000])
+def test_crc32c_combine(split):
+    data = os.urandom(1000)
+    first, second = data[:split], data[split:]
+    assert crc32c_combine(crc32c(first), crc32c(second),
+                          len(second)) == crc32c(data)
+
+
+def test_crc32c_encoding():
+    # as reported by GCS for an object containing 'hello world'
+    assert encode_crc32c(crc32c(b'hello world')) == 'yZRlqg=='
+    assert decode_crc32c('yZRlqg==') == crc32c(b'hello world')
+
+
+def test_parse_goog_hash():
+    value = 'crc32c=n03x6A==, md5=Ojk9c3dhfxgoKVVHYwFbHQ=='
+    assert parse_goog_hash(value) == {
+        'crc32c': 'n03x6A==',
+        'md5': 'Ojk9c3dhfxgoKVVHYwFbHQ==',
+    }
+    assert not parse_goog_hash('')
+
+
+def test_checksum():
+    data = os.urandom(1000)
+    for algorithm, expected in (
+        ('crc32c', encode_crc32c(crc32c(data))),
+        ('md5', base64.b64encode(hashlib.md5(data).digest()).decode()),
+    ):
+        checksum = Checksum(algorithm)
+        checksum.update(data[:300])
+        checksum.update(memoryview(data)[300:])
+        assert checksum.digest() == expected
+
+    with pytest.raises(ValueError):
+        Checksum('sha1')
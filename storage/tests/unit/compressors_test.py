@@ -0,0 +1,86 @@
+# pylint: disable=redefined-outer-name
+import gzip
+import io
+import os
+import zlib
+
+import pytest
+from gcloud.aio.auth import BUILD_GCLOUD_REST  # pylint: disable=no-name-in-module
+from gcloud.aio.storage import Storage
+from gcloud.aio.storage.compressors import compressor
+from gcloud.aio.storage.compressors import HAS_ZSTD
+from gcloud.aio.storage.uploads import UPLOAD_CHUNK_ALIGNMENT
+
+from .fake_gcs import serve_fake_gcs
+
+# Selectively load libraries based on the package
+if BUILD_GCLOUD_REST:
+    from requests import Session
+else:
+    from aiohttp import ClientSession as Session
+
+
+@pytest.fixture(scope='function')
+def gcs_server():
+    with serve_fake_gcs() as server:
+        yield server
+
+
+def compress(encoding, data, level=None):
+    c = compressor(encoding, level)
+    return c.compress(data[:100]) + c.compress(data[100:]) + c.flush()
+
+
+def test_gzip():
+    data = b'hello world' * 100
+    assert gzip.decompress(compress('gzip', data)) == data
+    assert len(compress('gzip', data, 1)) >= len(compress('gzip', data, 9))
+
+
+def test_deflate():
+    data = b'hello world' * 100
+    assert zlib.decompress(compress('deflate', data)) == data
+
+
+@pytest.mark.skipif(not HAS_ZSTD, reason='zstandard is not installed')
+def test_zstd():
+    import zstandard  # pylint: disable=import-outside-toplevel
+    data = b'hello world' * 100
+    assert zstandard.ZstdDecompressor().decompress(
+        compress('zstd', data), max_output_size=len(data)) == data
+
+
+def test_unsupported_encoding():
+    with pytest.raises(ValueError):
+        compressor('brotli')
+
+
+@pytest.mark.asyncio
+async def test_zipped_upload_is_streamed(gcs_server):
+    # random data does not compress, so this takes several chunks
+    data = os.urandom(3 * UPLOAD_CHUNK_ALIGNMENT)
+
+    async with Session() as session:
+        storage = Storage(session=session, api_root=gcs_server.api_root)
+        await storage.upload(
+            'bucket', 'object.bin', io.BytesIO(data), zipped=True,
+            force_resumable_upload=True, compression_level=1,
+            chunk_size=UPLOAD_CHUNK_ALIGNMENT,
+        )
+
+    stored = gcs_server.objects[('bucket', 'object.bin')]['data']
+    assert gzip.decompress(stored) == data
+    puts = [r for r in gcs_server.requests if r[0] == 'PUT']
+    assert len(puts) == 4
+
+
+@pytest.mark.asyncio
+async def test_zipped_upload_small(gcs_server):
+    async with Session() as session:
+        storage = Storage(session=session, api_root=gcs_server.api_root)
+        await storage.upload('bucket', 'object.txt', 'hello world',
+                             zipped=True, compression='deflate')
+
+    stored = gcs_server.objects[('bucket', 'object.txt')]['data']
+    assert zlib.decompress(stored) == b'hello world'
+    assert not [r for r in gcs_server.requests if r[0] == 'PUT']
@@ -0,0 +1,88 @@
+# pylint: disable=redefined-outer-name
+import asyncio
+import os
+
+import pytest
+from gcloud.aio.auth import BUILD_GCLOUD_REST  # pylint: disable=no-name-in-module
+from gcloud.aio.storage import Storage
+from gcloud.aio.storage.concurrency import map_as_completed
+
+from .fake_gcs import serve_fake_gcs
+
+# Selectively load libraries based on the package
+if BUILD_GCLOUD_REST:
+    from requests import Session
+else:
+    from aiohttp import ClientSession as Session
+
+
+OBJECTS = {f'dir/{i:02}': os.urandom(i * 100) for i in range(20)}
+
+
+@pytest.fixture(scope='function')
+def gcs_server():
+    with serve_fake_gcs() as server:
+        yield server
+
+
+async def names():
+    for name in [*OBJECTS, 'missing']:
+        yield name
+
+
+@pytest.mark.asyncio
+async def test_download_many(gcs_server):
+    for name, data in OBJECTS.items():
+        gcs_server.store('bucket', name, data)
+
+    async with Session() as session:
+        storage = Storage(session=session, api_root=gcs_server.api_root)
+        results = [r async for r in storage.download_many(
+            'bucket', names(), max_concurrency=4)]
+
+    assert sorted(r.object_name for r in results) == [*OBJECTS, 'missing']
+    for result in results:
+        if result.object_name == 'missing':
+            assert not result.ok
+            assert result.data is None
+        else:
+            assert result.ok
+            assert result.data == OBJECTS[result.object_name]
+
+
+@pytest.mark.asyncio
+async def test_download_many_to_directory(gcs_server, tmp_path):
+    for name, data in OBJECTS.items():
+        gcs_server.store('bucket', name, data)
+    gcs_server.store('bucket', '../escape', b'data')
+
+    async with Session() as session:
+        storage = Storage(session=session, api_root=gcs_server.api_root)
+        bucket = storage.get_bucket('bucket')
+        results = {r.object_name: r async for r in bucket.download_many(
+            [*OBJECTS, '../escape'], directory=str(tmp_path))}
+
+    for name, data in OBJECTS.items():
+        assert results[name].filename == str(tmp_path / name)
+        with open(tmp_path / name, 'rb') as f:
+            assert f.read() == data
+    assert isinstance(results['../escape'].error, ValueError)
+    assert not (tmp_path.parent / 'escape').exists()
+
+
+@pytest.mark.asyncio
+async def test_map_as_completed():
+    in_flight = []
+    peak = []
+
+    async def call(item):
+        in_flight.append(item)
+        peak.append(len(in_flight))
+        if not BUILD_GCLOUD_REST:
+            await asyncio.sleep(0.01 * (item % 3))
+        in_flight.remove(item)
+        return item * 2
+
+    results = [r async for r in map_as_completed(call, range(10), 3)]
+    assert sorted(results) == [i * 2 for i in range(10)]
+    assert max(peak) <= 3
@@ -0,0 +1,100 @@
+# pylint: disable=redefined-outer-name
+import os
+
+import pytest
+from gcloud.aio.auth import BUILD_GCLOUD_REST  # pylint: disable=no-name-in-module
+from gcloud.aio.storage import Storage
+from gcloud.aio.storage import StreamResponse
+
+from .fake_gcs import serve_fake_gcs
+
+# Selectively load libraries based on the package
+if BUILD_GCLOUD_REST:
+    from requests import Session
+else:
+    from aiohttp import ClientSession as Session
+
+
+DATA = os.urandom(300 * 1024)
+
+
+@pytest.fixture(scope='function')
+def gcs_server():
+    with serve_fake_gcs() as server:
+        yield server
+
+
+@pytest.mark.asyncio
+async def test_download_stream_iterate(gcs_server):
+    gcs_server.store('bucket', 'object', DATA)
+    progress = []
+
+    async with Session() as session:
+        storage = Storage(session=session, api_root=gcs_server.api_root)
+        stream = await storage.download_stream(
+            'bucket', 'object', high_water=64 * 1024, low_water=16 * 1024,
+            on_progress=progress.append,
+        )
+        chunks = [chunk async for chunk in stream]
+
+    assert b''.join(chunks) == DATA
+    assert stream.bytes_read == len(DATA)
+    assert progress[-1] == len(DATA)
+    assert progress == sorted(progress)
+
+
+@pytest.mark.asyncio
+async def test_download_stream_readinto(gcs_server):
+    gcs_server.store('bucket', 'object', DATA)
+
+    async with Session() as session:
+        storage = Storage(session=session, api_root=gcs_server.api_root)
+        stream = await storage.download_stream('bucket', 'object',
+                                               validate=True)
+
+        buffer = bytearray(100 * 1024)
+        view = memoryview(buffer)
+        received = bytearray()
+        while size := await stream.readinto(view):
+            assert size <= len(buffer)
+            received += view[:size]
+
+    assert received == DATA
+
+
+@pytest.mark.asyncio
+async def test_download_stream_read_sizes(gcs_server):
+    gcs_server.store('bucket', 'object', DATA)
+
+    async with Session() as session:
+        storage = Storage(session=session, api_root=gcs_server.api_root)
+        stream = await storage.download_stream('bucket', 'object')
+
+        first = await stream.read(1000)
+        second = await stream.read(5)
+        rest = await stream.read()
+
+    assert len(first) <= 1000
+    assert len(second) <= 5
+    assert first + second + rest == DATA
+
+
+@pytest.mark.asyncio
+async def test_download_stream_watermarks(gcs_server):
+    gcs_server.store('bucket', 'object', DATA)
+
+    async with Session() as session:
+        storage = Storage(session=session, api_root=gcs_server.api_root)
+        with pytest.raises(ValueError):
+            await storage.download_stream('bucket', 'object',
+                                          high_water=1024, low_water=2048)
+
+
+def test_stream_watermarks_are_best_effort():
+    class Response:
+        # the stream of an aiohttp version without the watermarks we set
+        content = object()
+
+    response = Response()
+    StreamResponse(response, high_water=1024, low_water=512)
+    assert not hasattr(response.content, '_high_water')
@@ -0,0 +1,125 @@
+# pylint: disable=redefined-outer-name
+import gzip
+import os
+
+import pytest
+from gcloud.aio.auth import BUILD_GCLOUD_REST  # pylint: disable=no-name-in-module
+from gcloud.aio.storage import ChecksumMismatchError
+from gcloud.aio.storage import Storage
+
+from .fake_gcs import serve_fake_gcs
+
+# Selectively load libraries based on the package
+if BUILD_GCLOUD_REST:
+    from requests import Session
+else:
+    from aiohttp import ClientSession as Session
+
+
+DATA = os.urandom(300 * 1024)
+
+
+@pytest.fixture(scope='function')
+def gcs_server():
+    with serve_fake_gcs() as server:
+        yield server
+
+
+@pytest.mark.asyncio
+async def test_download_to_filename(gcs_server, tmp_path):
+    gcs_server.store('bucket', 'object', DATA)
+    filename = str(tmp_path / 'object')
+
+    async with Session() as session:
+        storage = Storage(session=session, api_root=gcs_server.api_root)
+        await storage.download_to_filename('bucket', 'object', filename,
+                                           validate=True)
+
+    with open(filename, 'rb') as f:
+        assert f.read() == DATA
+    assert os.listdir(tmp_path) == ['object']
+
+
+@pytest.mark.asyncio
+async def test_download_to_filename_failure(gcs_server, tmp_path):
+    gcs_server.store('bucket', 'object', DATA)
+    gcs_server.objects[('bucket', 'object')]['data'] = DATA[::-1]
+    filename = str(tmp_path / 'object')
+
+    async with Session() as session:
+        storage = Storage(session=session, api_root=gcs_server.api_root)
+        with pytest.raises(ChecksumMismatchError):
+            await storage.download_to_filename('bucket', 'object', filename,
+                                               validate=True)
+
+    assert not os.listdir(tmp_path)
+
+
+@pytest.mark.asyncio
+async def test_download_to_filename_resume(gcs_server, tmp_path):
+    metadata = gcs_server.store('bucket', 'object', DATA)
+    filename = str(tmp_path / 'object')
+    partial = f'{filename}.{metadata["generation"]}.part'
+    # a partial file with a prefix which differs from the object: resuming
+    # only fetches the tail, so the prefix is kept
+    with open(partial, 'wb') as f:
+        f.write(b'x' * 1000)
+
+    async with Session() as session:
+        storage = Storage(session=session, api_root=gcs_server.api_root)
+        await storage.download_to_filename('bucket', 'object', filename,
+                                           resume=True)
+
+        with open(filename, 'rb') as f:
+            assert f.read() == b'x' * 1000 + DATA[1000:]
+        assert not os.path.exists(partial)
+
+        # with validation, that mismatch is caught and the partial discarded
+        with open(partial, 'wb') as f:
+            f.write(b'x' * 1000)
+        with pytest.raises(ChecksumMismatchError):
+            await storage.download_to_filename('bucket', 'object', filename,
+                                               resume=True, validate=True)
+        assert not os.path.exists(partial)
+
+        # a matching partial is completed
+        with open(partial, 'wb') as f:
+            f.write(DATA[:1000])
+        await storage.download_to_filename('bucket', 'object', filename,
+                                           resume=True, validate=True)
+        with open(filename, 'rb') as f:
+            assert f.read() == DATA
+
+
+@pytest.mark.asyncio
+async def test_download_to_filename_resume_full_size(gcs_server, tmp_path):
+    metadata = gcs_server.store('bucket', 'object', DATA)
+    filename = str(tmp_path / 'object')
+    # preallocated by a download which never finished
+    with open(f'{filename}.{metadata["generation"]}.part', 'wb') as f:
+        f.write(bytes(len(DATA)))
+
+    async with Session() as session:
+        storage = Storage(session=session, api_root=gcs_server.api_root)
+        await storage.download_to_filename('bucket', 'object', filename,
+                                           resume=True)
+
+    with open(filename, 'rb') as f:
+        assert f.read() == DATA
+
+
+@pytest.mark.asyncio
+async def test_download_to_filename_resume_gzip(gcs_server, tmp_path):
+    # the crc32c of a gzip-encoded object is that of the compressed data,
+    # while we write it decompressed
+    gcs_server.store('bucket', 'object', gzip.compress(DATA),
+                     {'contentEncoding': 'gzip'})
+    filename = str(tmp_path / 'object')
+
+    async with Session() as session:
+        storage = Storage(session=session, api_root=gcs_server.api_root)
+        await storage.download_to_filename('bucket', 'object', filename,
+                                           resume=True, validate=True)
+
+    with open(filename, 'rb') as f:
+        assert f.read() == DATA
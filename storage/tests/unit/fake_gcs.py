@@ -0,0 +1,305 @@
+"""
+An in-memory fake of the parts of the GCS JSON API used by the unit tests.
+"""
+import base64
+import contextlib
+import hashlib
+import http.client
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from urllib.parse import parse_qs
+from urllib.parse import unquote
+from urllib.parse import urlparse
+
+from gcloud.aio.storage.checksums import crc32c
+from gcloud.aio.storage.checksums import encode_crc32c
+
+
+class FakeGcsHandler(BaseHTTPRequestHandler):
+    """Serves a tiny in-memory subset of the GCS JSON API."""
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+    def _reply(self, status, body=b'', headers=None):
+        if isinstance(body, dict):
+            body = json.dumps(body).encode()
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _route(self, method):
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        server = self.server
+        with server.lock:
+            server.requests.append((method, url.path, params))
+            failure = server.take_failure(method, url.path)
+        if failure:
+            self._reply(failure)
+            return
+
+        for pattern, handler in (
+            (r'/batch/storage/v1', self._batch),
+            (r'/upload/storage/v1/b/([^/]+)/o', self._upload),
+            (r'/upload/session/(\w+)', self._upload_chunk),
+            (r'/storage/v1/b/([^/]+)/o/([^/]+)/compose', self._compose),
+            (r'/storage/v1/b/([^/]+)/o/([^/]+)/rewriteTo/b/([^/]+)/o/([^/]+)',
+             self._rewrite),
+            (r'/storage/v1/b/([^/]+)/o/([^/]+)', self._object),
+            (r'/storage/v1/b/([^/]+)/o', self._list),
+        ):
+            match = re.fullmatch(pattern, url.path)
+            if match:
+                args = [unquote(g) for g in match.groups()]
+                handler(method, params, body, *args)
+                return
+        self._reply(404)
+
+    def do_GET(self):
+        self._route('GET')
+
+    def do_POST(self):
+        self._route('POST')
+
+    def do_PUT(self):
+        self._route('PUT')
+
+    def do_DELETE(self):
+        self._route('DELETE')
+
+    def do_PATCH(self):
+        self._route('PATCH')
+
+    def _object(self, method, params, body, bucket, name):
+        obj = self.server.objects.get((bucket, name))
+        if obj is None:
+            self._reply(404, {'error': {'code': 404, 'message': 'Not Found'}})
+        elif method == 'DELETE':
+            del self.server.objects[(bucket, name)]
+            self._reply(204)
+        elif method == 'PATCH':
+            patch = json.loads(body)
+            obj['metadata'].setdefault('metadata', {}).update(
+                patch.pop('metadata', {}))
+            obj['metadata'].update(patch)
+            obj['metadata']['metageneration'] = str(
+                int(obj['metadata']['metageneration']) + 1)
+            self._reply(200, obj['metadata'])
+        elif params.get('alt') == 'media':
+            data, status = obj['data'], 200
+            # the hashes of the object as stored
+            headers = {'x-goog-hash': f'crc32c={obj["metadata"]["crc32c"]},'
+                                      f'md5={obj["metadata"]["md5Hash"]}'}
+            if obj['metadata'].get('contentEncoding') == 'gzip':
+                # served as stored, for the client to decompress
+                headers['Content-Encoding'] = 'gzip'
+            if 'Range' in self.headers:
+                start, end = re.fullmatch(r'bytes=(\d*)-(\d*)',
+                                          self.headers['Range']).groups()
+                if not start:
+                    # the last `end` bytes
+                    start, end = max(len(data) - int(end), 0), len(data) - 1
+                end = int(end) if end else len(data) - 1
+                data, status = data[int(start):end + 1], 206
+            self._reply(status, data, headers)
+        else:
+            self._reply(200, obj['metadata'])
+
+    def _list(self, _method, params, _body, bucket):
+        prefix = params.get('prefix', '')
+        delimiter = params.get('delimiter')
+        items, prefixes = [], set()
+        for (b, name), obj in sorted(self.server.objects.items()):
+            if b != bucket or not name.startswith(prefix):
+                continue
+            if delimiter and delimiter in name[len(prefix):]:
+                dirname = name[len(prefix):].split(delimiter)[0]
+                prefixes.add(f'{prefix}{dirname}{delimiter}')
+            else:
+                items.append(obj['metadata'])
+
+        # page tokens are simply the name of the first item of the page
+        start = 0
+        if params.get('pageToken'):
+            start = next((i for i, item in enumerate(items)
+                          if item['name'] >= params['pageToken']), len(items))
+        end = start + int(params.get('maxResults', 1000))
+        page = {}
+        if items[start:end]:
+            page['items'] = items[start:end]
+        if prefixes and not start:
+            page['prefixes'] = sorted(prefixes)
+        if end < len(items):
+            page['nextPageToken'] = items[end]['name']
+        self._reply(200, page)
+
+    def _upload(self, _method, params, body, bucket):
+        if params.get('uploadType') == 'resumable':
+            info = json.loads(body) if body else {}
+            session_id = uuid.uuid4().hex
+            self.server.sessions[session_id] = {
+                'bucket': bucket, 'name': params.get('name') or info['name'],
+                'info': info, 'data': b'',
+            }
+            ip, port = self.server.server_address
+            self._reply(200, headers={
+                'Location': f'http://{ip}:{port}/upload/session/{session_id}',
+            })
+            return
+
+        if params.get('uploadType') == 'multipart':
+            boundary = self.headers['Content-Type'].split('boundary=')[1]
+            _, info, media, epilogue = body.split(f'--{boundary}'.encode())
+            assert epilogue == b'--\r\n'
+            info = json.loads(info.split(b'\r\n\r\n', 1)[1])
+            data = media.split(b'\r\n\r\n', 1)[1][:-len(b'\r\n')]
+            expected = info.pop('crc32c', None)
+            metadata = self.server.store(bucket, info['name'], data, info)
+            if expected and expected != metadata['crc32c']:
+                del self.server.objects[(bucket, info['name'])]
+                self._reply(400, {'error': {'code': 400,
+                                            'message': 'hash mismatch'}})
+                return
+        else:
+            metadata = self.server.store(bucket, params['name'], body)
+        self._reply(200, metadata)
+
+    def _upload_chunk(self, _method, _params, body, session_id):
+        session = self.server.sessions[session_id]
+        span, total = self.headers['Content-Range'][len('bytes '):].split('/')
+        if span != '*':
+            assert int(span.split('-')[0]) == len(session['data'])
+            session['data'] += body
+
+        if total != '*' and len(session['data']) == int(total):
+            metadata = self.server.store(session['bucket'], session['name'],
+                                         session['data'], session['info'])
+            expected = self.headers.get('X-Goog-Hash')
+            if expected and expected != f'crc32c={metadata["crc32c"]}':
+                del self.server.objects[(session['bucket'], session['name'])]
+                self._reply(400, {'error': {'code': 400,
+                                            'message': 'hash mismatch'}})
+                return
+            self._reply(200, metadata)
+        elif session['data']:
+            self._reply(308, headers={
+                'Range': f'bytes=0-{len(session["data"]) - 1}'})
+        else:
+            self._reply(308)
+
+    def _batch(self, _method, _params, body, *_args):
+        """Make each call of a batch against ourselves."""
+        boundary = self.headers['Content-Type'].split('boundary=')[1]
+        parts = body.split(f'--{boundary}'.encode())[1:-1]
+        self.server.batches.append(len(parts))
+
+        responses = []
+        for part in parts:
+            outer, request = part.strip(b'\r\n').split(b'\r\n\r\n', 1)
+            request, _, data = request.partition(b'\r\n\r\n')
+            content_id = re.search(rb'Content-ID: <(\d+)>', outer).group(1)
+            method, target, _ = request.split(b'\r\n')[0].decode().split()
+            conn = http.client.HTTPConnection(*self.server.server_address)
+            conn.request(method, target, body=data)
+            response = conn.getresponse()
+            responses.append(
+                f'--batch\r\nContent-Type: application/http\r\n'
+                f'Content-ID: <response-{content_id.decode()}>\r\n\r\n'
+                f'HTTP/1.1 {response.status} {response.reason}\r\n'
+                f'Content-Type: application/json\r\n\r\n'.encode()
+                + response.read() + b'\r\n')
+            conn.close()
+
+        self._reply(200, b''.join(responses) + b'--batch--\r\n', headers={
+            'Content-Type': 'multipart/mixed; boundary=batch'})
+
+    def _rewrite(self, _method, _params, body, bucket, name,
+                 destination_bucket, destination):
+        source = self.server.objects[(bucket, name)]
+        info = json.loads(body) if body else {}
+        metadata = self.server.store(destination_bucket, destination,
+                                     source['data'], info)
+        self._reply(200, {'done': True, 'resource': metadata})
+
+    def _compose(self, _method, _params, body, bucket, name):
+        payload = json.loads(body)
+        data = b''.join(self.server.objects[(bucket, source['name'])]['data']
+                        for source in payload['sourceObjects'])
+        self.server.composed.append(len(payload['sourceObjects']))
+        metadata = self.server.store(bucket, name, data,
+                                     payload.get('destination'))
+        self._reply(200, metadata)
+
+
+class FakeGcsServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # flip a bit of all data stored from now on
+    corrupt_uploads = False
+
+    def __init__(self):
+        super().__init__(('localhost', 0), FakeGcsHandler)
+        self.lock = threading.Lock()
+        self.objects = {}
+        self.sessions = {}
+        self.requests = []
+        self.failures = []
+        self.composed = []
+        self.batches = []
+
+    @property
+    def api_root(self):
+        ip, port = self.server_address
+        return f'http://{ip}:{port}'
+
+    def store(self, bucket, name, data, info=None):
+        if self.corrupt_uploads and data:
+            data = bytes([data[0] ^ 1]) + data[1:]
+        metadata = dict(info or {})
+        metadata.update({
+            'bucket': bucket,
+            'name': name,
+            'size': str(len(data)),
+            'generation': str(time.time_ns()),
+            'metageneration': '1',
+            'crc32c': encode_crc32c(crc32c(data)),
+            'md5Hash': base64.b64encode(hashlib.md5(data).digest()).decode(),
+        })
+        self.objects[(bucket, name)] = {'data': data, 'metadata': metadata}
+        return metadata
+
+    def fail(self, method, path_pattern, status=503):
+        """Respond to the next request matching with an error status."""
+        self.failures.append((method, path_pattern, status))
+
+    def take_failure(self, method, path):
+        for failure in self.failures:
+            if failure[0] == method and re.search(failure[1], path):
+                self.failures.remove(failure)
+                return failure[2]
+        return None
+
+
+@contextlib.contextmanager
+def serve_fake_gcs():
+    """Run a fake GCS API on a local port for the duration of the block."""
+    server = FakeGcsServer()
+    # a short poll interval keeps shutdown() from stalling every test
+    thread = threading.Thread(target=server.serve_forever,
+                              kwargs={'poll_interval': 0.01})
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
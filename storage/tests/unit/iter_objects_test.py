@@ -0,0 +1,106 @@
+# pylint: disable=redefined-outer-name
+import pytest
+from gcloud.aio.auth import BUILD_GCLOUD_REST  # pylint: disable=no-name-in-module
+from gcloud.aio.storage import Bucket
+from gcloud.aio.storage import Storage
+
+from .fake_gcs import serve_fake_gcs
+
+# Selectively load libraries based on the package
+if BUILD_GCLOUD_REST:
+    from requests import Session
+else:
+    from aiohttp import ClientSession as Session
+
+
+NAMES = sorted(f'{d}/{i:03d}' for d in 'abc' for i in range(25))
+
+
+@pytest.fixture(scope='function')
+def gcs_server():
+    with serve_fake_gcs() as server:
+        yield server
+
+
+@pytest.fixture(scope='function')
+def listed_server(gcs_server):
+    for name in NAMES:
+        gcs_server.store('bucket', name, b'')
+    return gcs_server
+
+
+@pytest.mark.asyncio
+async def test_iter_objects(listed_server):  # pylint: disable=redefined-outer-name
+    async with Session() as session:
+        storage = Storage(session=session, api_root=listed_server.api_root)
+        items = [item async for item in storage.iter_objects(
+            'bucket', prefix='b/', params={'maxResults': '10'},
+            fields='name,size',
+        )]
+
+    assert [item['name'] for item in items] == NAMES[25:50]
+    pages = [params for method, _, params in listed_server.requests
+             if method == 'GET']
+    assert [p.get('pageToken', '') for p in pages] == ['', 'b/010', 'b/020']
+    assert all(p['fields'] == 'items(name,size),prefixes,nextPageToken'
+               for p in pages)
+
+
+@pytest.mark.asyncio
+async def test_iter_objects_stops_early(
+        listed_server,  # pylint: disable=redefined-outer-name
+):
+    async with Session() as session:
+        storage = Storage(session=session, api_root=listed_server.api_root)
+        async for item in storage.iter_objects(
+                'bucket', params={'maxResults': '10'}):
+            assert item['name'] == NAMES[0]
+            break
+
+    # at most the following page was prefetched
+    assert len(listed_server.requests) <= 2
+
+
+@pytest.mark.asyncio
+async def test_iter_objects_prefixes(
+        listed_server,  # pylint: disable=redefined-outer-name
+):
+    async with Session() as session:
+        storage = Storage(session=session, api_root=listed_server.api_root)
+        items = [item async for item in storage.iter_objects(
+            'bucket', prefixes=['a/', 'c/'], max_concurrency=2,
+            params={'maxResults': '10'},
+        )]
+
+    names = [item['name'] for item in items]
+    assert sorted(names) == NAMES[:25] + NAMES[50:]
+    # each listing is still in order
+    assert [n for n in names if n.startswith('c/')] == NAMES[50:]
+
+
+@pytest.mark.asyncio
+async def test_iter_objects_prefix_fails(
+        listed_server,  # pylint: disable=redefined-outer-name
+):
+    listed_server.fail('GET', r'/o$', 400)
+
+    async with Session() as session:
+        storage = Storage(session=session, api_root=listed_server.api_root)
+        with pytest.raises(Exception):
+            async for _ in storage.iter_objects('bucket',
+                                                prefixes=['a/', 'c/']):
+                pass
+
+
+@pytest.mark.asyncio
+async def test_iter_blobs(listed_server):  # pylint: disable=redefined-outer-name
+    listed_server.store('bucket', 'top', b'')
+
+    async with Session() as session:
+        storage = Storage(session=session, api_root=listed_server.api_root)
+        bucket = Bucket(storage, 'bucket')
+        names = [name async for name in bucket.iter_blobs()]
+        assert names == sorted(NAMES + ['top'])
+        assert await bucket.list_blobs(prefix='c/') == NAMES[50:]
+        assert await bucket.list_blobs(delimiter='/') == [
+            'top', 'a/', 'b/', 'c/']
@@ -0,0 +1,133 @@
+# pylint: disable=redefined-outer-name
+import asyncio
+import time
+from unittest import mock
+
+import pytest
+from gcloud.aio.auth import BUILD_GCLOUD_REST  # pylint: disable=no-name-in-module
+from gcloud.aio.storage import MetadataCache
+from gcloud.aio.storage import Storage
+
+from .fake_gcs import serve_fake_gcs
+
+# Selectively load libraries based on the package
+if BUILD_GCLOUD_REST:
+    from requests import Session
+else:
+    from aiohttp import ClientSession as Session
+
+
+@pytest.fixture(scope='function')
+def gcs_server():
+    with serve_fake_gcs() as server:
+        yield server
+
+
+def lookups(gcs_server, name):
+    return [r for r in gcs_server.requests
+            if r[0] == 'GET' and r[1] == f'/storage/v1/b/bucket/o/{name}'
+            and r[2].get('alt') != 'media']
+
+
+@pytest.mark.asyncio
+async def test_get_blob_is_cached(gcs_server):
+    gcs_server.store('bucket', 'object', b'data')
+    cache = MetadataCache()
+
+    async with Session() as session:
+        storage = Storage(session=session, api_root=gcs_server.api_root,
+                          metadata_cache=cache)
+        bucket = storage.get_bucket('bucket')
+
+        blob = await bucket.get_blob('object')
+        assert blob.size == 4
+        assert await bucket.blob_exists('object')
+        assert not await bucket.blob_exists('missing')
+        assert len(lookups(gcs_server, 'object')) == 1
+
+        # writes through the client replace what we cached
+        await storage.upload('bucket', 'object', b'new data')
+        assert (await bucket.get_blob('object')).size == 8
+        await storage.patch_metadata('bucket', 'object',
+                                     {'metadata': {'a': 'b'}})
+        blob = await bucket.get_blob('object')
+        assert blob.metadata == {'a': 'b'}
+        assert len(lookups(gcs_server, 'object')) == 1
+
+        await storage.delete('bucket', 'object')
+        assert not await bucket.blob_exists('object')
+        assert len(lookups(gcs_server, 'object')) == 2
+
+
+@pytest.mark.asyncio
+async def test_entries_expire():
+    cache = MetadataCache(max_size=2, ttl=10)
+    calls = []
+
+    async def fetch():
+        calls.append(None)
+        return {'generation': '1', 'metageneration': '1'}
+
+    await cache.get('bucket', 'a', fetch)
+    await cache.get('bucket', 'a', fetch)
+    assert len(calls) == 1
+
+    with mock.patch('time.monotonic', return_value=time.monotonic() + 11):
+        await cache.get('bucket', 'a', fetch)
+    assert len(calls) == 2
+
+    # the least recently used entry is evicted
+    await cache.get('bucket', 'b', fetch)
+    await cache.get('bucket', 'a', fetch)
+    await cache.get('bucket', 'c', fetch)
+    assert len(cache) == 2
+    await cache.get('bucket', 'a', fetch)
+    assert len(calls) == 4
+    await cache.get('bucket', 'b', fetch)
+    assert len(calls) == 5
+
+
+@pytest.mark.asyncio
+async def test_older_generations_are_ignored():
+    cache = MetadataCache()
+
+    async def fetch():
+        return {'generation': '1', 'metageneration': '1'}
+
+    cache.invalidate('bucket', 'a', {'generation': '2', 'metageneration': '1'})
+    cache._put(('bucket', 'a'),  # pylint: disable=protected-access
+               await fetch())
+    assert (await cache.get('bucket', 'a', fetch))['generation'] == '2'
+
+
+@pytest.mark.skipif(BUILD_GCLOUD_REST,
+                    reason='gcloud-rest does not coalesce lookups')
+@pytest.mark.asyncio
+async def test_concurrent_lookups_are_coalesced():
+    cache = MetadataCache()
+    calls = []
+    release = asyncio.Event()
+
+    async def fetch():
+        calls.append(None)
+        await release.wait()
+        return {'generation': '1', 'metageneration': '1'}
+
+    lookups_ = [asyncio.ensure_future(cache.get('bucket', 'a', fetch))
+                for _ in range(10)]
+    await asyncio.sleep(0)
+    lookups_[0].cancel()
+    release.set()
+    results = await asyncio.gather(*lookups_[1:])
+    assert len(calls) == 1
+    assert all(r['generation'] == '1' for r in results)
+
+    # a lookup which raced an invalidation does not cache its result
+    release.clear()
+    cache.invalidate('bucket', 'a')
+    lookup = asyncio.ensure_future(cache.get('bucket', 'a', fetch))
+    await asyncio.sleep(0)
+    cache.invalidate('bucket', 'a')
+    release.set()
+    await lookup
+    assert not cache
@@ -0,0 +1,129 @@
+# pylint: disable=redefined-outer-name
+import os
+
+import pytest
+from gcloud.aio.auth import BadRequestError  # pylint: disable=no-name-in-module
+from gcloud.aio.auth import BUILD_GCLOUD_REST  # pylint: disable=no-name-in-module
+from gcloud.aio.storage import Storage
+from gcloud.aio.storage.composite import FilePart
+
+from .fake_gcs import serve_fake_gcs
+
+# Selectively load libraries based on the package
+if BUILD_GCLOUD_REST:
+    from requests import Session
+else:
+    from aiohttp import ClientSession as Session
+
+
+PART_SIZE = 1024
+
+
+@pytest.fixture(scope='function')
+def gcs_server():
+    with serve_fake_gcs() as server:
+        yield server
+
+
+@pytest.fixture(scope='function')
+def big_file(tmp_path):
+    data = os.urandom(40 * PART_SIZE + 123)
+    path = tmp_path / 'big'
+    path.write_bytes(data)
+    return str(path), data
+
+
+def test_file_part(big_file):  # pylint: disable=redefined-outer-name
+    filename, data = big_file
+    positions = []
+    part = FilePart(filename, 100, 50, on_read=positions.append)
+
+    assert part.seek(0, os.SEEK_END) == 50
+    part.seek(10)
+    assert part.read(5) == data[110:115]
+    assert part.read() == data[115:150]
+    assert part.read() == b''
+    assert positions == [15, 50, 50]
+    part.close()
+    assert part.closed
+
+
+@pytest.mark.asyncio
+async def test_upload_parallel(
+        gcs_server, big_file,  # pylint: disable=redefined-outer-name
+):
+    filename, data = big_file
+    progress = {}
+
+    def on_progress(index, uploaded, size):
+        assert uploaded <= size
+        progress[index] = uploaded
+
+    async with Session() as session:
+        storage = Storage(session=session, api_root=gcs_server.api_root)
+        metadata = await storage.upload_from_filename(
+            'bucket', 'big.bin', filename, parallel=True,
+            part_size=PART_SIZE, max_concurrency=4, progress=on_progress,
+            metadata={'Content-Disposition': 'inline'},
+        )
+
+    assert metadata['size'] == str(len(data))
+    assert metadata['contentType'] == 'application/octet-stream'
+    assert metadata['contentDisposition'] == 'inline'
+    # only the final object is left behind
+    assert list(gcs_server.objects) == [('bucket', 'big.bin')]
+    assert gcs_server.objects[('bucket', 'big.bin')]['data'] == data
+    # 41 parts need two levels of composition
+    assert sorted(gcs_server.composed) == [2, 9, 32]
+    assert progress == {i: PART_SIZE for i in range(40)} | {40: 123}
+
+
+@pytest.mark.asyncio
+async def test_upload_parallel_rejects_unsupported_options(
+        gcs_server, big_file,  # pylint: disable=redefined-outer-name
+):
+    filename, _ = big_file
+
+    async with Session() as session:
+        storage = Storage(session=session, api_root=gcs_server.api_root)
+        with pytest.raises(TypeError, match='zipped'):
+            await storage.upload_from_filename(
+                'bucket', 'big.bin', filename, parallel=True,
+                part_size=PART_SIZE, zipped=True,
+            )
+
+    assert not gcs_server.objects
+
+
+@pytest.mark.asyncio
+async def test_upload_parallel_cleans_up_on_failure(
+        gcs_server, big_file,  # pylint: disable=redefined-outer-name
+):
+    filename, _ = big_file
+    gcs_server.fail('POST', '/compose$', 400)
+
+    async with Session() as session:
+        storage = Storage(session=session, api_root=gcs_server.api_root)
+        with pytest.raises(BadRequestError):
+            await storage.upload_parallel(
+                'bucket', 'big.bin', filename, part_size=PART_SIZE,
+            )
+
+    assert not gcs_server.objects
+
+
+@pytest.mark.asyncio
+async def test_upload_parallel_small_file(
+        gcs_server, tmp_path,  # pylint: disable=redefined-outer-name
+):
+    path = tmp_path / 'small.txt'
+    path.write_bytes(b'hello world')
+
+    async with Session() as session:
+        storage = Storage(session=session, api_root=gcs_server.api_root)
+        await storage.upload_parallel('bucket', 'small.txt', str(path),
+                                      part_size=PART_SIZE)
+
+    assert gcs_server.objects[('bucket', 'small.txt')]['data'] == \
+        b'hello world'
+    assert not gcs_server.composed
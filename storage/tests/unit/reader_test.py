@@ -0,0 +1,82 @@
+# pylint: disable=redefined-outer-name
+import os
+
+import pytest
+from gcloud.aio.auth import BUILD_GCLOUD_REST  # pylint: disable=no-name-in-module
+from gcloud.aio.storage import Storage
+
+from .fake_gcs import serve_fake_gcs
+
+# Selectively load libraries based on the package
+if BUILD_GCLOUD_REST:
+    from requests import Session
+else:
+    from aiohttp import ClientSession as Session
+
+
+BLOCK = 1024
+DATA = os.urandom(10 * BLOCK + 100)
+
+
+@pytest.fixture(scope='function')
+def gcs_server():
+    with serve_fake_gcs() as server:
+        yield server
+
+
+def media_requests(gcs_server):
+    return [r for r in gcs_server.requests if r[2].get('alt') == 'media']
+
+
+@pytest.mark.asyncio
+async def test_download_range(gcs_server):
+    gcs_server.store('bucket', 'object', DATA)
+
+    async with Session() as session:
+        storage = Storage(session=session, api_root=gcs_server.api_root)
+        assert await storage.download_range('bucket', 'object', 10,
+                                            20) == DATA[10:20]
+        assert await storage.download_range('bucket', 'object',
+                                            -8) == DATA[-8:]
+        assert await storage.download_range('bucket', 'object',
+                                            BLOCK) == DATA[BLOCK:]
+        assert await storage.download_range('bucket', 'object', 5, 5) == b''
+
+
+@pytest.mark.asyncio
+async def test_reader(gcs_server):
+    metadata = gcs_server.store('bucket', 'object', DATA)
+
+    async with Session() as session:
+        storage = Storage(session=session, api_root=gcs_server.api_root)
+        reader = await storage.open_reader(
+            'bucket', 'object', block_size=BLOCK, cache_size=4, read_ahead=1,
+        )
+        assert reader.size == len(DATA)
+
+        assert reader.seek(-8, os.SEEK_END) == len(DATA) - 8
+        assert await reader.read(8) == DATA[-8:]
+        assert await reader.read(8) == b''
+        assert len(media_requests(gcs_server)) == 1
+        assert media_requests(gcs_server)[0][2]['generation'] == \
+            metadata['generation']
+
+        # three adjacent blocks are fetched with a single request
+        reader.seek(100)
+        assert await reader.read(2 * BLOCK + 100) == DATA[100:2 * BLOCK + 200]
+        assert len(media_requests(gcs_server)) == 2
+
+        # cached blocks need no request, and reading on fetches the next
+        # block along with the one missing
+        buffer = bytearray(BLOCK)
+        assert await reader.readinto(buffer) == BLOCK
+        assert buffer == DATA[2 * BLOCK + 200:3 * BLOCK + 200]
+        assert len(media_requests(gcs_server)) == 3
+        assert await reader.read(BLOCK) == DATA[3 * BLOCK + 200:
+                                                4 * BLOCK + 200]
+        assert len(media_requests(gcs_server)) == 3
+
+        # reads larger than the cache still work
+        reader.seek(0)
+        assert await reader.read() == DATA
+        assert reader.tell() == len(DATA)
@@ -0,0 +1,207 @@
+import json
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+import pytest
+from gcloud.aio.auth import BUILD_GCLOUD_REST  # pylint: disable=no-name-in-module
+from gcloud.aio.auth import RetryPolicy  # pylint: disable=no-name-in-module
+from gcloud.aio.storage import ChecksumMismatchError
+from gcloud.aio.storage import sliced
+from gcloud.aio.storage import Storage
+from gcloud.aio.storage.checksums import crc32c
+from gcloud.aio.storage.checksums import encode_crc32c
+
+# Selectively load libraries based on the package
+if BUILD_GCLOUD_REST:
+    from requests import Session
+else:
+    from aiohttp import ClientSession as Session
+
+
+DATA = os.urandom(100 * 1024 + 17)
+SLICE_SIZE = 16 * 1024
+RETRY_POLICY = RetryPolicy(initial_backoff=0.01)
+
+
+class FakeGcsHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+    def do_GET(self):
+        server = self.server
+        if 'alt=json' in self.path:
+            body = json.dumps(server.metadata).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        assert f'generation={server.metadata["generation"]}' in self.path
+        start, end = map(int, re.match(r'bytes=(\d+)-(\d+)',
+                                       self.headers['Range']).groups())
+        with server.lock:
+            server.ranges.append(start)
+            failure = server.failures.pop(start, None)
+
+        if failure == 'unavailable':
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        body = server.data[start:end + 1]
+        self.send_response(206)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if failure == 'truncate':
+            # drop the connection halfway through the slice
+            self.wfile.write(body[:len(body) // 2])
+            return
+        self.wfile.write(body)
+
+
+@pytest.fixture(scope='function')
+def fake_gcs():
+    server = ThreadingHTTPServer(('localhost', 0), FakeGcsHandler)
+    server.daemon_threads = True
+    server.data = DATA
+    server.metadata = {
+        'name': 'object',
+        'size': str(len(DATA)),
+        'generation': '1234',
+        'crc32c': encode_crc32c(crc32c(DATA)),
+    }
+    server.failures = {}
+    server.ranges = []
+    server.lock = threading.Lock()
+
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def api_root(server):
+    ip, port = server.server_address
+    return f'http://{ip}:{port}'
+
+
+@pytest.mark.asyncio
+async def test_download_sliced(fake_gcs):  # pylint: disable=redefined-outer-name
+    async with Session() as session:
+        storage = Storage(session=session, api_root=api_root(fake_gcs))
+        data = await storage.download_sliced(
+            'bucket', 'object', slice_size=SLICE_SIZE, max_concurrency=3,
+        )
+
+    assert data == DATA
+    assert sorted(fake_gcs.ranges) == list(range(0, len(DATA), SLICE_SIZE))
+
+
+@pytest.mark.asyncio
+async def test_failed_slices_are_retried(
+        fake_gcs,  # pylint: disable=redefined-outer-name
+):
+    fake_gcs.failures = {SLICE_SIZE: 'unavailable',
+                         3 * SLICE_SIZE: 'truncate'}
+
+    async with Session() as session:
+        storage = Storage(session=session, api_root=api_root(fake_gcs))
+        data = await storage.download_sliced(
+            'bucket', 'object', slice_size=SLICE_SIZE,
+            retry_policy=RETRY_POLICY,
+        )
+
+    assert data == DATA
+    # only the failed slices were fetched twice
+    assert len(fake_gcs.ranges) == len(range(0, len(DATA), SLICE_SIZE)) + 2
+    assert fake_gcs.ranges.count(SLICE_SIZE) == 2
+    assert fake_gcs.ranges.count(3 * SLICE_SIZE) == 2
+
+
+@pytest.mark.asyncio
+async def test_checksum_mismatch(
+        fake_gcs,  # pylint: disable=redefined-outer-name
+):
+    fake_gcs.metadata['crc32c'] = encode_crc32c(crc32c(b'something else'))
+
+    async with Session() as session:
+        storage = Storage(session=session, api_root=api_root(fake_gcs))
+        with pytest.raises(ChecksumMismatchError):
+            await storage.download_sliced('bucket', 'object',
+                                          slice_size=SLICE_SIZE)
+
+        data = await storage.download_sliced(
+            'bucket', 'object', slice_size=SLICE_SIZE, validate=False,
+        )
+
+    assert data == DATA
+
+
+@pytest.mark.asyncio
+async def test_unvalidated_slices_are_not_checksummed(
+        fake_gcs,  # pylint: disable=redefined-outer-name
+        monkeypatch,
+):
+    def fail(*_args):
+        raise AssertionError('computed a CRC32C without validating')
+
+    monkeypatch.setattr(sliced, 'crc32c', fail)
+
+    async with Session() as session:
+        storage = Storage(session=session, api_root=api_root(fake_gcs))
+        data = await storage.download_sliced(
+            'bucket', 'object', slice_size=SLICE_SIZE, validate=False,
+        )
+
+    assert data == DATA
+
+
+@pytest.mark.asyncio
+async def test_download_sliced_to_filename(
+        fake_gcs,  # pylint: disable=redefined-outer-name
+        tmp_path,
+):
+    filename = str(tmp_path / 'object')
+
+    async with Session() as session:
+        storage = Storage(session=session, api_root=api_root(fake_gcs))
+        await storage.download_sliced_to_filename(
+            'bucket', 'object', filename, slice_size=SLICE_SIZE,
+        )
+        with open(filename, 'rb') as f:
+            assert f.read() == DATA
+
+        fake_gcs.metadata['crc32c'] = encode_crc32c(crc32c(b''))
+        with pytest.raises(ChecksumMismatchError):
+            await storage.download_sliced_to_filename(
+                'bucket', 'object', filename, slice_size=SLICE_SIZE,
+            )
+        assert not os.path.exists(filename)
+
+
+@pytest.mark.asyncio
+async def test_download_sliced_empty_object(
+        fake_gcs,  # pylint: disable=redefined-outer-name
+        tmp_path,
+):
+    fake_gcs.data = b''
+    fake_gcs.metadata.update(size='0', crc32c=encode_crc32c(crc32c(b'')))
+    filename = str(tmp_path / 'object')
+
+    async with Session() as session:
+        storage = Storage(session=session, api_root=api_root(fake_gcs))
+        assert await storage.download_sliced('bucket', 'object') == b''
+        await storage.download_sliced_to_filename('bucket', 'object',
+                                                  filename)
+
+    assert os.path.getsize(filename) == 0
+    assert not fake_gcs.ranges
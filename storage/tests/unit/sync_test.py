@@ -0,0 +1,180 @@
+# pylint: disable=redefined-outer-name
+import os
+
+import pytest
+from gcloud.aio.auth import BUILD_GCLOUD_REST  # pylint: disable=no-name-in-module
+from gcloud.aio.storage import HashCache
+from gcloud.aio.storage import Storage
+from gcloud.aio.storage import sync
+from gcloud.aio.storage.sync import parse_location
+
+from .fake_gcs import serve_fake_gcs
+
+# Selectively load libraries based on the package
+if BUILD_GCLOUD_REST:
+    from requests import Session
+else:
+    from aiohttp import ClientSession as Session
+
+
+FILES = {
+    'a.txt': b'a' * 100,
+    'dir/b.bin': os.urandom(1000),
+    'dir/sub/c': b'',
+}
+
+
+@pytest.fixture(scope='function')
+def gcs_server():
+    with serve_fake_gcs() as server:
+        yield server
+
+
+@pytest.fixture(scope='function')
+def local_dir(tmp_path):
+    root = tmp_path / 'local'
+    for name, data in FILES.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+    return root
+
+
+@pytest.fixture(scope='function')
+def hashed(monkeypatch):
+    """Record which files get hashed."""
+    paths = []
+    hash_file = sync.hash_file
+
+    def recording_hash_file(path, key):
+        paths.append((os.path.basename(path), key))
+        return hash_file(path, key)
+
+    monkeypatch.setattr(sync, 'hash_file', recording_hash_file)
+    return paths
+
+
+def uploads(server):
+    return sorted(params['name'] for _, path, params in server.requests
+                  if path.startswith('/upload/'))
+
+
+def test_parse_location():
+    assert parse_location('gs://bucket') == ('bucket', '')
+    assert parse_location('gs://bucket/a/b') == ('bucket', 'a/b/')
+    assert parse_location('some/dir') == (None, 'some/dir')
+    with pytest.raises(ValueError):
+        parse_location('gs:///a')
+
+
+def test_hash_cache_only_hashes_what_is_asked_for(
+        tmp_path, hashed,  # pylint: disable=redefined-outer-name
+):
+    path = tmp_path / 'file'
+    path.write_bytes(b'data')
+    cache = HashCache()
+
+    assert cache.hash(str(path), 'crc32c') == 'rth90Q=='
+    assert cache.hash(str(path), 'crc32c') == 'rth90Q=='
+    assert hashed == [('file', 'crc32c')]
+
+    assert cache.hash(str(path), 'md5Hash') == 'jXd/OF09/siBXSD3SWAm3A=='
+    assert hashed == [('file', 'crc32c'), ('file', 'md5Hash')]
+
+
+@pytest.mark.asyncio
+async def test_sync_upload(
+        gcs_server, local_dir, tmp_path,  # pylint: disable=redefined-outer-name
+        hashed,  # pylint: disable=redefined-outer-name
+):
+    gcs_server.store('bucket', 'out/stale', b'old')
+    gcs_server.store('bucket', 'elsewhere', b'keep')
+    cache_file = str(tmp_path / 'cache.json')
+
+    async with Session() as session:
+        storage = Storage(session=session, api_root=gcs_server.api_root)
+        result = await storage.sync(str(local_dir), 'gs://bucket/out',
+                                    hash_cache=HashCache(cache_file))
+        assert result.transferred == sorted(FILES)
+        assert not hashed
+        assert not result.deleted
+        for name, data in FILES.items():
+            obj = gcs_server.objects[('bucket', f'out/{name}')]
+            assert obj['data'] == data
+
+        # only the modified file is uploaded again
+        (local_dir / 'a.txt').write_bytes(b'b' * 100)
+        gcs_server.requests.clear()
+        result = await storage.sync(
+            str(local_dir), 'gs://bucket/out', delete=True, checksum='md5',
+            hash_cache=HashCache(cache_file),
+        )
+        assert result.transferred == ['a.txt']
+        assert result.skipped == ['dir/b.bin', 'dir/sub/c']
+        assert result.deleted == ['stale']
+        assert uploads(gcs_server) == ['out/a.txt']
+
+        # and unchanged files are not hashed again
+        hashed.clear()
+        result = await storage.sync(str(local_dir), 'gs://bucket/out',
+                                    checksum='md5',
+                                    hash_cache=HashCache(cache_file))
+        assert result.skipped == sorted(FILES)
+        assert not hashed
+
+    assert ('bucket', 'out/stale') not in gcs_server.objects
+    assert ('bucket', 'elsewhere') in gcs_server.objects
+
+
+@pytest.mark.asyncio
+async def test_sync_download(
+        gcs_server, local_dir, tmp_path,  # pylint: disable=redefined-outer-name
+        hashed,  # pylint: disable=redefined-outer-name
+):
+    for name, data in FILES.items():
+        gcs_server.store('bucket', f'in/{name}', data)
+    gcs_server.store('bucket', 'in/../escape', b'')
+    (local_dir / 'a.txt').write_bytes(b'x' * 100)
+    (local_dir / 'extra').write_bytes(b'')
+    target = str(tmp_path / 'target')
+    cache = HashCache()
+
+    async with Session() as session:
+        storage = Storage(session=session, api_root=gcs_server.api_root)
+        result = await storage.sync('gs://bucket/in/', str(local_dir),
+                                    delete=True, dry_run=True)
+        assert result.transferred == ['a.txt']
+        assert result.deleted == ['extra']
+        assert (local_dir / 'extra').exists()
+
+        result = await storage.sync('gs://bucket/in/', str(local_dir),
+                                    delete=True)
+        assert result.transferred == ['a.txt']
+        assert result.deleted == ['extra']
+
+        result = await storage.sync('gs://bucket/in', target,
+                                    hash_cache=cache)
+        assert result.transferred == sorted(FILES)
+        # hashes of downloaded files are known
+        hashed.clear()
+        result = await storage.sync('gs://bucket/in', target,
+                                    hash_cache=cache)
+        assert result.skipped == sorted(FILES)
+        assert not hashed
+
+    for name, data in FILES.items():
+        assert (local_dir / name).read_bytes() == data
+        with open(os.path.join(target, name), 'rb') as f:
+            assert f.read() == data
+    assert not (local_dir / 'extra').exists()
+    assert not (tmp_path / 'escape').exists()
+
+
+@pytest.mark.asyncio
+async def test_sync_needs_one_bucket(gcs_server):
+    async with Session() as session:
+        storage = Storage(session=session, api_root=gcs_server.api_root)
+        with pytest.raises(ValueError):
+            await storage.sync('a', 'b')
+        with pytest.raises(ValueError):
+            await storage.sync('gs://a', 'gs://b')
@@ -0,0 +1,75 @@
+# pylint: disable=redefined-outer-name
+import os
+
+import pytest
+from gcloud.aio.auth import BUILD_GCLOUD_REST  # pylint: disable=no-name-in-module
+from gcloud.aio.storage import Storage
+from gcloud.aio.storage.uploads import BufferStream
+
+from .fake_gcs import serve_fake_gcs
+
+# Selectively load libraries based on the package
+if BUILD_GCLOUD_REST:
+    from requests import Session
+else:
+    from aiohttp import ClientSession as Session
+
+
+DATA = os.urandom(2 * 1024 * 1024 + 7)
+
+
+@pytest.fixture(scope='function')
+def gcs_server():
+    with serve_fake_gcs() as server:
+        yield server
+
+
+def test_buffer_stream():
+    data = bytearray(b'0123456789')
+    stream = BufferStream([b'head', memoryview(data), b'tail'])
+
+    assert len(stream) == 18
+    assert stream.seek(0, os.SEEK_END) == 18
+    stream.seek(2)
+    # reads stop at the end of a buffer, and share its memory
+    assert stream.read(5) == b'ad'
+    view = stream.read(3)
+    data[0] = ord('X')
+    assert view == b'X12'
+    # except when reading everything
+    assert stream.read() == b'3456789tail'
+    assert stream.read() == b''
+
+    stream.close()
+    assert stream.closed
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('metadata', [None, {'metadata': {'a': 1}}])
+async def test_upload_from_filename(gcs_server, tmp_path, metadata):
+    filename = tmp_path / 'object'
+    filename.write_bytes(DATA)
+
+    async with Session() as session:
+        storage = Storage(session=session, api_root=gcs_server.api_root)
+        await storage.upload_from_filename('bucket', 'object', str(filename),
+                                           metadata=metadata)
+
+    stored = gcs_server.objects[('bucket', 'object')]
+    assert stored['data'] == DATA
+    upload_type = 'multipart' if metadata else 'media'
+    assert gcs_server.requests[-1][2]['uploadType'] == upload_type
+    if metadata:
+        assert stored['metadata']['metadata'] == {'a': '1'}
+
+
+@pytest.mark.asyncio
+async def test_upload_from_filename_empty_file(gcs_server, tmp_path):
+    filename = tmp_path / 'object'
+    filename.write_bytes(b'')
+
+    async with Session() as session:
+        storage = Storage(session=session, api_root=gcs_server.api_root)
+        await storage.upload_from_filename('bucket', 'object', str(filename))
+
+    assert gcs_server.objects[('bucket', 'object')]['data'] == b''
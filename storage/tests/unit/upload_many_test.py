@@ -0,0 +1,109 @@
+# pylint: disable=redefined-outer-name
+import os
+from unittest import mock
+
+import pytest
+from gcloud.aio.auth import BUILD_GCLOUD_REST  # pylint: disable=no-name-in-module
+from gcloud.aio.auth import RetryPolicy  # pylint: disable=no-name-in-module
+from gcloud.aio.storage import Storage
+from gcloud.aio.storage import TransferStats
+
+from .fake_gcs import serve_fake_gcs
+
+# Selectively load libraries based on the package
+if BUILD_GCLOUD_REST:
+    from requests import Session
+else:
+    from aiohttp import ClientSession as Session
+
+
+@pytest.fixture(scope='function')
+def gcs_server():
+    with serve_fake_gcs() as server:
+        yield server
+
+
+def write_files(directory, count):
+    files = {}
+    for i in range(count):
+        path = directory / f'{i:02}.json'
+        path.write_bytes(os.urandom(i * 100))
+        files[str(path)] = f'uploads/{i:02}.json'
+    return files
+
+
+@pytest.mark.asyncio
+async def test_upload_many(gcs_server, tmp_path):
+    files = write_files(tmp_path, 20)
+    stats = TransferStats()
+
+    missing = (str(tmp_path / 'missing'), 'uploads/missing')
+
+    async with Session() as session:
+        storage = Storage(session=session, api_root=gcs_server.api_root)
+        results = [r async for r in storage.upload_many(
+            'bucket', [*files.items(), missing],
+            max_concurrency=4, stats=stats,
+            metadata={'Cache-Control': 'no-cache'})]
+
+    assert sorted(r.object_name for r in results) == [*files.values(),
+                                                      'uploads/missing']
+    for result in results:
+        if result.object_name == 'uploads/missing':
+            assert isinstance(result.error, FileNotFoundError)
+            continue
+        assert result.ok
+        stored = gcs_server.objects[('bucket', result.object_name)]
+        with open(result.filename, 'rb') as f:
+            assert stored['data'] == f.read()
+        assert result.size == len(stored['data'])
+        assert result.metadata['name'] == result.object_name
+        assert stored['metadata']['cacheControl'] == 'no-cache'
+
+    assert stats.transferred == 20
+    assert stats.failed == 1
+    assert stats.bytes == sum(i * 100 for i in range(20))
+    assert stats.throughput > 0
+
+
+@pytest.mark.asyncio
+async def test_upload_many_retries(gcs_server, tmp_path):
+    files = write_files(tmp_path, 3)
+    gcs_server.fail('POST', r'/upload/storage/v1/b/bucket/o')
+    gcs_server.fail('POST', r'/upload/storage/v1/b/bucket/o', status=403)
+
+    async with Session() as session:
+        storage = Storage(session=session, api_root=gcs_server.api_root)
+        bucket = storage.get_bucket('bucket')
+        results = [r async for r in bucket.upload_many(
+            files.items(), max_concurrency=1)]
+
+    # the transient error is retried, but not the permanent one
+    assert sorted(r.ok for r in results) == [False, True, True]
+    assert len(gcs_server.objects) == 2
+
+    async with Session() as session:
+        storage = Storage(session=session, api_root=gcs_server.api_root)
+        gcs_server.fail('POST', r'/upload/storage/v1/b/bucket/o')
+        results = [r async for r in storage.upload_many(
+            'bucket', list(files.items())[:1],
+            retry_policy=RetryPolicy(max_attempts=1))]
+    assert not results[0].ok
+
+
+@pytest.mark.asyncio
+async def test_upload_many_guesses_content_type(gcs_server, tmp_path):
+    path = tmp_path / 'image.png'
+    path.write_bytes(b'data')
+    files = [(str(path), 'image'), (str(path), 'page.html')]
+
+    async with Session() as session:
+        storage = Storage(session=session, api_root=gcs_server.api_root)
+        with mock.patch.object(storage, 'upload_from_filename',
+                               wraps=storage.upload_from_filename) as upload:
+            results = [r async for r in storage.upload_many('bucket', files)]
+
+    assert all(r.ok for r in results)
+    content_types = {c.args[1]: c.kwargs['content_type']
+                     for c in upload.call_args_list}
+    assert content_types == {'image': 'image/png', 'page.html': 'text/html'}
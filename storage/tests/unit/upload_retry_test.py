@@ -6,7 +6,9 @@ from http.server import HTTPServer
 
 import pytest
 from gcloud.aio.auth import BUILD_GCLOUD_REST  # pylint: disable=no-name-in-module
+from gcloud.aio.auth import RetryPolicy  # pylint: disable=no-name-in-module
 from gcloud.aio.storage import storage as aio_storage
+from gcloud.aio.storage import uploads
 
 # Selectively load libraries based on the package
 if BUILD_GCLOUD_REST:
@@ -85,3 +87,188 @@ async def test_upload_retry(fake_server):  # pylint: disable=redefined-outer-nam
         )
 
     assert response.get('data') == 'test data'
+
+
+class FakeResumableHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+    def _reply(self, status, headers=None, body=b''):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _reply_committed(self, total):
+        server = self.server
+        if len(server.data) == total:
+            self._reply(200, {'Content-Type': 'application/json'},
+                        json.dumps({'size': str(total)}).encode())
+        elif server.data:
+            self._reply(308, {'Range': f'bytes=0-{len(server.data) - 1}'})
+        else:
+            self._reply(308)
+
+    def do_POST(self):
+        ip, port = self.server.server_address
+        self.rfile.read(int(self.headers['Content-Length']))
+        self._reply(200, {'Location': f'http://{ip}:{port}/session'})
+
+    def do_PUT(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        content_range = self.headers['Content-Range']
+        server.puts.append((content_range, len(body)))
+
+        span, total = content_range[len('bytes '):].split('/')
+        if span == '*':
+            self._reply_committed(int(total))
+            return
+
+        start = int(span.split('-')[0])
+        assert start == len(server.data), 'upload must resume where it left'
+        if server.stalled:
+            # acknowledge the chunk without persisting any of it
+            self._reply_committed(int(total))
+            return
+        if server.fail_at == start:
+            # only persist part of the chunk before failing; GCS persists
+            # data in multiples of 256KB
+            server.fail_at = None
+            server.data += body[:len(body) // 2]
+            self._reply(server.fail_status)
+            return
+
+        server.data += body
+        self._reply_committed(int(total))
+
+
+class FakeResumableServer(StoppableHTTPServer):
+    def __init__(self):
+        super().__init__(('localhost', 0), FakeResumableHandler)
+        self.data = b''
+        self.puts = []
+        self.fail_at = None
+        self.fail_status = 503
+        self.stalled = False
+
+
+@pytest.fixture(scope='function')
+def fake_resumable_server():
+    server = FakeResumableServer()
+    thread = threading.Thread(target=server.run)
+    thread.start()
+    yield server
+    server.shutdown()
+    thread.join()
+
+
+@pytest.mark.asyncio
+async def test_upload_resumable_in_chunks(
+        fake_resumable_server,  # pylint: disable=redefined-outer-name
+        monkeypatch,
+):
+    async def no_sleep(_):
+        pass
+    monkeypatch.setattr(uploads, 'sleep', no_sleep)
+
+    server = fake_resumable_server
+    alignment = uploads.UPLOAD_CHUNK_ALIGNMENT
+    chunk_size = 2 * alignment
+    data = bytes(range(256)) * (5 * alignment // 256) + b'tail'
+    server.fail_at = chunk_size
+    ip, port = server.server_address
+
+    async with Session() as session:
+        storage = aio_storage.Storage(session=session,
+                                      api_root=f'http://{ip}:{port}')
+        response = await storage.upload(
+            'bucket', 'object', data, force_resumable_upload=True,
+            chunk_size=chunk_size,
+        )
+
+    assert response == {'size': str(len(data))}
+    assert server.data == data
+    # after the failure, we asked where to resume from and carried on there
+    total = len(data)
+    assert server.puts == [
+        (f'bytes 0-{chunk_size - 1}/{total}', chunk_size),
+        (f'bytes {chunk_size}-{2 * chunk_size - 1}/{total}', chunk_size),
+        (f'bytes */{total}', 0),
+        (f'bytes {3 * alignment}-{2 * chunk_size - 1}/{total}', alignment),
+        (f'bytes {2 * chunk_size}-{total - 1}/{total}', alignment + 4),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_upload_resumable_fails_fast_on_client_error(
+        fake_resumable_server,  # pylint: disable=redefined-outer-name
+        monkeypatch,
+):
+    async def no_sleep(_):
+        pass
+    monkeypatch.setattr(uploads, 'sleep', no_sleep)
+
+    server = fake_resumable_server
+    server.fail_at = 0
+    server.fail_status = 404
+    ip, port = server.server_address
+    data = b'x' * (2 * uploads.UPLOAD_CHUNK_ALIGNMENT)
+
+    async with Session() as session:
+        storage = aio_storage.Storage(session=session,
+                                      api_root=f'http://{ip}:{port}')
+        with pytest.raises(Exception):
+            await storage.upload(
+                'bucket', 'object', data, force_resumable_upload=True,
+                chunk_size=uploads.UPLOAD_CHUNK_ALIGNMENT,
+            )
+
+    # a missing session isn't worth asking about, let alone retrying
+    assert len(server.puts) == 1
+
+
+@pytest.mark.asyncio
+async def test_upload_resumable_gives_up_without_progress(
+        fake_resumable_server,  # pylint: disable=redefined-outer-name
+        monkeypatch,
+):
+    delays = []
+
+    async def no_sleep(delay):
+        delays.append(delay)
+    monkeypatch.setattr(uploads, 'sleep', no_sleep)
+
+    server = fake_resumable_server
+    server.stalled = True
+    ip, port = server.server_address
+    data = b'x' * (2 * uploads.UPLOAD_CHUNK_ALIGNMENT)
+
+    policy = RetryPolicy(initial_backoff=0.01, max_backoff=0.02)
+
+    async with Session() as session:
+        storage = aio_storage.Storage(session=session,
+                                      api_root=f'http://{ip}:{port}',
+                                      retry_policy=policy)
+        with pytest.raises(ValueError):
+            await storage.upload(
+                'bucket', 'object', data, force_resumable_upload=True,
+                chunk_size=uploads.UPLOAD_CHUNK_ALIGNMENT,
+            )
+
+    assert len(server.puts) == len(delays) + 1
+    # backoffs follow the storage client's retry policy
+    assert all(0 <= delay <= policy.max_backoff for delay in delays)
+
+
+@pytest.mark.asyncio
+async def test_upload_chunk_size_is_aligned():
+    storage = aio_storage.Storage(api_root='http://localhost:1')
+    with pytest.raises(ValueError):
+        await storage._do_upload(  # pylint: disable=protected-access
+            'http://localhost:1/session', io.BytesIO(b'data'), {},
+            chunk_size=1000,
+        )
+    await storage.close()
@@ -0,0 +1,76 @@
+# pylint: disable=redefined-outer-name
+import os
+
+import pytest
+from gcloud.aio.auth import BUILD_GCLOUD_REST  # pylint: disable=no-name-in-module
+from gcloud.aio.storage import ChecksumMismatchError
+from gcloud.aio.storage import Storage
+
+from .fake_gcs import serve_fake_gcs
+
+# Selectively load libraries based on the package
+if BUILD_GCLOUD_REST:
+    from requests import HTTPError as ResponseError
+    from requests import Session
+else:
+    from aiohttp import ClientResponseError as ResponseError
+    from aiohttp import ClientSession as Session
+
+
+DATA = os.urandom(600 * 1024)
+
+
+@pytest.fixture(scope='function')
+def gcs_server():
+    with serve_fake_gcs() as server:
+        yield server
+
+
+@pytest.mark.asyncio
+async def test_download_validate(gcs_server):
+    gcs_server.store('bucket', 'object', DATA)
+
+    async with Session() as session:
+        storage = Storage(session=session, api_root=gcs_server.api_root)
+        assert await storage.download('bucket', 'object',
+                                      validate=True) == DATA
+
+        # the data no longer matches the hash of the object
+        gcs_server.objects[('bucket', 'object')]['data'] = DATA[::-1]
+        assert await storage.download('bucket', 'object') == DATA[::-1]
+        with pytest.raises(ChecksumMismatchError):
+            await storage.download('bucket', 'object', validate=True)
+
+        stream = await storage.download_stream('bucket', 'object',
+                                               validate=True)
+        with pytest.raises(ChecksumMismatchError):
+            while await stream.read(64 * 1024):
+                pass
+
+        # ranged responses can't be checked
+        data = await storage.download('bucket', 'object', validate=True,
+                                      headers={'Range': 'bytes=0-9'})
+        assert data == DATA[::-1][:10]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('kwargs', [
+    {},
+    {'metadata': {'Content-Disposition': 'inline'}},
+    {'force_resumable_upload': True, 'chunk_size': 256 * 1024},
+    {'force_resumable_upload': True, 'zipped': True},
+])
+async def test_upload_validate(gcs_server, kwargs):
+    async with Session() as session:
+        storage = Storage(session=session, api_root=gcs_server.api_root)
+        await storage.upload('bucket', 'object', DATA, validate=True,
+                             **kwargs)
+        assert ('bucket', 'object') in gcs_server.objects
+
+        gcs_server.corrupt_uploads = True
+        # GCS checks the hash sent with the metadata or the last chunk, and
+        # doesn't keep the object if it doesn't match
+        with pytest.raises(ResponseError):
+            await storage.upload('bucket', 'corrupt', DATA, validate=True,
+                                 **kwargs)
+        assert ('bucket', 'corrupt') not in gcs_server.objects
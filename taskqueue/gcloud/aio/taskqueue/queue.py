@@ -10,6 +10,8 @@ from typing import IO
 
 from gcloud.aio.auth import AioSession  # pylint: disable=no-name-in-module
 from gcloud.aio.auth import BUILD_GCLOUD_REST  # pylint: disable=no-name-in-module
+from gcloud.aio.auth import PoolPolicy  # pylint: disable=no-name-in-module
+from gcloud.aio.auth import RetryPolicy  # pylint: disable=no-name-in-module
 from gcloud.aio.auth import Token  # pylint: disable=no-name-in-module
 
 # Selectively load libraries based on the package
@@ -52,14 +54,20 @@ class PushQueue:
             session: Session | None = None,
             token: Token | None = None,
             api_root: str | None = None,
-            api_is_dev: bool | None = None
+            api_is_dev: bool | None = None,
+            *,
+            pool_policy: PoolPolicy | None = None,
+            retry_policy: RetryPolicy | None = None,
     ) -> None:
         self._api_is_dev, self._api_root = init_api_root(api_root, api_is_dev)
         self._queue_path = (
             f'projects/{project}/locations/{location}/queues/{taskqueue}'
         )
 
-        self.session = AioSession(session)
+        self.session = AioSession(
+            session, pool_policy=pool_policy,
+            retry_policy=retry_policy,
+        )
         self.token = token or Token(
             service_file=service_file, scopes=SCOPES,
             session=self.session.session,  # type: ignore[arg-type]
@@ -92,9 +100,11 @@ class PushQueue:
 
         headers = await self.headers()
 
+        # named tasks are de-duplicated by Cloud Tasks, so only those can be
+        # safely re-sent
         s = AioSession(session) if session else self.session
         resp = await s.post(url, headers=headers, data=payload,
-                            timeout=timeout)
+                            timeout=timeout, idempotent='name' in task)
         return await resp.json()
 
     # https://cloud.google.com/tasks/docs/reference/rest/v2beta3/projects.locations.queues.tasks/delete